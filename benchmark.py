@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Headless accuracy/latency benchmark for the gesture detector.
+
+Replays labelled clips (video files, image directories or recorded
+landmark streams) through HandDetector and the gesture filter of the live app,
+without a camera or a display, and writes a JSON report.
+
+Manifest format (paths are relative to the manifest file):
+
+    {
+      "clips": [
+        {"source": "clips/fist.mp4", "label": "CLOSED_FIST"},
+        {"source": "clips/mixed", "labels": "clips/mixed_labels.txt"},
+        {"source": "clips/session.npz", "labels": ["NO_HAND", "OPEN_PALM", ...]}
+      ]
+    }
+
+"label" applies to every frame of a clip; "labels" gives one label per
+frame, either inline or as a text file with one label per line.
+Frames labelled "" or "-" are not scored.
+An optional "fps" (default 30) gives the clip's frame rate, used as the
+clock of the gesture filter and of the result cache (--cache-tolerance).
+
+Usage:
+    python benchmark.py manifest.json --output report.json --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from frame_cache import ResultCache
+from frame_sources import open_source
+from gesture_map import load_gesture_map
+from gesture_model import load_classifier
+from hand_detector import HandDetector, classify_fingers
+from overlay import OverlayRenderer
+from stability import CONFIRM_TIMES, GestureFilter
+
+
+STAGES = ["cache", "convert", "inference", "landmarks", "classify", "overlay"]
+
+
+class StageTimer:
+    """
+    Collects per-frame timings for each processing stage.
+    """
+    
+    def __init__(self):
+        """Initialize empty sample lists."""
+        self.samples = {stage: [] for stage in STAGES}
+    
+    def add(self, stage, seconds):
+        """
+        Record one timing sample.
+        
+        Args:
+            stage: Stage name
+            seconds: Time spent in the stage
+        """
+        self.samples.setdefault(stage, []).append(seconds)
+    
+    def summary(self):
+        """
+        Summarize the collected timings.
+        
+        Returns:
+            Dictionary of stage -> {"mean_ms", "p50_ms", "p95_ms", "p99_ms", "count"}
+        """
+        result = {}
+        for stage, values in self.samples.items():
+            if not values:
+                continue
+            ms = np.asarray(values) * 1000.0
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            result[stage] = {
+                "mean_ms": float(ms.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "count": len(values),
+            }
+        return result
+
+
+def load_labels(clip, base_dir):
+    """
+    Resolve the labels of a clip.
+    
+    Args:
+        clip: Clip entry from the manifest
+        base_dir: Directory of the manifest file
+    
+    Returns:
+        Tuple of (fixed_label, per_frame_labels); one of them is None
+    """
+    if "label" in clip:
+        return clip["label"], None
+    labels = clip.get("labels")
+    if isinstance(labels, str):
+        with open(os.path.join(base_dir, labels)) as f:
+            labels = [line.strip() for line in f]
+    return None, labels
+
+
+def score_gestures(pairs):
+    """
+    Compute per-gesture precision and recall.
+    
+    Args:
+        pairs: List of (label, predicted) gesture names
+    
+    Returns:
+        Tuple of (per_gesture_dict, accuracy)
+    """
+    names = sorted({label for label, _ in pairs} | {pred for _, pred in pairs})
+    per_gesture = {}
+    for name in names:
+        tp = sum(1 for label, pred in pairs if label == name and pred == name)
+        fp = sum(1 for label, pred in pairs if label != name and pred == name)
+        fn = sum(1 for label, pred in pairs if label == name and pred != name)
+        per_gesture[name] = {
+            "precision": tp / (tp + fp) if tp + fp else 0.0,
+            "recall": tp / (tp + fn) if tp + fn else 0.0,
+            "support": tp + fn,
+        }
+    correct = sum(1 for label, pred in pairs if label == pred)
+    accuracy = correct / len(pairs) if pairs else 0.0
+    return per_gesture, accuracy
+
+
+def run_clip(source, detector, timer, gesture_map, classifier=None, flip=True, overlay=True, cache=None,
+             frame_rate=30.0):
+    """
+    Replay one clip through the detector and the gesture filter.
+    
+    Args:
+        source: Opened frame source (image-based or landmark stream)
+        detector: HandDetector instance (unused for landmark streams)
+        timer: StageTimer receiving per-stage timings
+        gesture_map: GestureMap naming the gestures of landmark streams
+        classifier: Optional GestureClassifier used instead of the finger rules
+        flip: Mirror image frames like the live application does
+        overlay: Draw landmarks and the on-screen overlay, and time the overlay
+        cache: Optional ResultCache for image frames
+        frame_rate: Frame rate the clip was recorded at (frame times for the confirm times and the cache's max age)
+    
+    Returns:
+        Tuple of (predicted_gestures, confirmed_gestures)
+    """
+    # Same filter and confirm times as main.py, on the clip's own clock
+    stability = GestureFilter(confirm_times=dict(CONFIRM_TIMES, **gesture_map.confirm_times))
+    renderer = (OverlayRenderer(guide_text=gesture_map.guide_text(), action_labels=gesture_map.action_labels())
+                if overlay else None)
+    predictions = []
+    confirmed = []
+    landmark_stream = hasattr(source, "read_landmarks")
+    
+    while True:
+        now = len(predictions) / frame_rate
+        if landmark_stream:
+            success, landmarks = source.read_landmarks()
+            if not success:
+                break
+            start = time.perf_counter()
+            if landmarks is None:
+                gesture, finger_count = "NO_HAND", -1
+            else:
+                fingers = classify_fingers(landmarks)
+                finger_count = int(fingers.sum())
+                gesture = classifier.predict(landmarks) if classifier is not None else gesture_map.gesture(fingers)
+            timer.add("classify", time.perf_counter() - start)
+            img = None
+        else:
+            success, img = source.read()
+            if not success:
+                break
+            if flip:
+                img = cv2.flip(img, 1)
+            start = time.perf_counter()
+            hit = cache.lookup(img, now) if cache is not None else None
+            if hit is not None:
+                gesture, finger_count = hit[:2]
+                timer.add("cache", time.perf_counter() - start)
+            elif cache is not None:
+                gesture, finger_count, img = detector.detect_gesture(img, draw=False)
+                cache.store(img, gesture, finger_count, detector.landmarks, now=now)
+                if overlay:
+                    detector.draw_landmarks(img)
+                for stage, seconds in detector.stage_times.items():
+                    timer.add(stage, seconds)
+            else:
+                gesture, finger_count, img = detector.detect_gesture(img, draw=overlay)
+                for stage, seconds in detector.stage_times.items():
+                    timer.add(stage, seconds)
+        
+        if stability.update(gesture, now):
+            confirmed.append(stability.last_gesture)
+            stability.mark_executed()
+        
+        if renderer is not None and img is not None:
+            renderer.draw(img, gesture, finger_count, None, stability.stable_frames, stability.threshold)
+            timer.add("overlay", renderer.last_time)
+        
+        predictions.append(gesture)
+    
+    return predictions, confirmed
+
+
+def run_benchmark(manifest_path, detector_options=None, flip=True, overlay=True, gesture_map=None,
+                  classifier=None, cache_options=None):
+    """
+    Run every clip of a manifest and build the report.
+    
+    Args:
+        manifest_path: Path to the JSON manifest
+        detector_options: Keyword arguments for HandDetector
+        flip: Mirror image frames like the live application does
+        overlay: Draw landmarks and the on-screen overlay, and time the overlay
+        gesture_map: GestureMap with the gesture definitions (default: the bundled gestures.json)
+        classifier: Optional GestureClassifier used instead of the finger rules
+        cache_options: Keyword arguments for a ResultCache reusing results of near-identical
+                       image frames, None to run detection on every frame
+    
+    Returns:
+        Report dictionary
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    gesture_map = gesture_map or load_gesture_map()
+    
+    detector = None
+    timer = StageTimer()
+    pairs = []
+    clip_reports = []
+    total_frames = 0
+    cache_hits = cache_lookups = 0
+    start = time.perf_counter()
+    
+    for clip in manifest["clips"]:
+        source = open_source(os.path.join(base_dir, clip["source"]))
+        if not source.isOpened():
+            print(f"⚠ Skipping {clip['source']}: could not open")
+            continue
+        if detector is None and not hasattr(source, "read_landmarks"):
+            # The MediaPipe model is only built when a clip actually needs it
+            detector = HandDetector(gesture_map=gesture_map, classifier=classifier, **(detector_options or {}))
+        
+        # A fresh cache per clip, so no result carries over between clips
+        cache = ResultCache(**cache_options) if cache_options is not None else None
+        clip_start = time.perf_counter()
+        predictions, confirmed = run_clip(source, detector, timer, gesture_map, classifier, flip=flip,
+                                          overlay=overlay, cache=cache, frame_rate=clip.get("fps", 30.0))
+        clip_time = time.perf_counter() - clip_start
+        source.release()
+        if cache is not None:
+            cache_hits += cache.hits
+            cache_lookups += cache.lookups
+        
+        fixed_label, labels = load_labels(clip, base_dir)
+        for i, predicted in enumerate(predictions):
+            label = fixed_label if labels is None else (labels[i] if i < len(labels) else "")
+            if label and label != "-":
+                pairs.append((label, predicted))
+        
+        total_frames += len(predictions)
+        clip_reports.append({
+            "source": clip["source"],
+            "frames": len(predictions),
+            "fps": len(predictions) / clip_time if clip_time > 0 else 0.0,
+            "confirmed": confirmed,
+        })
+        print(f"✅ {clip['source']}: {len(predictions)} frames, confirmed {confirmed}")
+    
+    if detector is not None:
+        detector.close()
+    
+    elapsed = time.perf_counter() - start
+    per_gesture, accuracy = score_gestures(pairs)
+    return {
+        "frames": total_frames,
+        "fps": total_frames / elapsed if elapsed > 0 else 0.0,
+        "accuracy": accuracy,
+        "stages": timer.summary(),
+        "gestures": per_gesture,
+        "clips": clip_reports,
+        "detector": detector_options or {},
+        "classifier": "model" if classifier is not None else "rules",
+        "cache": None if cache_options is None else dict(cache_options, hits=cache_hits, lookups=cache_lookups,
+                                                          hit_rate=cache_hits / max(1, cache_lookups)),
+    }
+
+
+def compare_reports(report, baseline):
+    """
+    Print the difference between a report and a stored baseline.
+    
+    Args:
+        report: Current report dictionary
+        baseline: Baseline report dictionary
+    """
+    print("\n📊 Comparison with baseline:")
+    print(f"  FPS:      {baseline['fps']:8.1f} → {report['fps']:8.1f}")
+    print(f"  Accuracy: {baseline['accuracy']:8.3f} → {report['accuracy']:8.3f}")
+    hit_rates = [(r.get("cache") or {}).get("hit_rate", 0.0) for r in (baseline, report)]
+    if any(hit_rates):
+        print(f"  Cache hit rate: {hit_rates[0]:8.3f} → {hit_rates[1]:8.3f}")
+    for stage, values in report["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if old:
+            print(f"  {stage:10} p95: {old['p95_ms']:7.2f} ms → {values['p95_ms']:7.2f} ms")
+    for name, values in report["gestures"].items():
+        old = baseline.get("gestures", {}).get(name)
+        if old:
+            print(f"  {name:14} precision {old['precision']:.3f} → {values['precision']:.3f}, "
+                  f"recall {old['recall']:.3f} → {values['recall']:.3f}")
+
+
+def print_report(report):
+    """
+    Print a human-readable summary of a report.
+    
+    Args:
+        report: Report dictionary
+    """
+    print(f"\nFrames: {report['frames']} | {report['fps']:.1f} FPS | accuracy {report['accuracy']:.3f}")
+    if report.get("cache"):
+        print(f"Result cache: {report['cache']['hits']}/{report['cache']['lookups']} frames reused "
+              f"({100 * report['cache']['hit_rate']:.1f}%)")
+    print(f"{'Stage':12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for stage, values in report["stages"].items():
+        print(f"{stage:12} {values['p50_ms']:8.2f} {values['p95_ms']:8.2f} {values['p99_ms']:8.2f}")
+    print(f"\n{'Gesture':14} {'precision':>9} {'recall':>7} {'support':>8}")
+    for name, values in report["gestures"].items():
+        print(f"{name:14} {values['precision']:9.3f} {values['recall']:7.3f} {values['support']:8}")
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Headless gesture accuracy/latency benchmark.")
+    parser.add_argument("manifest", help="JSON manifest of labelled clips")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="compare against a previously written JSON report")
+    parser.add_argument("--inference-width", type=int, default=None, metavar="PX",
+                        help="downscale frames to this width before hand detection")
+    parser.add_argument("--roi", action="store_true",
+                        help="only search a padded crop around the last detected hand")
+    parser.add_argument("--gestures", default=None, metavar="FILE",
+                        help="gesture definitions (default: gestures.json)")
+    parser.add_argument("--model", default=None, metavar="FILE",
+                        help="classify with a model trained by gesture_model.py instead of the finger rules")
+    parser.add_argument("--cache-tolerance", type=float, default=None, metavar="LEVEL",
+                        help="reuse results of near-identical frames (mean gray level difference; default: off)")
+    parser.add_argument("--cache-max-age", type=float, default=0.5, metavar="SECONDS",
+                        help="longest time a cached result is reused, in clip time (default: 0.5)")
+    parser.add_argument("--no-flip", action="store_true", help="do not mirror image frames")
+    parser.add_argument("--no-overlay", action="store_true", help="skip overlay drawing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark from the command line."""
+    args = parse_args(argv)
+    detector_options = {"inference_width": args.inference_width, "roi_tracking": args.roi}
+    report = run_benchmark(args.manifest, detector_options,
+                           flip=not args.no_flip, overlay=not args.no_overlay,
+                           gesture_map=load_gesture_map(args.gestures),
+                           classifier=load_classifier(args.model) if args.model else None,
+                           cache_options=None if args.cache_tolerance is None else
+                           {"tolerance": args.cache_tolerance, "max_age": args.cache_max_age})
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare_reports(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
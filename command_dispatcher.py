@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+# Commands that undo each other when both are still waiting to be sent
+OPPOSITES = {
+    "play": "pause",
+    "pause": "play",
+    "skip_forward": "skip_backward",
+    "skip_backward": "skip_forward",
+    "volume_up": "volume_down",
+    "volume_down": "volume_up",
+}
+
+# Commands whose repeats add up ("skip N") instead of being dropped
+COUNTABLE = {"skip_forward", "skip_backward", "volume_up", "volume_down"}
+
+
+class Command:
+    """
+    A queued media command.
+    """
+    
+    def __init__(self, name, send, count=1):
+        """
+        Initialize the command.
+        
+        Args:
+            name: Command name ("play", "pause", "skip_forward", ...)
+            send: Callable taking a repeat count that performs the command
+            count: Number of times to perform it
+        """
+        self.name = name
+        self.send = send
+        self.count = count
+        self.future = Future()
+        self.queued_at = time.monotonic()
+
+
+class CommandDispatcher:
+    """
+    Sends media commands from a dedicated thread so the camera loop never
+    blocks on key injection (pyautogui sleeps PAUSE seconds on every call).
+    
+    Commands that are still waiting are coalesced: repeated skips become one
+    "skip N", a repeated play/pause is dropped, and opposite commands
+    (play then pause, forward then backward) cancel each other out.
+    """
+    
+    def __init__(self, max_pending=8, coalesce_window=0.15):
+        """
+        Initialize and start the dispatcher thread.
+        
+        Args:
+            max_pending: Maximum number of waiting commands; further commands are rejected
+            coalesce_window: Seconds a command waits for others to merge with before it is sent
+        """
+        self.max_pending = max_pending
+        self.coalesce_window = coalesce_window
+        self.pending = deque()
+        self.cond = threading.Condition()
+        self.running = True
+        self.sent = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.thread = threading.Thread(target=self._run, name="command-dispatcher", daemon=True)
+        self.thread.start()
+    
+    def submit(self, name, send, count=1):
+        """
+        Queue a command without blocking.
+        
+        Args:
+            name: Command name
+            send: Callable taking a repeat count that performs the command
+            count: Number of times to perform it (e.g. a long skip)
+        
+        Returns:
+            Future resolved with True once sent, False if cancelled or rejected
+            (or with the exception raised while sending)
+        """
+        with self.cond:
+            last = self.pending[-1] if self.pending else None
+            
+            if last is not None and last.name == name:
+                self.coalesced += 1
+                if name in COUNTABLE:
+                    last.count += count
+                return last.future
+            
+            if last is not None and OPPOSITES.get(name) == last.name:
+                # e.g. play followed by pause before either was sent: net effect is nothing
+                self.pending.pop()
+                last.future.set_result(False)
+                self.cancelled += 2
+                future = Future()
+                future.set_result(False)
+                return future
+            
+            if len(self.pending) >= self.max_pending:
+                self.rejected += 1
+                future = Future()
+                future.set_result(False)
+                return future
+            
+            command = Command(name, send, count)
+            self.pending.append(command)
+            self.cond.notify()
+            return command.future
+    
+    def _run(self):
+        """Send queued commands once their coalescing window has passed."""
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                wait = self.pending[0].queued_at + self.coalesce_window - time.monotonic()
+                if wait > 0 and self.running:
+                    self.cond.wait(wait)
+                    continue
+                command = self.pending.popleft()
+            
+            try:
+                command.send(command.count)
+                self.sent += 1
+                command.future.set_result(True)
+            except Exception as e:
+                print(f"Error sending {command.name} command: {e}")
+                command.future.set_exception(e)
+    
+    def pending_count(self):
+        """Return the number of commands waiting to be sent."""
+        with self.cond:
+            return len(self.pending)
+    
+    def stats(self):
+        """
+        Return a snapshot of dispatcher statistics.
+        
+        Returns:
+            Dictionary with sent/coalesced/cancelled/rejected counters
+        """
+        return {
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "pending": self.pending_count(),
+        }
+    
+    def close(self, timeout=2.0):
+        """
+        Send the remaining commands and stop the thread.
+        
+        Args:
+            timeout: Maximum time (seconds) to wait for the thread
+        """
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join(timeout)
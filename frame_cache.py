@@ -0,0 +1,147 @@
+import time
+
+import numpy as np
+
+
+class ResultCache:
+    """
+    Reuses the last detection result while the camera image stays the same.
+    
+    After each detection a small grayscale thumbnail of the hand region
+    (the padded landmark box, or the whole frame when there is no hand) is
+    kept as the reference. A new frame whose thumbnail of the same region
+    differs from it by less than the tolerance (mean absolute difference in
+    gray levels) gets the cached result without running MediaPipe. Frames
+    are compared with the last detected one, not the previous frame, so
+    slow drift still adds up to a miss, and a result is never reused for
+    longer than max_age seconds.
+    """
+    
+    def __init__(self, tolerance=2.0, max_age=0.5, padding=0.25, thumbnail_size=32, mirror=False):
+        """
+        Initialize an empty cache.
+        
+        Args:
+            tolerance: Largest mean absolute gray-level difference (0-255) counted as the same image
+            max_age: Seconds after which a cached result is evicted and detection runs again
+            padding: Padding added around the hand box, as a fraction of its size
+            thumbnail_size: Approximate number of samples along the longer side of the thumbnail
+            mirror: The landmarks are mirrored while the frames are not (HandDetector(mirror=True)),
+                    so landmark x is mapped back to w - x to find the hand in the image
+        """
+        self.tolerance = tolerance
+        self.max_age = max_age
+        self.padding = padding
+        self.thumbnail_size = thumbnail_size
+        self.mirror = mirror
+        
+        self.result = None  # Cached (gesture, finger_count, landmarks, handedness)
+        self.region = None  # (x0, y0, x1, y1, step) the reference thumbnail was taken from
+        self.reference = None
+        self.shape = None  # Frame size of the reference
+        self.stored_at = 0.0
+        self.last_difference = 0.0
+        
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+    
+    def _region(self, img, landmarks):
+        """
+        Pick the region compared between frames.
+        
+        Args:
+            img: BGR frame
+            landmarks: (21, 3) landmark array in pixels, or None
+        
+        Returns:
+            (x0, y0, x1, y1, step) with step the sampling stride
+        """
+        h, w = img.shape[:2]
+        if landmarks is None:
+            x0, y0, x1, y1 = 0, 0, w, h
+        else:
+            bx0, by0 = landmarks[:, :2].min(axis=0)
+            bx1, by1 = landmarks[:, :2].max(axis=0)
+            if self.mirror:
+                bx0, bx1 = w - bx1, w - bx0
+            pad = max(bx1 - bx0, by1 - by0) * self.padding
+            x0, y0 = int(max(0, bx0 - pad)), int(max(0, by0 - pad))
+            x1, y1 = int(min(w, bx1 + pad)), int(min(h, by1 + pad))
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                x0, y0, x1, y1 = 0, 0, w, h
+        step = max(1, max(x1 - x0, y1 - y0) // self.thumbnail_size)
+        return x0, y0, x1, y1, step
+    
+    @staticmethod
+    def _thumbnail(img, region):
+        """Return the strided grayscale samples of a region."""
+        x0, y0, x1, y1, step = region
+        return img[y0:y1:step, x0:x1:step].mean(axis=2, dtype=np.float32)
+    
+    def lookup(self, img, now=None):
+        """
+        Return the cached result if the frame matches the last detected one.
+        
+        Args:
+            img: Current BGR frame
+            now: Current time in seconds (defaults to time.monotonic())
+        
+        Returns:
+            Tuple of (gesture, finger_count, landmarks, handedness), or None on a miss
+        """
+        now = time.monotonic() if now is None else now
+        self.lookups += 1
+        if self.result is None:
+            return None
+        if now - self.stored_at > self.max_age:
+            # Evicted: tracking must not freeze on an old result
+            self.result = None
+            self.evictions += 1
+            return None
+        if img.shape[:2] != self.shape:
+            return None
+        
+        self.last_difference = float(np.abs(self._thumbnail(img, self.region) - self.reference).mean())
+        if self.last_difference > self.tolerance:
+            return None
+        self.hits += 1
+        return self.result
+    
+    def store(self, img, gesture, finger_count, landmarks, handedness=None, now=None):
+        """
+        Remember the result of a detection as the new reference.
+        
+        Args:
+            img: The frame the detection ran on (before any landmarks were drawn onto it)
+            gesture: Detected gesture name
+            finger_count: Detected finger count
+            landmarks: (21, 3) landmark array in pixels, or None if no hand
+            handedness: "Left", "Right" or None
+            now: Current time in seconds (defaults to time.monotonic())
+        """
+        self.region = self._region(img, landmarks)
+        self.reference = self._thumbnail(img, self.region)
+        self.shape = img.shape[:2]
+        self.result = (gesture, finger_count, landmarks, handedness)
+        self.stored_at = time.monotonic() if now is None else now
+    
+    def stats(self):
+        """
+        Return a snapshot of cache statistics.
+        
+        Returns:
+            Dictionary with lookups, hits, hit rate and evictions
+        """
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / max(1, self.lookups),
+            "evictions": self.evictions,
+        }
+    
+    def report(self):
+        """Print a summary of the cache statistics."""
+        s = self.stats()
+        print(f"♻ Result cache: {s['hits']}/{s['lookups']} frames reused ({100 * s['hit_rate']:.0f}%) | "
+              f"{s['evictions']} evictions | tolerance {self.tolerance:g}")
@@ -0,0 +1,204 @@
+import os
+
+import cv2
+import numpy as np
+
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+LANDMARK_EXTENSIONS = (".npz",)
+LANDMARK_LOG_EXTENSIONS = (".lmk",)
+
+
+class CameraSource:
+    """
+    Live webcam source (thin wrapper around cv2.VideoCapture).
+    """
+    
+    def __init__(self, index=0, width=1280, height=720):
+        """
+        Open a camera.
+        
+        Args:
+            index: Camera index passed to cv2.VideoCapture
+            width: Requested capture width
+            height: Requested capture height
+        """
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.live = True
+    
+    def isOpened(self):
+        """Return True if the camera was opened."""
+        return self.cap.isOpened()
+    
+    def read(self, image=None):
+        """
+        Read the next frame as (success, image).
+        
+        Args:
+            image: Optional preallocated buffer the frame is decoded into
+        """
+        if image is not None:
+            return self.cap.read(image)
+        return self.cap.read()
+    
+    def set(self, prop, value):
+        """Set a cv2.CAP_PROP_* capture property."""
+        return self.cap.set(prop, value)
+    
+    def finished(self):
+        """Return True once every frame was read; a camera never runs out, so a failed read is an error."""
+        return False
+    
+    def release(self):
+        """Release the capture device."""
+        self.cap.release()
+
+
+class VideoFileSource(CameraSource):
+    """
+    Frames decoded from a video file.
+    """
+    
+    def __init__(self, path):
+        """
+        Open a video file.
+        
+        Args:
+            path: Path to the video file
+        """
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.live = False
+    
+    def finished(self):
+        """Return True once every frame of the file was read (or its length is unknown)."""
+        total = self.cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        return total <= 0 or self.cap.get(cv2.CAP_PROP_POS_FRAMES) >= total
+
+
+class ImageDirectorySource:
+    """
+    Frames read from the image files of a directory, in name order.
+    """
+    
+    def __init__(self, path):
+        """
+        Index the images of a directory.
+        
+        Args:
+            path: Directory containing the frames
+        """
+        self.path = path
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.position = 0
+        self.live = False
+    
+    def isOpened(self):
+        """Return True if the directory contains at least one image."""
+        return len(self.files) > 0
+    
+    def read(self, image=None):
+        """
+        Read the next image as (success, image).
+        
+        Args:
+            image: Ignored (image files are always decoded into a new array)
+        """
+        while self.position < len(self.files):
+            img = cv2.imread(self.files[self.position])
+            self.position += 1
+            if img is not None:
+                return True, img
+        return False, None
+    
+    def set(self, prop, value):
+        """Capture properties do not apply to image directories."""
+        return False
+    
+    def finished(self):
+        """Return True once every image was read."""
+        return self.position >= len(self.files)
+    
+    def release(self):
+        """Stop reading images."""
+        self.position = len(self.files)
+
+
+class LandmarkStreamSource:
+    """
+    Recorded hand landmarks, replayed without running MediaPipe.
+    
+    The stream is an .npz file with:
+    - landmarks: float array (N, 21, 3) in pixel units
+    - valid: bool array (N,), False for frames without a hand
+    - timestamps: optional float array (N,) in seconds
+    """
+    
+    def __init__(self, path):
+        """
+        Load a landmark stream.
+        
+        Args:
+            path: Path to the .npz file
+        """
+        self.path = path
+        data = np.load(path)
+        self.landmarks = data["landmarks"]
+        self.valid = data["valid"] if "valid" in data else np.ones(len(self.landmarks), dtype=bool)
+        self.timestamps = data["timestamps"] if "timestamps" in data else None
+        self.position = 0
+        self.live = False
+    
+    def isOpened(self):
+        """Return True if the stream contains at least one frame."""
+        return len(self.landmarks) > 0
+    
+    def read_landmarks(self):
+        """
+        Read the next recorded frame.
+        
+        Returns:
+            Tuple of (success, landmarks) where landmarks is a (21, 3) array or None if no hand
+        """
+        if self.position >= len(self.landmarks):
+            return False, None
+        i = self.position
+        self.position += 1
+        return True, (self.landmarks[i] if self.valid[i] else None)
+    
+    def release(self):
+        """Stop reading the stream."""
+        self.position = len(self.landmarks)
+
+
+def open_source(spec, width=1280, height=720):
+    """
+    Open a frame source from a command line style specification.
+    
+    Args:
+        spec: Camera index (int or digit string), video file, image directory,
+              .npz landmark stream or .lmk landmark log
+        width: Requested capture width for cameras
+        height: Requested capture height for cameras
+    
+    Returns:
+        A source object with isOpened()/read()/release() (read_landmarks() for landmark streams)
+    """
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), width, height)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec)
+    if spec.lower().endswith(LANDMARK_LOG_EXTENSIONS):
+        from landmark_log import LandmarkLog
+        return LandmarkLog(spec)
+    if spec.lower().endswith(LANDMARK_EXTENSIONS):
+        return LandmarkStreamSource(spec)
+    if spec.lower().endswith(VIDEO_EXTENSIONS):
+        return VideoFileSource(spec)
+    raise ValueError(f"Unsupported frame source: {spec}")
@@ -0,0 +1,255 @@
+import json
+import os
+import time
+
+import numpy as np
+
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
+
+# Bit of each finger in a finger mask: thumb, index, middle, ring, pinky
+FINGER_BITS = np.array([1, 2, 4, 8, 16], dtype=np.int64)
+
+# MediaController methods a gesture may trigger, with their on-screen guide names
+ACTIONS = {
+    "play": "Play",
+    "pause": "Pause",
+    "toggle_play_pause": "Play/Pause",
+    "skip_forward": "Forward",
+    "skip_backward": "Rewind",
+    "volume_up": "Vol+",
+    "volume_down": "Vol-",
+}
+
+# Actions whose MediaController method takes a repeat count
+COUNTED_ACTIONS = {"skip_forward", "skip_backward"}
+
+# Swipes from trajectory.SwipeDetector (main.py --swipes) are dispatched like gestures
+# under these names. Their default actions can be overridden in the gestures file.
+SWIPE_ACTIONS = {
+    "SWIPE_RIGHT": "skip_forward",
+    "SWIPE_LEFT": "skip_backward",
+}
+
+
+def finger_mask(fingers):
+    """
+    Pack extended-finger flags into a bitmask.
+    
+    Args:
+        fingers: Boolean array of shape (5,) or (N, 5) from classify_fingers()
+    
+    Returns:
+        int (0-31) for one hand, int array for a batch
+    """
+    masks = np.asarray(fingers, dtype=np.int64) @ FINGER_BITS
+    return int(masks) if np.ndim(masks) == 0 else masks
+
+
+def pattern_masks(pattern):
+    """
+    Expand one "fingers" entry of the config into the bitmasks it matches.
+    
+    Args:
+        pattern: Finger count (int), or a 5-character string over thumb..pinky
+                 with "1" = extended, "0" = folded, "x" = either
+    
+    Returns:
+        List of matching bitmasks
+    """
+    if isinstance(pattern, int):
+        return [mask for mask in range(32) if bin(mask).count("1") == pattern]
+    pattern = str(pattern).lower()
+    if len(pattern) != 5 or set(pattern) - set("01x"):
+        raise ValueError(f"Invalid finger pattern {pattern!r}: expected 5 characters of 0, 1 or x")
+    return [
+        mask for mask in range(32)
+        if all(c == "x" or int(c) == (mask >> bit) & 1 for bit, c in enumerate(pattern))
+    ]
+
+
+def load_config(path):
+    """
+    Read a gesture config file (.json, .toml, or .yaml/.yml if PyYAML is installed).
+    
+    Args:
+        path: Config file path
+    
+    Returns:
+        Config dictionary
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".toml":
+        import tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    if ext in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML gesture configs need PyYAML (pip install pyyaml)")
+        with open(path) as f:
+            return yaml.safe_load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+class GestureAction:
+    """
+    The compiled action of one gesture.
+    """
+    
+    def __init__(self, method, cooldown, unless_state=None, message=None):
+        """
+        Initialize the action.
+        
+        Args:
+            method: MediaController method name
+            cooldown: Minimum seconds since the previous command (of any gesture) before this one may run
+            unless_state: Skip the action while the controller is in this state
+            message: Printed after the command was sent
+        """
+        self.method = method
+        self.cooldown = cooldown
+        self.unless_state = unless_state
+        self.message = message
+
+
+class GestureMap:
+    """
+    Gesture definitions compiled into lookup tables.
+    
+    Which fingers are up (a 5-bit mask) indexes a 32-entry table of gesture
+    names, and each gesture name maps to its action, so classifying and
+    dispatching a frame is a constant-time lookup. Finger patterns given as
+    strings take precedence over finger counts; otherwise the first gesture
+    listed wins.
+    """
+    
+    def __init__(self, config):
+        """
+        Compile a config dictionary.
+        
+        Args:
+            config: Dictionary with "gestures" (name -> definition) and an optional default "cooldown"
+        """
+        cooldown = float(config.get("cooldown", 2.5))
+        self.last_time = float("-inf")  # When the last command was sent
+        self.gestures = config["gestures"]
+        self.names = ["UNKNOWN"] + list(self.gestures)
+        self.table = np.zeros(32, dtype=np.int64)  # Finger mask -> index into self.names
+        self.actions = {}
+        self.confirm_times = {}
+        
+        claimed = {}
+        for exact in (False, True):
+            for index, (name, spec) in enumerate(self.gestures.items(), start=1):
+                for pattern in spec.get("fingers", []):
+                    if isinstance(pattern, int) == exact:
+                        continue
+                    for mask in pattern_masks(pattern):
+                        if claimed.get(mask) == exact:
+                            continue  # An earlier gesture of the same precedence owns this mask
+                        claimed[mask] = exact
+                        self.table[mask] = index
+        self.lookup = [self.names[i] for i in self.table]
+        
+        for name, spec in self.gestures.items():
+            if "confirm" in spec:
+                self.confirm_times[name] = float(spec["confirm"])
+            method = spec.get("action")
+            if method is None:
+                continue
+            if method not in ACTIONS:
+                raise ValueError(f"Gesture {name}: unknown action {method!r} (expected one of {', '.join(ACTIONS)})")
+            self.actions[name] = GestureAction(method, float(spec.get("cooldown", cooldown)),
+                                               spec.get("unless_state"), spec.get("message"))
+        for name, method in SWIPE_ACTIONS.items():
+            if name not in self.gestures:
+                self.actions[name] = GestureAction(method, cooldown)
+    
+    def gesture(self, fingers):
+        """
+        Look up the gesture of one hand.
+        
+        Args:
+            fingers: Boolean array of shape (5,) from classify_fingers()
+        
+        Returns:
+            Gesture name, "UNKNOWN" if no gesture matches
+        """
+        return self.lookup[finger_mask(fingers)]
+    
+    def gestures_for(self, fingers):
+        """
+        Look up the gestures of a batch of hands.
+        
+        Args:
+            fingers: Boolean array of shape (N, 5)
+        
+        Returns:
+            Array of gesture indices into self.names
+        """
+        return self.table[finger_mask(fingers)]
+    
+    def dispatch(self, controller, gesture, now=None, count=1):
+        """
+        Run the action of a confirmed gesture.
+        
+        Args:
+            controller: MediaController instance
+            gesture: Confirmed gesture name (or a SWIPE_ACTIONS name)
+            now: Current time in seconds (defaults to time.monotonic())
+            count: Number of repeats for the skip actions (e.g. the steps of a fast swipe);
+                   other actions run once
+        
+        Returns:
+            True if a command was sent, False otherwise
+        """
+        action = self.actions.get(gesture)
+        if action is None:
+            return False
+        if action.unless_state is not None and controller.current_state == action.unless_state:
+            return False
+        now = time.monotonic() if now is None else now
+        if now - self.last_time < action.cooldown:
+            return False
+        method = getattr(controller, action.method)
+        if not (method(count=count) if action.method in COUNTED_ACTIONS else method()):
+            return False
+        self.last_time = now
+        if action.message:
+            print(f"\n{action.message}")
+        return True
+    
+    def action_labels(self):
+        """Return gesture name -> upper-case action name (e.g. "PAUSE"), for the on-screen status."""
+        return {name: ACTIONS[action.method].upper() for name, action in self.actions.items()}
+    
+    def guide_text(self):
+        """Return the one-line gesture guide shown at the bottom of the frame."""
+        parts = [f"{spec.get('label', name)}={ACTIONS[spec['action']]}"
+                 for name, spec in self.gestures.items() if spec.get("action") in ACTIONS]
+        return "Gestures: " + " | ".join(parts + ["Q=Quit"])
+    
+    def describe(self):
+        """Return one "label (fingers) -> action" line per gesture, for the startup banner."""
+        lines = []
+        for name, spec in self.gestures.items():
+            fingers = ", ".join(str(p) for p in spec.get("fingers", []))
+            action = ACTIONS.get(spec.get("action"), "-")
+            lines.append(f"{name.replace('_', ' ')} ({fingers})".ljust(40) + f"→ {action.upper()}")
+        return lines
+
+
+def load_gesture_map(path=None):
+    """
+    Load and compile a gesture config.
+    
+    Args:
+        path: Config file, None for the bundled gestures.json
+    
+    Returns:
+        GestureMap instance
+    """
+    return GestureMap(load_config(path or DEFAULT_CONFIG))
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Learned gesture classifier over hand landmarks.
+
+A small two-layer perceptron (pure NumPy) classifies normalized 21-point
+landmarks straight into gesture names, as an alternative to the
+hand-tuned finger rules. Landmarks are moved to the wrist, rotated so the
+wrist-to-middle-knuckle direction points up and scaled by its length, so
+the model does not depend on distance to the camera or hand tilt; training
+adds mirrored copies so left and right hands are handled alike.
+
+Training data are benchmark manifests (see benchmark.py) whose clips are
+landmark recordings (.lmk logs from main.py --record, or .npz streams).
+
+Usage:
+    python gesture_model.py train manifest.json --output gesture_model.npz
+    python gesture_model.py evaluate test_manifest.json --model gesture_model.npz
+    python main.py --model gesture_model.npz
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from frame_sources import open_source
+from gesture_map import load_gesture_map
+from hand_detector import MIDDLE_MCP, WRIST, classify_fingers
+
+
+MODEL_VERSION = 1
+FEATURES = 60  # 20 landmarks (the wrist is the origin) x (x, y, z)
+
+
+def normalize_landmarks(landmarks):
+    """
+    Turn landmarks into position, rotation and scale independent features.
+    
+    Args:
+        landmarks: Array of shape (21, 3) or (N, 21, 3) in any consistent unit
+    
+    Returns:
+        float32 array of shape (N, 60)
+    """
+    lm = np.asarray(landmarks, dtype=np.float32).reshape(-1, 21, 3)
+    rel = lm[:, 1:] - lm[:, WRIST:WRIST + 1]
+    ax = rel[:, MIDDLE_MCP - 1, 0]
+    ay = rel[:, MIDDLE_MCP - 1, 1]
+    length = np.maximum(np.hypot(ax, ay), 1e-6)
+    # Rotation taking the wrist -> middle knuckle direction to straight up (-y), divided by its length
+    c = (-ay / length / length)[:, np.newaxis]
+    s = (-ax / length / length)[:, np.newaxis]
+    x = rel[..., 0]
+    y = rel[..., 1]
+    features = np.empty((len(lm), 20, 3), dtype=np.float32)
+    features[..., 0] = c * x - s * y
+    features[..., 1] = s * x + c * y
+    features[..., 2] = rel[..., 2] / length[:, np.newaxis]
+    return features.reshape(len(lm), FEATURES)
+
+
+def mirror_features(features):
+    """Return the features of the mirror-image hands (x negated)."""
+    mirrored = features.reshape(-1, 20, 3).copy()
+    mirrored[..., 0] *= -1
+    return mirrored.reshape(-1, FEATURES)
+
+
+class GestureClassifier:
+    """
+    Two-layer perceptron (ReLU hidden layer, softmax output) over
+    normalized landmarks. Standardization is folded into the first layer,
+    so a prediction is two small matrix products.
+    """
+    
+    def __init__(self, classes, mean, std, w1, b1, w2, b2, min_confidence=0.5):
+        """
+        Initialize a trained model.
+        
+        Args:
+            classes: Gesture names, one per output
+            mean: Feature means used for standardization (60,)
+            std: Feature standard deviations (60,)
+            w1, b1: Hidden layer weights (60, H) and biases (H,)
+            w2, b2: Output layer weights (H, K) and biases (K,)
+            min_confidence: Below this class probability the gesture is "UNKNOWN"
+        """
+        self.classes = list(classes)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.w1 = np.asarray(w1, dtype=np.float32)
+        self.b1 = np.asarray(b1, dtype=np.float32)
+        self.w2 = np.asarray(w2, dtype=np.float32)
+        self.b2 = np.asarray(b2, dtype=np.float32)
+        self.min_confidence = min_confidence
+        # (x - mean) / std @ w1 + b1  ==  x @ (w1 / std) + (b1 - (mean / std) @ w1)
+        self.folded_w1 = self.w1 / self.std[:, np.newaxis]
+        self.folded_b1 = self.b1 - (self.mean / self.std) @ self.w1
+        self.names = np.array(self.classes + ["UNKNOWN"], dtype=object)
+    
+    @classmethod
+    def train(cls, landmarks, labels, hidden=32, epochs=200, batch_size=256, learning_rate=0.01,
+              weight_decay=1e-4, mirror=True, seed=0, min_confidence=0.5):
+        """
+        Fit a model to labelled landmarks.
+        
+        Args:
+            landmarks: Array of shape (N, 21, 3)
+            labels: N gesture names
+            hidden: Hidden layer size
+            epochs: Passes over the training data
+            batch_size: Samples per gradient step
+            learning_rate: Adam step size
+            weight_decay: L2 penalty on the weights
+            mirror: Also train on mirrored copies, so both hands are learned from either
+            seed: Random seed (training is deterministic for a given seed)
+            min_confidence: See __init__
+        
+        Returns:
+            GestureClassifier instance
+        """
+        classes = sorted(set(labels))
+        index = {name: i for i, name in enumerate(classes)}
+        y = np.array([index[label] for label in labels], dtype=np.int64)
+        x = normalize_landmarks(landmarks)
+        if mirror:
+            x = np.concatenate([x, mirror_features(x)])
+            y = np.concatenate([y, y])
+        
+        mean = x.mean(axis=0)
+        std = np.maximum(x.std(axis=0), 1e-3)
+        x = (x - mean) / std
+        
+        rng = np.random.default_rng(seed)
+        params = [
+            rng.normal(0, np.sqrt(2.0 / FEATURES), (FEATURES, hidden)).astype(np.float32),
+            np.zeros(hidden, dtype=np.float32),
+            rng.normal(0, np.sqrt(1.0 / hidden), (hidden, len(classes))).astype(np.float32),
+            np.zeros(len(classes), dtype=np.float32),
+        ]
+        moments = [np.zeros_like(p) for p in params]
+        velocities = [np.zeros_like(p) for p in params]
+        step = 0
+        for _ in range(epochs):
+            order = rng.permutation(len(x))
+            for start in range(0, len(x), batch_size):
+                batch = order[start:start + batch_size]
+                xb, yb = x[batch], y[batch]
+                w1, b1, w2, b2 = params
+                
+                # Forward pass
+                h = np.maximum(xb @ w1 + b1, 0.0)
+                logits = h @ w2 + b2
+                logits -= logits.max(axis=1, keepdims=True)
+                p = np.exp(logits)
+                p /= p.sum(axis=1, keepdims=True)
+                
+                # Backward pass of the mean cross-entropy
+                p[np.arange(len(yb)), yb] -= 1.0
+                p /= len(yb)
+                grad_w2 = h.T @ p + weight_decay * w2
+                grad_b2 = p.sum(axis=0)
+                dh = (p @ w2.T) * (h > 0)
+                grad_w1 = xb.T @ dh + weight_decay * w1
+                grad_b1 = dh.sum(axis=0)
+                
+                # Adam update
+                step += 1
+                for param, grad, m, v in zip(params, (grad_w1, grad_b1, grad_w2, grad_b2), moments, velocities):
+                    m *= 0.9
+                    m += 0.1 * grad
+                    v *= 0.999
+                    v += 0.001 * grad * grad
+                    m_hat = m / (1 - 0.9 ** step)
+                    v_hat = v / (1 - 0.999 ** step)
+                    param -= learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)
+        
+        return cls(classes, mean, std, *params, min_confidence=min_confidence)
+    
+    def predict_proba(self, landmarks):
+        """
+        Class probabilities of one or many hands.
+        
+        Args:
+            landmarks: Array of shape (21, 3) or (N, 21, 3)
+        
+        Returns:
+            float32 array of shape (N, K), columns in the order of self.classes
+        """
+        h = np.maximum(normalize_landmarks(landmarks) @ self.folded_w1 + self.folded_b1, 0.0)
+        logits = h @ self.w2 + self.b2
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        return p / p.sum(axis=1, keepdims=True)
+    
+    def predict_indices(self, landmarks):
+        """
+        Classify a batch of hands.
+        
+        Args:
+            landmarks: Array of shape (N, 21, 3)
+        
+        Returns:
+            int array of indices into self.names; len(self.classes) means "UNKNOWN"
+        """
+        h = np.maximum(normalize_landmarks(landmarks) @ self.folded_w1 + self.folded_b1, 0.0)
+        logits = h @ self.w2 + self.b2
+        best = logits.argmax(axis=1)
+        if self.min_confidence > 0:
+            # max softmax probability = 1 / sum(exp(logits - max))
+            top = logits[np.arange(len(best)), best][:, np.newaxis]
+            confidence = 1.0 / np.exp(logits - top).sum(axis=1)
+            best[confidence < self.min_confidence] = len(self.classes)
+        return best
+    
+    def predict(self, landmarks):
+        """
+        Classify one hand (the per-frame path, with as few NumPy calls as possible).
+        
+        Args:
+            landmarks: Array of shape (21, 3)
+        
+        Returns:
+            Gesture name, "UNKNOWN" if the model is not confident enough
+        """
+        lm = np.asarray(landmarks, dtype=np.float32)
+        rel = lm[1:] - lm[WRIST]
+        ax, ay = rel[MIDDLE_MCP - 1, :2].tolist()
+        length_sq = max(ax * ax + ay * ay, 1e-12)
+        c, s = -ay / length_sq, -ax / length_sq
+        # Same rotation and scaling as normalize_landmarks(), as one 3x3 product
+        transform = np.array([[c, s, 0.0], [-s, c, 0.0], [0.0, 0.0, length_sq ** -0.5]], dtype=np.float32)
+        h = (rel @ transform).reshape(FEATURES) @ self.folded_w1 + self.folded_b1
+        logits = np.maximum(h, 0.0, out=h) @ self.w2 + self.b2
+        best = int(logits.argmax())
+        if self.min_confidence > 0 and 1.0 / np.exp(logits - logits[best]).sum() < self.min_confidence:
+            return "UNKNOWN"
+        return self.classes[best]
+    
+    def predict_batch(self, landmarks):
+        """
+        Classify many hands.
+        
+        Args:
+            landmarks: Array of shape (N, 21, 3)
+        
+        Returns:
+            List of N gesture names
+        """
+        return self.names[self.predict_indices(landmarks)].tolist()
+    
+    def save(self, path):
+        """
+        Write the model to an .npz file.
+        
+        Args:
+            path: Output file path
+        """
+        np.savez(path, version=MODEL_VERSION, classes=np.array(self.classes), mean=self.mean, std=self.std,
+                 w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2, min_confidence=self.min_confidence)
+
+
+def load_classifier(path):
+    """
+    Load a model written by GestureClassifier.save().
+    
+    Args:
+        path: Model file path
+    
+    Returns:
+        GestureClassifier instance
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != MODEL_VERSION:
+            raise ValueError(f"{path} is not a version {MODEL_VERSION} gesture model")
+        return GestureClassifier(data["classes"].tolist(), data["mean"], data["std"], data["w1"], data["b1"],
+                                 data["w2"], data["b2"], float(data["min_confidence"]))
+
+
+def load_dataset(manifest_path):
+    """
+    Collect the labelled hands of every landmark clip in a benchmark manifest.
+    
+    Args:
+        manifest_path: Path to the JSON manifest
+    
+    Returns:
+        Tuple of (landmarks, labels, clip_ids): (N, 21, 3) array, N gesture names and the
+        manifest index of each sample's clip. Frames without a hand or labelled
+        "", "-" or "NO_HAND" are left out.
+    """
+    from benchmark import load_labels  # benchmark.py imports this module for --model
+    
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    
+    landmarks, labels, clip_ids = [], [], []
+    for clip_id, clip in enumerate(manifest["clips"]):
+        source = open_source(os.path.join(base_dir, clip["source"]))
+        if not hasattr(source, "read_landmarks"):
+            print(f"⚠ Skipping {clip['source']}: not a landmark recording (record it with main.py --record)")
+            source.release()
+            continue
+        fixed_label, frame_labels = load_labels(clip, base_dir)
+        frame = 0
+        while True:
+            success, lm = source.read_landmarks()
+            if not success:
+                break
+            label = fixed_label if frame_labels is None else (frame_labels[frame] if frame < len(frame_labels) else "")
+            frame += 1
+            if lm is None or label in ("", "-", "NO_HAND"):
+                continue
+            landmarks.append(lm)
+            labels.append(label)
+            clip_ids.append(clip_id)
+        source.release()
+    
+    return np.asarray(landmarks, dtype=np.float32).reshape(-1, 21, 3), labels, np.asarray(clip_ids)
+
+
+def evaluate(classifier, landmarks, labels, gesture_map=None):
+    """
+    Compare the model with the finger rules on labelled hands.
+    
+    Args:
+        classifier: GestureClassifier instance
+        landmarks: Array of shape (N, 21, 3)
+        labels: N gesture names
+        gesture_map: GestureMap for the rule-based baseline (default: the bundled gestures.json)
+    
+    Returns:
+        Dictionary with the accuracy of both, per-gesture model recall and
+        the model's cost per frame (single and batched) in microseconds
+    """
+    gesture_map = gesture_map or load_gesture_map()
+    labels = np.asarray(labels, dtype=object)
+    rules = np.asarray(gesture_map.names, dtype=object)[gesture_map.gestures_for(classify_fingers(landmarks))]
+    model = np.asarray(classifier.predict_batch(landmarks), dtype=object)
+    
+    # Timing: one hand per call (live use) and the whole set in one call (offline)
+    sample = landmarks[:min(len(landmarks), 2000)]
+    start = time.perf_counter()
+    for lm in sample:
+        classifier.predict(lm)
+    single_us = (time.perf_counter() - start) / max(len(sample), 1) * 1e6
+    start = time.perf_counter()
+    classifier.predict_batch(landmarks)
+    batch_us = (time.perf_counter() - start) / max(len(landmarks), 1) * 1e6
+    
+    return {
+        "samples": len(labels),
+        "rules_accuracy": float((rules == labels).mean()) if len(labels) else 0.0,
+        "model_accuracy": float((model == labels).mean()) if len(labels) else 0.0,
+        "model_recall": {name: float((model[labels == name] == name).mean()) for name in sorted(set(labels))},
+        "single_us": single_us,
+        "batch_us": batch_us,
+    }
+
+
+def print_evaluation(result):
+    """Print the output of evaluate()."""
+    print(f"Samples: {result['samples']}")
+    print(f"  Finger rules accuracy: {result['rules_accuracy'] * 100:.1f}%")
+    print(f"  Model accuracy:        {result['model_accuracy'] * 100:.1f}%")
+    for name, recall in result["model_recall"].items():
+        print(f"    {name:15} recall {recall * 100:5.1f}%")
+    print(f"  Model cost: {result['single_us']:.1f} us/frame single, {result['batch_us']:.2f} us/frame batched")
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Train and evaluate the learned gesture classifier.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="train a model on the landmark clips of a manifest")
+    train.add_argument("manifest")
+    train.add_argument("--output", default="gesture_model.npz", help="model file to write")
+    train.add_argument("--hidden", type=int, default=32, help="hidden layer size")
+    train.add_argument("--epochs", type=int, default=200)
+    train.add_argument("--learning-rate", type=float, default=0.01)
+    train.add_argument("--min-confidence", type=float, default=0.5,
+                       help="report UNKNOWN below this class probability")
+    train.add_argument("--validation", type=float, default=0.2, metavar="FRACTION",
+                       help="hold out the last part of every clip for validation (0 = none)")
+    train.add_argument("--seed", type=int, default=0)
+    train.add_argument("--gestures", default=None, metavar="FILE",
+                       help="gesture definitions for the rule-based comparison")
+    test = sub.add_parser("evaluate", help="compare a model with the finger rules on a manifest")
+    test.add_argument("manifest")
+    test.add_argument("--model", default="gesture_model.npz")
+    test.add_argument("--gestures", default=None, metavar="FILE",
+                      help="gesture definitions for the rule-based comparison")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the classifier tool from the command line."""
+    args = parse_args(argv)
+    landmarks, labels, clip_ids = load_dataset(args.manifest)
+    if len(labels) == 0:
+        print("❌ No labelled hands found in the manifest's landmark clips")
+        return 1
+    gesture_map = load_gesture_map(args.gestures)
+    
+    if args.command == "evaluate":
+        print_evaluation(evaluate(load_classifier(args.model), landmarks, labels, gesture_map))
+        return 0
+    
+    # Validation uses the tail of each clip, so it is never a neighbour of a training frame
+    held_out = np.zeros(len(labels), dtype=bool)
+    if args.validation > 0:
+        for clip_id in np.unique(clip_ids):
+            rows = np.flatnonzero(clip_ids == clip_id)
+            held_out[rows[int(len(rows) * (1 - args.validation)):]] = True
+    train_rows = np.flatnonzero(~held_out)
+    labels = np.asarray(labels, dtype=object)
+    
+    start = time.perf_counter()
+    classifier = GestureClassifier.train(landmarks[train_rows], labels[train_rows].tolist(),
+                                         hidden=args.hidden, epochs=args.epochs,
+                                         learning_rate=args.learning_rate, seed=args.seed,
+                                         min_confidence=args.min_confidence)
+    print(f"Trained on {len(train_rows)} hands ({', '.join(classifier.classes)}) "
+          f"in {time.perf_counter() - start:.1f} s")
+    classifier.save(args.output)
+    print(f"💾 Model written to {args.output}")
+    
+    if held_out.any():
+        print("Validation:")
+        print_evaluation(evaluate(classifier, landmarks[held_out], labels[held_out].tolist(), gesture_map))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import time
+
+import cv2
+
+from pipeline import LatencyTracker
+
+
+# Operating points from best quality to cheapest:
+# (inference width in pixels, frame rate limit, MediaPipe model complexity, OpenCV threads).
+# A width of None keeps the detector's own setting, a frame rate of None runs unpaced
+# and 0 threads leaves OpenCV at its default.
+LEVELS = [
+    (None, None, 1, 0),
+    (960, 30, 1, 0),
+    (640, 30, 1, 2),
+    (640, 20, 1, 2),
+    (640, 20, 0, 1),
+    (480, 15, 0, 1),
+    (320, 10, 0, 1),
+]
+
+
+class ResourceGovernor:
+    """
+    Keeps the detection loop within a CPU or frame-time budget, so a media
+    player on the same machine keeps enough CPU for smooth playback.
+    
+    Every `interval` seconds the process CPU use and the p95 frame cost
+    (detection and classification, without the wait for the camera) are
+    compared with the budget. Over budget, the
+    governor steps down to the next cheaper operating point in `levels`;
+    well under it (below `headroom` of the budget), it steps back up. A step
+    down is only taken if the resulting gesture latency, one frame interval
+    plus the measured capture-to-dispatch latency, stays within
+    `latency_slo`, and when the latency itself breaks the SLO the governor
+    steps up whatever the budget says. After a change it waits `dwell`
+    seconds for the measurements to settle, and a level that was over
+    budget is not retried for `backoff` seconds, doubling every time it
+    turns out to be over budget again.
+    
+    New settings are applied by begin_frame() on the thread that runs
+    detection, which also paces that thread to the frame rate limit
+    instead of letting it spin flat out. A live camera keeps filling its
+    buffer while the thread sleeps, so a frame read after the sleep would
+    be old: camera loops read every frame instead and only process the
+    ones take_slot() lets through.
+    
+    The thread setting only changes OpenCV's thread pool (cv2.setNumThreads);
+    the threads MediaPipe/TFLite use for inference are not affected.
+    """
+    
+    def __init__(self, cpu_budget=None, frame_budget=None, latency_slo=0.25, interval=1.0, dwell=3.0,
+                 backoff=30.0, headroom=0.7, levels=None, level=0):
+        """
+        Initialize the governor.
+        
+        Args:
+            cpu_budget: Target process CPU use in percent of one core, None for no CPU budget
+            frame_budget: Target p95 frame cost in seconds, None for no frame-time budget
+            latency_slo: Largest acceptable gesture latency in seconds
+            interval: Seconds between decisions
+            dwell: Seconds after a change before the next decision
+            backoff: Seconds before stepping back up into a level that was over budget the first time
+            headroom: Fraction of the budget below which the governor steps up
+            levels: Operating points from best to cheapest (default: LEVELS)
+            level: Index of the starting operating point
+        """
+        self.cpu_budget = cpu_budget
+        self.frame_budget = frame_budget
+        self.latency_slo = latency_slo
+        self.interval = interval
+        self.dwell = dwell
+        self.backoff = backoff
+        self.headroom = headroom
+        self.levels = list(levels or LEVELS)
+        self.level = level  # Level chosen by the governor
+        self.applied = None  # Level currently applied to the detector
+        self.base_width = None  # Detector's own inference width, kept for levels without one
+        
+        self.costs = LatencyTracker()
+        self.latencies = LatencyTracker()
+        self.window_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.cpu_percent = 0.0
+        self.changed_at = float("-inf")
+        self.retry_at = {}  # Level -> time it may be tried again
+        self.failures = {}  # Level -> times it was left for being over budget
+        self.next_frame = 0.0
+        self.changes = 0
+        self.rebuild_time = 0.0  # Seconds spent rebuilding MediaPipe for model changes
+    
+    def operating_point(self, level=None):
+        """
+        Describe an operating point.
+        
+        Args:
+            level: Level index (default: the current one)
+        
+        Returns:
+            Dictionary with inference_width (None = full frames), fps (None = unpaced),
+            model_complexity and threads (0 = OpenCV default)
+        """
+        width, fps, complexity, threads = self.levels[self.level if level is None else level]
+        if width is None:
+            width = self.base_width
+        elif self.base_width:
+            width = min(width, self.base_width)
+        return {"inference_width": width, "fps": fps, "model_complexity": complexity, "threads": threads}
+    
+    def begin_frame(self, detector, wait=True):
+        """
+        Apply the chosen operating point and wait for the next frame slot.
+        Call from the detection thread before reading each frame.
+        
+        Args:
+            detector: HandDetector the settings are applied to
+            wait: Sleep until the next frame slot. Pass False for a live camera,
+                  and call take_slot() once the frame has been read instead
+        """
+        if self.applied != self.level:
+            self._apply(detector, self.level)
+        
+        if wait:
+            now = time.perf_counter()
+            if now < self.next_frame:
+                time.sleep(self.next_frame - now)
+            self.take_slot(max(now, self.next_frame))
+    
+    def take_slot(self, now=None):
+        """
+        Claim the current frame slot of the frame rate limit.
+        
+        Args:
+            now: Current time.perf_counter() value
+        
+        Returns:
+            True if a frame may be processed now, False if it should be dropped
+        """
+        fps = self.levels[self.applied][1]
+        if not fps:
+            return True
+        now = time.perf_counter() if now is None else now
+        interval = 1.0 / fps
+        # A little slack for camera timestamp jitter
+        if now < self.next_frame - 0.1 * interval:
+            return False
+        # Slots stay on a fixed grid, so a camera running faster than the limit is
+        # thinned out to the limit instead of to the next whole fraction of its rate
+        self.next_frame += interval
+        if self.next_frame <= now:
+            self.next_frame = now + interval
+        return True
+    
+    def _apply(self, detector, level):
+        """Configure the detector and OpenCV for a level."""
+        if self.applied is None:
+            self.base_width = detector.inference_width
+        point = self.operating_point(level)
+        detector.inference_width = point["inference_width"]
+        self.rebuild_time += detector.set_model_complexity(point["model_complexity"])
+        cv2.setNumThreads(point["threads"] or -1)
+        self.applied = level
+    
+    def gesture_latency(self, level, latency):
+        """
+        Estimate the gesture latency at a level.
+        
+        Args:
+            level: Level index
+            latency: Measured capture-to-dispatch latency in seconds
+        
+        Returns:
+            Frame interval of the level plus the latency, in seconds
+        """
+        fps = self.levels[level][1]
+        return (1.0 / fps if fps else 0.0) + latency
+    
+    def observe(self, packet, now=None):
+        """
+        Record the cost and latency of a handled frame, and adjust the operating point when due.
+        
+        Args:
+            packet: FramePacket that was just dispatched
+            now: Current time.perf_counter() value
+        """
+        now = time.perf_counter() if now is None else now
+        # Processing time only: the capture stage is mostly the blocking wait for the
+        # camera, which shrinks as processing gets cheaper and would hide the savings
+        self.costs.add(packet.inference_time)
+        self.latencies.add(now - packet.capture_time)
+        if now - self.window_start >= self.interval:
+            self._decide(now)
+    
+    def _decide(self, now):
+        """Measure CPU use over the last interval and step up or down if needed."""
+        cpu = time.process_time()
+        self.cpu_percent = 100.0 * (cpu - self.cpu_start) / (now - self.window_start)
+        self.window_start = now
+        self.cpu_start = cpu
+        if self.applied != self.level or now - self.changed_at < self.dwell or not self.costs.samples:
+            return
+        
+        cost = self.costs.percentile_ms(95) / 1000.0
+        latency = self.latencies.percentile_ms(95) / 1000.0
+        over = ((self.cpu_budget is not None and self.cpu_percent > self.cpu_budget)
+                or (self.frame_budget is not None and cost > self.frame_budget))
+        under = ((self.cpu_budget is None or self.cpu_percent < self.headroom * self.cpu_budget)
+                 and (self.frame_budget is None or cost < self.headroom * self.frame_budget))
+        cheaper = self.level + 1
+        better = self.level - 1
+        
+        if self.level > 0 and self.gesture_latency(self.level, latency) > self.latency_slo:
+            target = better
+        elif (over and cheaper < len(self.levels)
+                and self.gesture_latency(cheaper, latency) <= self.latency_slo):
+            failures = self.failures[self.level] = self.failures.get(self.level, 0) + 1
+            self.retry_at[self.level] = now + self.backoff * 2 ** min(failures - 1, 6)
+            target = cheaper
+        elif under and better >= 0 and now >= self.retry_at.get(better, float("-inf")):
+            target = better
+        else:
+            return
+        
+        self.level = target
+        self.changed_at = now
+        self.changes += 1
+        # Samples of the old level say nothing about the new one
+        self.costs = LatencyTracker()
+        self.latencies = LatencyTracker()
+    
+    def stats(self):
+        """
+        Return the current operating point and measurements.
+        
+        Returns:
+            Dictionary with the level, its settings, CPU use, p95 frame cost and latency, and changes
+        """
+        return dict(
+            self.operating_point(),
+            level=self.level,
+            cpu_percent=self.cpu_percent,
+            frame_p95_ms=self.costs.percentile_ms(95),
+            latency_p95_ms=self.latencies.percentile_ms(95),
+            changes=self.changes,
+            rebuild_seconds=self.rebuild_time,
+        )
+    
+    def export(self, metrics):
+        """
+        Publish the operating point as governor_* gauges.
+        
+        Args:
+            metrics: metrics.Metrics instance
+        """
+        for name, value in self.stats().items():
+            metrics.set(f"governor_{name}", 0 if value is None else value)
+    
+    def report(self):
+        """Print the current operating point."""
+        s = self.stats()
+        width = f"{s['inference_width']} px" if s["inference_width"] else "full frames"
+        fps = f"{s['fps']} FPS" if s["fps"] else "unpaced"
+        threads = f"{s['threads']} threads" if s["threads"] else "default threads"
+        budget = []
+        if self.cpu_budget is not None:
+            budget.append(f"CPU {s['cpu_percent']:.0f}%/{self.cpu_budget:g}%")
+        if self.frame_budget is not None:
+            budget.append(f"frame p95 {s['frame_p95_ms']:.1f}/{1000 * self.frame_budget:g} ms")
+        print(f"🎚 Governor level {s['level']}/{len(self.levels) - 1}: {width}, {fps}, "
+              f"model {s['model_complexity']}, {threads} | {' | '.join(budget)} | "
+              f"latency p95 {s['latency_p95_ms']:.0f} ms (SLO {1000 * self.latency_slo:g} ms) | "
+              f"{s['changes']} changes")
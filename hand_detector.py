@@ -1,6 +1,91 @@
 import cv2
-import mediapipe as mp
 import math
+import time
+import numpy as np
+
+
+# Landmark indices used by the finger classifier
+WRIST = 0
+THUMB_MCP, THUMB_IP, THUMB_TIP = 2, 3, 4
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+FINGER_TIPS = np.array([8, 12, 16, 20])  # Index, Middle, Ring, Pinky tips
+FINGER_PIPS = np.array([6, 10, 14, 18])  # PIP joints
+FINGER_MCPS = np.array([5, 9, 13, 17])   # MCP (knuckle) joints
+FINGER_NAMES = ["thumb", "index", "middle", "ring", "pinky"]
+
+# Classifier thresholds as fractions of hand scale (wrist to middle MCP distance).
+# At a typical 720p hand scale of ~150 px these match the old 25 px / -15 px / 30 px values.
+TIP_ABOVE_PIP = 0.17     # Tip must be this far above the PIP joint
+PIP_ABOVE_MCP = -0.10    # PIP may sit at most this far below the MCP joint
+THUMB_TIP_MARGIN = 0.20  # Thumb tip may sit at most this far below the palm base
+
+
+def classify_fingers(landmarks):
+    """
+    Compute which fingers are extended, vectorized over one or many hands.
+    
+    Args:
+        landmarks: Array of shape (21, 3) or (N, 21, 3) with (x, y, z) per landmark,
+                   in any consistent unit (pixels or normalized coordinates)
+    
+    Returns:
+        Boolean array of shape (5,) or (N, 5): thumb, index, middle, ring, pinky
+    """
+    lm = np.asarray(landmarks, dtype=np.float32)
+    x = lm[..., 0]
+    y = lm[..., 1]
+    
+    # Hand scale makes every threshold independent of distance to the camera
+    scale = np.hypot(x[..., MIDDLE_MCP] - x[..., WRIST], y[..., MIDDLE_MCP] - y[..., WRIST])
+    scale = np.maximum(scale, 1e-6)
+    palm_base_y = (y[..., WRIST] + y[..., MIDDLE_MCP]) / 2
+    
+    # THUMB - tip far from index MCP, extended sideways and not curled below the palm
+    palm_width = np.abs(x[..., INDEX_MCP] - x[..., WRIST])
+    thumb_to_index_dist = np.abs(x[..., THUMB_TIP] - x[..., INDEX_MCP])
+    thumb_extended_horizontally = np.abs(x[..., THUMB_TIP] - x[..., THUMB_MCP]) > palm_width * 0.5
+    thumb_up = ((thumb_to_index_dist > palm_width * 0.8)
+                & thumb_extended_horizontally
+                & (y[..., THUMB_TIP] < palm_base_y + THUMB_TIP_MARGIN * scale))
+    
+    # OTHER 4 FINGERS - tip well above PIP and PIP not folded below MCP
+    tip_y = y[..., FINGER_TIPS]
+    pip_y = y[..., FINGER_PIPS]
+    mcp_y = y[..., FINGER_MCPS]
+    scale = scale[..., np.newaxis]
+    fingers_up = ((pip_y - tip_y) > TIP_ABOVE_PIP * scale) & ((mcp_y - pip_y) > PIP_ABOVE_MCP * scale)
+    
+    return np.concatenate([thumb_up[..., np.newaxis], fingers_up], axis=-1)
+
+
+def gesture_from_count(finger_count):
+    """
+    Map an extended-finger count to a gesture name.
+    
+    Args:
+        finger_count: Number of extended fingers (0-5)
+    
+    Returns:
+        "OPEN_PALM", "CLOSED_FIST", "PEACE_SIGN", "THREE_FINGERS" or "UNKNOWN"
+    """
+    # Strict gesture classification to avoid confusion
+    if finger_count == 5:  # Exactly 5 fingers = open palm (PAUSE)
+        gesture = "OPEN_PALM"
+    elif finger_count == 4:  # 4 fingers also counts as open palm
+        gesture = "OPEN_PALM"
+    elif finger_count == 0:  # Exactly 0 fingers = closed fist (PLAY)
+        gesture = "CLOSED_FIST"
+    elif finger_count == 1:  # 1 finger also counts as closed fist
+        gesture = "CLOSED_FIST"
+    elif finger_count == 2:  # Exactly 2 fingers = peace sign (REWIND)
+        gesture = "PEACE_SIGN"
+    elif finger_count == 3:  # Exactly 3 fingers = forward sign
+        gesture = "THREE_FINGERS"
+    else:
+        gesture = "UNKNOWN"
+    
+    return gesture
 
 
 class HandDetector:
@@ -9,7 +94,9 @@ class HandDetector:
     Detects open palm (5 fingers) and closed fist (0 fingers).
     """
     
-    def __init__(self, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7):
+    def __init__(self, max_hands=1, detection_confidence=0.7, tracking_confidence=0.7,
+                 inference_width=None, roi_tracking=False, roi_padding=0.5, landmark_filter=None,
+                 mirror=False, gesture_map=None, classifier=None, model_complexity=1):
         """
         Initialize the hand detector.
         
@@ -17,17 +104,48 @@ class HandDetector:
             max_hands: Maximum number of hands to detect
             detection_confidence: Minimum confidence for hand detection
             tracking_confidence: Minimum confidence for hand tracking
+            inference_width: Downscale images wider than this (pixels) before inference,
+                             None to run inference at full resolution
+            roi_tracking: Once a hand is found, only process a padded crop around it
+            roi_padding: Padding added on each side of the hand box, as a fraction of its size
+            landmark_filter: Optional callable (landmarks, timestamp) -> landmarks applied before
+                             classification, e.g. stability.OneEuroFilter(); called with None when the hand is lost
+            mirror: Report landmarks and handedness as if the frame had been flipped horizontally,
+                    so unflipped frames can be used when nothing is displayed
+            gesture_map: Optional gesture_map.GestureMap deciding the gesture from which fingers are up
+                         (defaults to gesture_from_count)
+            classifier: Optional gesture_model.GestureClassifier naming the gesture from the landmarks
+                        instead of the finger rules (the finger count is still reported)
+            model_complexity: MediaPipe hand landmark model, 0 (lite, faster) or 1 (full)
         """
+        # Imported here: mediapipe takes seconds to load, and the classifier
+        # functions above (used by replay and benchmarks) do not need it
+        import mediapipe as mp
+        
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=max_hands,
-            min_detection_confidence=detection_confidence,
-            min_tracking_confidence=tracking_confidence
-        )
+        self.hands_options = {
+            "static_image_mode": False,
+            "max_num_hands": max_hands,
+            "min_detection_confidence": detection_confidence,
+            "min_tracking_confidence": tracking_confidence,
+        }
+        self.model_complexity = model_complexity
+        self.hands = self.mp_hands.Hands(model_complexity=model_complexity, **self.hands_options)
         self.mp_draw = mp.solutions.drawing_utils
         self.finger_tips = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky tips
         self.finger_pips = [2, 6, 10, 14, 18]  # PIP joints for comparison
+        self.results = None
+        self.landmarks = None  # (21, 3) landmark array of the last detected hand
+        self.inference_width = inference_width
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding
+        self.roi = None  # (x0, y0, x1, y1) crop in full-frame pixels, None = full-frame search
+        self.stage_times = {}  # Seconds spent per stage on the last frame
+        self.landmark_filter = landmark_filter
+        self.mirror = mirror
+        self.gesture_map = gesture_map
+        self.classifier = classifier
+        self.buffers = {}  # Reused resize/color conversion outputs, by name
         
     def find_hands(self, img, draw=True):
         """
@@ -40,142 +158,326 @@ class HandDetector:
         Returns:
             Processed image with landmarks (if draw=True)
         """
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(img_rgb)
+        h, w = img.shape[:2]
+        self.stage_times = {"convert": 0.0, "inference": 0.0}
+        
+        if self.roi is not None:
+            self.results = self._process_region(img, self.roi)
+            if not self.results.multi_hand_landmarks:
+                # Tracking lost - fall back to a full-frame search on the same frame
+                self.roi = None
+        
+        if self.roi is None:
+            self.results = self._process_region(img, (0, 0, w, h))
+        
+        if self.roi_tracking:
+            self._update_roi(w, h)
         
-        if self.results.multi_hand_landmarks and draw:
+        if draw:
+            self.draw_landmarks(img)
+        
+        if self.mirror:
+            self._mirror_results()
+        
+        return img
+    
+    def draw_landmarks(self, img):
+        """
+        Draw the hands of the last detection onto an image.
+        
+        Args:
+            img: Image to draw on (modified in place)
+        """
+        if self.results is not None and self.results.multi_hand_landmarks:
             for hand_landmarks in self.results.multi_hand_landmarks:
                 self.mp_draw.draw_landmarks(
                     img,
                     hand_landmarks,
                     self.mp_hands.HAND_CONNECTIONS
                 )
+    
+    def _mirror_results(self):
+        """Flip the current results horizontally (landmark x and the handedness labels)."""
+        for hand_landmarks in self.results.multi_hand_landmarks or []:
+            for lm in hand_landmarks.landmark:
+                lm.x = 1.0 - lm.x
+        for hand in self.results.multi_handedness or []:
+            for classification in hand.classification:
+                classification.label = {"Left": "Right", "Right": "Left"}.get(classification.label, classification.label)
+    
+    def _buffer(self, name, shape):
+        """
+        Return a reusable uint8 buffer, reallocating only when the shape changes.
         
-        return img
+        Args:
+            name: Buffer name
+            shape: Required shape
+        """
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self.buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buf
+    
+    def _process_region(self, img, region):
+        """
+        Run MediaPipe on a region of the image and map landmarks back to the full frame.
+        
+        Args:
+            img: Full input image (BGR format)
+            region: (x0, y0, x1, y1) crop in full-frame pixels
+        
+        Returns:
+            MediaPipe results with landmarks normalized to the full frame
+        """
+        h, w = img.shape[:2]
+        x0, y0, x1, y1 = region
+        crop = img[y0:y1, x0:x1]
+        crop_w = x1 - x0
+        crop_h = y1 - y0
+        
+        # Landmarks are normalized, so downscaling needs no coordinate correction
+        if self.inference_width and crop_w > self.inference_width:
+            scale = self.inference_width / crop_w
+            size = (self.inference_width, max(1, int(crop_h * scale)))
+            crop = cv2.resize(crop, size, dst=self._buffer("resized", (size[1], size[0], 3)),
+                              interpolation=cv2.INTER_AREA)
+        
+        start = time.perf_counter()
+        img_rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", crop.shape))
+        converted = time.perf_counter()
+        results = self.hands.process(img_rgb)
+        self.stage_times["convert"] += converted - start
+        self.stage_times["inference"] += time.perf_counter() - converted
+        
+        if results.multi_hand_landmarks and (crop_w, crop_h) != (w, h):
+            for hand_landmarks in results.multi_hand_landmarks:
+                for lm in hand_landmarks.landmark:
+                    lm.x = (x0 + lm.x * crop_w) / w
+                    lm.y = (y0 + lm.y * crop_h) / h
+                    lm.z = lm.z * crop_w / w
+        
+        return results
+    
+    def _update_roi(self, w, h):
+        """
+        Move the tracking ROI to follow the detected hands.
+        
+        The crop is kept in place while the hands stay inside its inner
+        region, so MediaPipe's own tracker sees a stable input.
+        
+        Args:
+            w: Full frame width
+            h: Full frame height
+        """
+        if not self.results.multi_hand_landmarks:
+            self.roi = None
+            return
+        
+        xs = [lm.x for hand in self.results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in self.results.multi_hand_landmarks for lm in hand.landmark]
+        bx0, bx1 = min(xs) * w, max(xs) * w
+        by0, by1 = min(ys) * h, max(ys) * h
+        
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            margin_x = (x1 - x0) * 0.1
+            margin_y = (y1 - y0) * 0.1
+            if (bx0 > x0 + margin_x and bx1 < x1 - margin_x
+                    and by0 > y0 + margin_y and by1 < y1 - margin_y):
+                return
+        
+        # Square crop around the hand box, padded on every side
+        size = max(bx1 - bx0, by1 - by0) * (1 + 2 * self.roi_padding)
+        cx = (bx0 + bx1) / 2
+        cy = (by0 + by1) / 2
+        x0 = int(max(0, cx - size / 2))
+        y0 = int(max(0, cy - size / 2))
+        x1 = int(min(w, cx + size / 2))
+        y1 = int(min(h, cy + size / 2))
+        
+        if (x1 - x0) * (y1 - y0) >= 0.6 * w * h or x1 - x0 < 16 or y1 - y0 < 16:
+            # Crop would save little (or is degenerate) - keep searching the full frame
+            self.roi = None
+        else:
+            self.roi = (x0, y0, x1, y1)
+    
+    def get_all_landmarks(self, img):
+        """
+        Get the landmarks of every detected hand as one array.
+        
+        Args:
+            img: Input image (used for its size)
+        
+        Returns:
+            float32 array of shape (N, 21, 3) in pixel units, N = 0 if no hand
+        """
+        if self.results is None or not self.results.multi_hand_landmarks:
+            return np.empty((0, 21, 3), dtype=np.float32)
+        
+        h, w = img.shape[:2]
+        landmarks = np.array(
+            [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in self.results.multi_hand_landmarks],
+            dtype=np.float32
+        )
+        # z is roughly on the same scale as x
+        landmarks *= np.array([w, h, w], dtype=np.float32)
+        return landmarks
+    
+    def get_landmark_array(self, img):
+        """
+        Get the landmarks of the first detected hand.
+        
+        Args:
+            img: Input image (used for its size)
+        
+        Returns:
+            float32 array of shape (21, 3) in pixel units, or None if no hand
+        """
+        landmarks = self.get_all_landmarks(img)
+        if len(landmarks) == 0:
+            return None
+        return landmarks[0]
+    
+    def get_handedness(self):
+        """
+        Get the handedness label of the first detected hand.
+        
+        Returns:
+            "Left", "Right", or None if no hand
+        """
+        if self.results is None or not self.results.multi_handedness:
+            return None
+        return self.results.multi_handedness[0].classification[0].label
     
-    def get_finger_positions(self, img):
+    def get_all_handedness(self):
+        """
+        Get the handedness labels of every detected hand.
+        
+        Returns:
+            List of "Left"/"Right" labels in the order of get_all_landmarks()
+        """
+        if self.results is None or not self.results.multi_handedness:
+            return []
+        return [hand.classification[0].label for hand in self.results.multi_handedness]
+    
+    def get_finger_positions(self, img, hand_index=0):
         """
         Get the positions of all hand landmarks.
         
         Args:
             img: Input image
+            hand_index: Which detected hand to return (0 = first)
             
         Returns:
             List of landmark positions [(id, x, y), ...]
         """
-        landmark_list = []
-        
-        if self.results.multi_hand_landmarks:
-            hand = self.results.multi_hand_landmarks[0]  # Get first hand
-            h, w, c = img.shape
-            
-            for id, lm in enumerate(hand.landmark):
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                landmark_list.append((id, cx, cy))
+        all_landmarks = self.get_all_landmarks(img)
+        if hand_index >= len(all_landmarks):
+            return []
+        landmarks = all_landmarks[hand_index]
         
-        return landmark_list
+        return [(id, int(x), int(y)) for id, (x, y, z) in enumerate(landmarks)]
     
-    def count_fingers(self, landmark_list):
+    def count_fingers(self, landmarks):
         """
-        Count the number of extended fingers with improved accuracy.
+        Count the number of extended fingers.
         
         Args:
-            landmark_list: List of landmark positions from get_finger_positions()
+            landmarks: (21, 3) array from get_landmark_array(), a (N, 21, 3) batch,
+                       or a list from get_finger_positions()
             
         Returns:
-            Number of extended fingers (0-5)
+            Number of extended fingers (0-5), -1 if no landmarks;
+            an int array of counts for a batch
         """
-        if len(landmark_list) == 0:
+        if landmarks is None or len(landmarks) == 0:
             return -1
         
-        fingers_up = []  # Store which fingers are up for better validation
-        
-        # Get palm base for reference (middle point between wrist and middle MCP)
-        wrist_y = landmark_list[0][2]
-        middle_mcp_y = landmark_list[9][2]
-        palm_base_y = (wrist_y + middle_mcp_y) / 2
-        
-        # THUMB - Special handling for thumb (much stricter to avoid false positives)
-        thumb_tip_x = landmark_list[4][1]
-        thumb_tip_y = landmark_list[4][2]
-        thumb_ip_x = landmark_list[3][1]
-        thumb_mcp_x = landmark_list[2][1]
-        wrist_x = landmark_list[0][1]
-        index_mcp_x = landmark_list[5][1]
-        
-        # Calculate if thumb is extended horizontally (for right hand)
-        # Thumb tip should be far from index finger MCP
-        thumb_to_index_dist = abs(thumb_tip_x - index_mcp_x)
-        palm_width = abs(index_mcp_x - wrist_x)
-        
-        # Thumb is extended ONLY if:
-        # 1. Tip is FAR from index finger (more than 80% of palm width)
-        # 2. Thumb tip is beyond thumb MCP horizontally
-        # 3. Tip Y position is above palm base (not curled down)
-        thumb_extended_horizontally = abs(thumb_tip_x - thumb_mcp_x) > palm_width * 0.5
-        
-        if thumb_to_index_dist > palm_width * 0.8 and thumb_extended_horizontally and thumb_tip_y < palm_base_y + 30:
-            fingers_up.append("thumb")
-        
-        # OTHER 4 FINGERS - Use both PIP and MCP for better accuracy
-        finger_names = ["index", "middle", "ring", "pinky"]
-        finger_tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky tips
-        finger_pips = [6, 10, 14, 18]  # PIP joints
-        finger_mcps = [5, 9, 13, 17]   # MCP (knuckle) joints
-        
-        for i in range(4):
-            tip_y = landmark_list[finger_tips[i]][2]
-            pip_y = landmark_list[finger_pips[i]][2]
-            mcp_y = landmark_list[finger_mcps[i]][2]
-            
-            # Finger is extended if:
-            # 1. Tip is significantly above PIP (at least 25 pixels - slightly reduced)
-            # 2. PIP is above or near MCP (finger is straight)
-            tip_pip_diff = pip_y - tip_y
-            pip_mcp_diff = mcp_y - pip_y
-            
-            if tip_pip_diff > 25 and pip_mcp_diff > -15:
-                fingers_up.append(finger_names[i])
+        if isinstance(landmarks, list):
+            # [(id, x, y), ...] from get_finger_positions(): drop the id column
+            landmarks = np.array([(x, y, 0) for _, x, y in landmarks], dtype=np.float32)
         
-        return len(fingers_up)
+        counts = classify_fingers(landmarks).sum(axis=-1)
+        if counts.ndim == 0:
+            return int(counts)
+        return counts
     
-    def detect_gesture(self, img):
+    def detect_gesture(self, img, draw=True):
         """
         Detect hand gesture: open palm (5 fingers) or closed fist (0 fingers).
         
         Args:
             img: Input image
+            draw: Whether to draw hand landmarks on the image
             
         Returns:
             Tuple of (gesture_name, finger_count, processed_image)
             gesture_name: "OPEN_PALM", "CLOSED_FIST", or "UNKNOWN"
         """
-        img = self.find_hands(img, draw=True)
-        landmarks = self.get_finger_positions(img)
+        img = self.find_hands(img, draw=draw)
+        start = time.perf_counter()
+        self.landmarks = self.get_landmark_array(img)
+        if self.landmark_filter is not None:
+            self.landmarks = self.landmark_filter(self.landmarks, start)
+        extracted = time.perf_counter()
+        self.stage_times["landmarks"] = extracted - start
         
-        if len(landmarks) == 0:
+        if self.landmarks is None:
+            self.stage_times["classify"] = 0.0
             return "NO_HAND", -1, img
         
-        finger_count = self.count_fingers(landmarks)
-        
-        # Strict gesture classification to avoid confusion
-        if finger_count == 5:  # Exactly 5 fingers = open palm (PAUSE)
-            gesture = "OPEN_PALM"
-        elif finger_count == 4:  # 4 fingers also counts as open palm
-            gesture = "OPEN_PALM"
-        elif finger_count == 0:  # Exactly 0 fingers = closed fist (PLAY)
-            gesture = "CLOSED_FIST"
-        elif finger_count == 1:  # 1 finger also counts as closed fist
-            gesture = "CLOSED_FIST"
-        elif finger_count == 2:  # Exactly 2 fingers = peace sign (REWIND)
-            gesture = "PEACE_SIGN"
-        elif finger_count == 3:  # Exactly 3 fingers = forward sign
-            gesture = "THREE_FINGERS"
+        fingers = classify_fingers(self.landmarks)
+        finger_count = int(fingers.sum())
+        
+        if self.classifier is not None:
+            gesture = self.classifier.predict(self.landmarks)
+        elif self.gesture_map is not None:
+            gesture = self.gesture_map.gesture(fingers)
         else:
-            gesture = "UNKNOWN"
+            gesture = gesture_from_count(finger_count)
+        self.stage_times["classify"] = time.perf_counter() - extracted
         
         return gesture, finger_count, img
     
+    def set_model_complexity(self, model_complexity):
+        """
+        Switch the MediaPipe landmark model, rebuilding the graph if it changes.
+        Must be called from the thread that runs detection.
+        
+        Args:
+            model_complexity: 0 (lite, faster) or 1 (full)
+        
+        Returns:
+            Seconds spent rebuilding (0 if nothing changed)
+        """
+        if model_complexity == self.model_complexity:
+            return 0.0
+        start = time.perf_counter()
+        self.hands.close()
+        self.hands = self.mp_hands.Hands(model_complexity=model_complexity, **self.hands_options)
+        self.model_complexity = model_complexity
+        self.roi = None  # Tracking restarts with the new graph
+        return time.perf_counter() - start
+    
+    def warm_up(self, width=1280, height=720):
+        """
+        Run one blank frame through the model so the first real frame does
+        not pay MediaPipe's graph initialization.
+        
+        Args:
+            width: Expected frame width
+            height: Expected frame height
+        
+        Returns:
+            Seconds spent
+        """
+        if self.inference_width and width > self.inference_width:
+            height = max(1, int(height * self.inference_width / width))
+            width = self.inference_width
+        start = time.perf_counter()
+        self.hands.process(np.zeros((height, width, 3), dtype=np.uint8))
+        return time.perf_counter() - start
+    
     def close(self):
         """Release resources."""
         self.hands.close()
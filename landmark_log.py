@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Compact binary landmark logs.
+
+A log is a 32-byte header followed by fixed-size records, one per frame:
+
+    timestamp   float64  seconds
+    handedness  int8     -1 = no hand, 0 = left, 1 = right
+    landmarks   21 x 3   float16 or float32, normalized to the frame size
+
+Playback uses numpy.memmap, so multi-hour recordings can be sliced and
+replayed through the finger classifier without running MediaPipe or
+loading the whole file into memory.
+
+Usage:
+    python landmark_log.py info session.lmk
+    python landmark_log.py replay session.lmk --start 0 --stop 100000
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from gesture_map import finger_mask, load_gesture_map
+from hand_detector import classify_fingers
+from stability import CONFIRM_TIMES, GestureFilter, StabilityCounter
+
+
+MAGIC = b"HGLM"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII16x")  # magic, version, coordinate bytes, frame width, frame height
+HANDEDNESS = {"Left": 0, "Right": 1}
+NO_HAND = -1
+
+
+def record_dtype(coord_dtype):
+    """
+    Build the structured dtype of one log record.
+    
+    Args:
+        coord_dtype: np.float16 or np.float32
+    
+    Returns:
+        numpy structured dtype
+    """
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("handedness", "i1"),
+        ("landmarks", np.dtype(coord_dtype).newbyteorder("<"), (21, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    """
+    Appends one fixed-size record per frame to a landmark log.
+    """
+    
+    def __init__(self, path, frame_width, frame_height, coord_dtype=np.float16):
+        """
+        Create a new log file.
+        
+        Args:
+            path: Output file path
+            frame_width: Width of the recorded frames (pixels)
+            frame_height: Height of the recorded frames (pixels)
+            coord_dtype: np.float16 (compact) or np.float32 (exact)
+        """
+        self.path = path
+        self.dtype = record_dtype(coord_dtype)
+        self.scale = np.array([frame_width, frame_height, frame_width], dtype=np.float32)
+        self.record = np.zeros(1, dtype=self.dtype)
+        self.frames = 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, np.dtype(coord_dtype).itemsize,
+                                    frame_width, frame_height))
+    
+    def write(self, timestamp, landmarks, handedness=None):
+        """
+        Append a frame.
+        
+        Args:
+            timestamp: Frame time in seconds
+            landmarks: (21, 3) landmark array in pixel units, or None if no hand
+            handedness: "Left", "Right" or None
+        """
+        self.record["timestamp"] = timestamp
+        if landmarks is None:
+            self.record["handedness"] = NO_HAND
+            self.record["landmarks"] = 0
+        else:
+            self.record["handedness"] = HANDEDNESS.get(handedness, 1)
+            self.record["landmarks"] = np.asarray(landmarks, dtype=np.float32) / self.scale
+        self.file.write(self.record.tobytes())
+        self.frames += 1
+    
+    def write_results(self, results, timestamp):
+        """
+        Append a frame straight from HandDetector.results (first hand only).
+        
+        Args:
+            results: MediaPipe Hands results
+            timestamp: Frame time in seconds
+        """
+        self.record["timestamp"] = timestamp
+        if not results.multi_hand_landmarks:
+            self.record["handedness"] = NO_HAND
+            self.record["landmarks"] = 0
+        else:
+            hand = results.multi_hand_landmarks[0]
+            self.record["landmarks"] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+            label = None
+            if results.multi_handedness:
+                label = results.multi_handedness[0].classification[0].label
+            self.record["handedness"] = HANDEDNESS.get(label, 1)
+        self.file.write(self.record.tobytes())
+        self.frames += 1
+    
+    def close(self):
+        """Flush and close the log file."""
+        self.file.close()
+
+
+class LandmarkLog:
+    """
+    Memory-mapped read access to a landmark log.
+    
+    Also works as a frame source: isOpened()/read_landmarks()/release()
+    replay it frame by frame like frame_sources.LandmarkStreamSource.
+    """
+    
+    def __init__(self, path):
+        """
+        Map a log file.
+        
+        Args:
+            path: Path to the log file
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, coord_bytes, width, height = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} landmark log")
+        self.dtype = record_dtype(np.float16 if coord_bytes == 2 else np.float32)
+        self.frame_width = width
+        self.frame_height = height
+        self.scale = np.array([width, height, width], dtype=np.float32)
+        # A trailing partial record (e.g. from an interrupted recording) is ignored
+        frames = (os.path.getsize(path) - HEADER.size) // self.dtype.itemsize
+        if frames <= 0:
+            self.records = np.zeros(0, dtype=self.dtype)  # Nothing recorded yet; mmap needs data
+        else:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER.size, shape=(frames,))
+        self.position = 0
+    
+    def __len__(self):
+        """Number of recorded frames."""
+        return len(self.records)
+    
+    @property
+    def timestamps(self):
+        """Frame timestamps (memory-mapped view)."""
+        return self.records["timestamp"]
+    
+    @property
+    def handedness(self):
+        """Handedness per frame: -1 no hand, 0 left, 1 right (memory-mapped view)."""
+        return self.records["handedness"]
+    
+    @property
+    def valid(self):
+        """Boolean array, True for frames with a hand."""
+        return self.records["handedness"] != NO_HAND
+    
+    def landmarks(self, start=0, stop=None):
+        """
+        Read a slice of landmarks in pixel units.
+        
+        Args:
+            start: First frame index
+            stop: End frame index (exclusive), None for the end of the log
+        
+        Returns:
+            float32 array of shape (N, 21, 3); rows without a hand are zero
+        """
+        return self.records["landmarks"][start:stop].astype(np.float32) * self.scale
+    
+    def finger_masks(self, start=0, stop=None, chunk=65536):
+        """
+        Run the finger classifier over a range of frames, one chunk at a time.
+        
+        Args:
+            start: First frame index
+            stop: End frame index (exclusive), None for the end of the log
+            chunk: Frames classified per NumPy call (bounds memory use)
+        
+        Returns:
+            int array of extended-finger bitmasks (see gesture_map.finger_mask),
+            -1 for frames without a hand
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        masks = np.full(max(0, stop - start), -1, dtype=np.int8)
+        for offset in range(start, stop, chunk):
+            end = min(offset + chunk, stop)
+            valid = self.records["handedness"][offset:end] != NO_HAND
+            batch = finger_mask(classify_fingers(self.landmarks(offset, end)))
+            masks[offset - start:end - start] = np.where(valid, batch, -1)
+        return masks
+    
+    def classify(self, start=0, stop=None, chunk=65536):
+        """
+        Count the extended fingers over a range of frames.
+        
+        Args:
+            start: First frame index
+            stop: End frame index (exclusive), None for the end of the log
+            chunk: Frames classified per NumPy call (bounds memory use)
+        
+        Returns:
+            int array of finger counts, -1 for frames without a hand
+        """
+        masks = self.finger_masks(start, stop, chunk)
+        bits = np.unpackbits(masks.astype(np.uint8)[:, None], axis=1)[:, 3:]
+        return np.where(masks >= 0, bits.sum(axis=1), -1).astype(np.int8)
+    
+    def isOpened(self):
+        """Return True if the log contains at least one frame."""
+        return len(self) > 0
+    
+    def read_landmarks(self):
+        """
+        Read the next frame.
+        
+        Returns:
+            Tuple of (success, landmarks) where landmarks is a (21, 3) array or None if no hand
+        """
+        if self.position >= len(self):
+            return False, None
+        i = self.position
+        self.position += 1
+        if self.records["handedness"][i] == NO_HAND:
+            return True, None
+        return True, self.records["landmarks"][i].astype(np.float32) * self.scale
+    
+    def release(self):
+        """Stop reading the log."""
+        self.position = len(self)
+
+
+def replay(log, start=0, stop=None, stability_threshold=None, gesture_map=None):
+    """
+    Replay a log through the classifier and the gesture stability logic.
+    
+    Args:
+        log: LandmarkLog instance
+        start: First frame index
+        stop: End frame index (exclusive)
+        stability_threshold: Confirm gestures after this many identical frames
+                             (StabilityCounter); None or 0 uses the time-based GestureFilter
+        gesture_map: GestureMap used to name gestures (default: the bundled gestures.json)
+    
+    Returns:
+        Tuple of (gestures, confirmed) where confirmed lists (frame_index, gesture)
+    """
+    gesture_map = gesture_map or load_gesture_map()
+    masks = log.finger_masks(start, stop)
+    # Index 32 (reached by mask -1) is the no-hand entry
+    names = gesture_map.lookup + ["NO_HAND"]
+    if not stability_threshold:
+        stability = GestureFilter(confirm_times=dict(CONFIRM_TIMES, **gesture_map.confirm_times))
+        timestamps = log.timestamps[start:start + len(masks)].tolist()
+    else:
+        stability = StabilityCounter(threshold=stability_threshold)
+    gestures = []
+    confirmed = []
+    for i, mask in enumerate(masks.tolist()):
+        gesture = names[mask]
+        gestures.append(gesture)
+        ready = stability.update(gesture) if stability_threshold else stability.update(gesture, timestamps[i])
+        if ready:
+            confirmed.append((start + i, stability.last_gesture))
+            stability.mark_executed()
+    return gestures, confirmed
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Inspect and replay landmark logs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info = sub.add_parser("info", help="print a summary of a log")
+    info.add_argument("path")
+    play = sub.add_parser("replay", help="replay a log through the classifier")
+    play.add_argument("path")
+    play.add_argument("--start", type=int, default=0)
+    play.add_argument("--stop", type=int, default=None)
+    play.add_argument("--gestures", default=None, metavar="FILE",
+                      help="gesture definitions (default: gestures.json)")
+    play.add_argument("--stability", type=int, default=None, metavar="FRAMES",
+                      help="confirm after this many identical frames instead of using the time-based filter (0: the filter)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the landmark log tool from the command line."""
+    args = parse_args(argv)
+    log = LandmarkLog(args.path)
+    
+    if args.command == "info":
+        duration = float(log.timestamps[-1] - log.timestamps[0]) if len(log) else 0.0
+        print(f"{args.path}: {len(log)} frames, {duration:.1f} s, "
+              f"{log.frame_width}x{log.frame_height}, {int(log.valid.sum())} with a hand, "
+              f"{log.dtype.itemsize} bytes/frame")
+        return 0
+    
+    start = time.perf_counter()
+    gestures, confirmed = replay(log, args.start, args.stop, args.stability,
+                                load_gesture_map(args.gestures))
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {len(gestures)} frames in {elapsed:.3f} s "
+          f"({len(gestures) / max(elapsed, 1e-9):.0f} frames/s)")
+    for index, gesture in confirmed:
+        print(f"  frame {index:8}  {gesture}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
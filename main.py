@@ -3,21 +3,177 @@
 Pause or Play - Hand Gesture Media Controller
 Controls media playback using hand gestures detected through webcam.
 
-Gestures:
-- Open palm (5 fingers) = PLAY
-- Closed fist (0 fingers) = PAUSE
+Gestures and their actions are defined in gestures.json (see --gestures).
 
 Press 'q' to quit the application.
 """
 
+import time
+
+STARTUP_TIME = time.perf_counter()  # Taken before the imports below so they count towards startup
+
+import argparse
 import cv2
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from hand_detector import HandDetector
+import landmark_log
+from landmark_log import LandmarkRecorder
+from media_backends import open_backend
 from media_controller import MediaController
+from metrics import Metrics, MetricsServer, ProfileToggle, StartupTimer
+from multi_source import GestureArbiter, MultiSourcePipeline
+from frame_cache import ResultCache
+from frame_sources import LANDMARK_EXTENSIONS, LANDMARK_LOG_EXTENSIONS, open_source
+from gesture_map import load_gesture_map
+from gesture_model import load_classifier
+from governor import ResourceGovernor
+from overlay import OverlayRenderer
+from pipeline import FramePacket, FramePool, GesturePipeline, detect_packet, read_frame
+from scheduler import InferenceScheduler
+from stability import CONFIRM_TIMES, GestureFilter, OneEuroFilter
+from trajectory import SwipeDetector
+
+
+REPORT_INTERVAL = 5.0  # Seconds between statistics reports
+
+
+def serial_frames(cap, detector, scheduler=None, draw=True, flip=True, pool=None, cache=None, governor=None):
+    """
+    Capture and detect one frame at a time in the calling thread.
+    
+    Args:
+        cap: Opened frame source (cv2.VideoCapture or a frame_sources source)
+        detector: HandDetector instance
+        scheduler: Optional InferenceScheduler for adaptive frame skipping
+        draw: Whether to draw hand landmarks on the frames
+        flip: Whether to mirror frames horizontally
+        pool: Optional FramePool; each frame's buffer is reused once the caller moves on
+        cache: Optional ResultCache reusing results for near-identical frames
+        governor: Optional ResourceGovernor pacing the loop and applying its operating point
+    
+    Yields:
+        FramePacket objects with the gesture result filled in
+    """
+    frame_id = 0
+    # A camera keeps buffering while the loop sleeps, so it is paced by dropping frames instead
+    live = getattr(cap, "live", False)
+    while True:
+        if governor is not None:
+            governor.begin_frame(detector, wait=not live)
+        
+        # Read frame from camera and flip it horizontally for a mirror view
+        start = time.perf_counter()
+        success, img = read_frame(cap, pool, flip)
+        
+        if not success:
+            return
+        read_time = time.perf_counter() - start
+        if live and governor is not None and not governor.take_slot():
+            if pool is not None:
+                pool.release(img)
+            continue
+        
+        frame_id += 1
+        packet = FramePacket(frame_id, img, time.perf_counter())
+        packet.stage_times["capture"] = read_time
+        
+        # Detect hand gesture
+        detect_packet(detector, packet, scheduler, draw, cache)
+        yield packet
+        if pool is not None:
+            pool.release(packet.img)
+
+
+def load_detector(args, gesture_map, startup):
+    """
+    Build the hand detector and warm up its model (runs in a startup thread).
+    
+    Args:
+        args: Parsed command line options
+        gesture_map: GestureMap with the gesture definitions
+        startup: StartupTimer receiving the "model" and "warm_up" milestones
+    
+    Returns:
+        HandDetector instance
+    """
+    detector = HandDetector(max_hands=1, detection_confidence=0.7, tracking_confidence=0.7,
+                            inference_width=args.inference_width, roi_tracking=args.roi,
+                            landmark_filter=OneEuroFilter() if args.one_euro else None,
+                            mirror=args.headless, gesture_map=gesture_map,
+                            classifier=load_classifier(args.model) if args.model else None)
+    startup.mark("model")
+    detector.warm_up(1280, 720)
+    startup.mark("warm_up")
+    return detector
 
 
-def main():
-    """Main application loop."""
+def run_multi_source(args, controller, gesture_map):
+    """
+    Control playback from several cameras at once (headless).
+    
+    Each source gets its own worker process and MediaPipe instance; the
+    hands seen by all of them are arbitrated into one controlling gesture.
+    
+    Args:
+        args: Parsed command line options
+        controller: MediaController instance
+        gesture_map: GestureMap with the gesture definitions and actions
+    """
+    specs = [spec.strip() for spec in args.sources.split(",") if spec.strip()]
+    detector_options = {"max_hands": args.max_hands, "detection_confidence": 0.7,
+                        "tracking_confidence": 0.7, "inference_width": args.inference_width,
+                        "roi_tracking": args.roi, "mirror": True,
+                        "gesture_map": gesture_map,
+                        "classifier": load_classifier(args.model) if args.model else None}
+    # Nothing is displayed, so the mirror view is applied to the landmarks instead of the pixels
+    pipeline = MultiSourcePipeline(specs, detector_options, flip=False)
+    pipeline.start()
+    print(f"✅ Multi-source mode: {len(specs)} worker processes ({', '.join(specs)})")
+    
+    arbiter = GestureArbiter()
+    stability = GestureFilter(confirm_times=dict(CONFIRM_TIMES, **gesture_map.confirm_times))
+    last_report_time = time.perf_counter()
+    
+    try:
+        for result in pipeline.results():
+            gesture, finger_count, owner = arbiter.update(result)
+            controller.reconcile()
+            
+            # Dispatch the confirmed gesture, never this frame's raw classification
+            if (stability.update(gesture, result.capture_time)
+                    and gesture_map.dispatch(controller, stability.last_gesture)):
+                stability.mark_executed()
+            
+            if finger_count >= 0:
+                print(f"Detection: {gesture} ({finger_count}F) from source {specs[owner[0]]} {owner[1] or ''} | "
+                      f"Stable: {stability.progress():>9} | State: {controller.current_state or 'UNKNOWN':8}", end='\r')
+            
+            pipeline.record_dispatch(result)
+            
+            if time.perf_counter() - last_report_time >= REPORT_INTERVAL:
+                print()
+                pipeline.report()
+                last_report_time = time.perf_counter()
+    finally:
+        pipeline.stop()
+        print()
+        pipeline.report()
+        print(f"🎯 Control switched between hands {arbiter.switches} times")
+        controller.state.report()
+
+
+def main(args=None):
+    """
+    Main application loop.
+    
+    Args:
+        args: Parsed command line options (defaults are used if None)
+    """
+    if args is None:
+        args = parse_args([])
+    startup = StartupTimer(STARTUP_TIME)
+    startup.mark("imports")
     
     # Initialize components
     print("=" * 60)
@@ -25,168 +181,376 @@ def main():
     print("=" * 60)
     print("\nInitializing camera and hand detection...")
     
-    # Initialize webcam
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    gesture_map = load_gesture_map(args.gestures)
+    
+    if args.sources:
+        # Several cameras, one worker process each
+        controller = MediaController(cooldown=0.0, async_dispatch=not args.sync_commands,
+                                     backend=open_backend(args.output))
+        try:
+            run_multi_source(args, controller, gesture_map)
+        except KeyboardInterrupt:
+            print("\n\n⚠ Application interrupted by user (Ctrl+C)")
+        finally:
+            controller.close()
+        print("✅ Application closed successfully!")
+        return
+    
+    source = str(args.source).lower()
+    if source.endswith(LANDMARK_LOG_EXTENSIONS):
+        # A landmark log has no images to show or detect on: replay it through the classifier instead
+        print(f"⏯ {args.source} is a landmark log; replaying it through the classifier")
+        landmark_log.main(["replay", args.source] + (["--gestures", args.gestures] if args.gestures else []))
+        return
+    if source.endswith(LANDMARK_EXTENSIONS):
+        print(f"❌ Error: {args.source} is a landmark stream, not a camera or video; "
+              f"score it with benchmark.py instead")
+        return
+    
+    # Load the model and the output backend while the camera opens. MediaPipe
+    # (and pyautogui, for the keys backend) are only imported by these threads.
+    loader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup")
+    detector_future = loader.submit(load_detector, args, gesture_map, startup)
+    backend_future = loader.submit(open_backend, args.output)
+    
+    # Initialize webcam (or a recorded video / image directory)
+    cap = open_source(args.source, width=1280, height=720)
+    startup.mark("camera")
     
-    if not cap.isOpened():
-        print("❌ Error: Could not open webcam!")
+    if not cap.isOpened() or not hasattr(cap, "read"):
+        print(f"❌ Error: Could not open frame source {args.source}!")
         print("Please check if your camera is connected and not being used by another application.")
+        loader.shutdown(wait=False, cancel_futures=True)
         return
     
     print("✅ Camera initialized")
     
-    # Initialize hand detector and media controller
-    detector = HandDetector(max_hands=1, detection_confidence=0.7, tracking_confidence=0.7)
-    controller = MediaController(cooldown=2.5)  # 2.5 second cooldown between commands
+    # Wait for the hand detector and create the media controller
+    detector = detector_future.result()
+    # Cooldowns between commands are per gesture, from the gesture config
+    controller = MediaController(cooldown=0.0,
+                                 async_dispatch=not args.sync_commands,
+                                 backend=backend_future.result())
+    loader.shutdown()
+    startup.mark("ready")
     
-    print("✅ Hand detector initialized")
+    print("✅ Hand detector initialized (model warmed up)")
     print("✅ Media controller initialized")
     print("\n" + "=" * 70)
     print("GESTURES & CONTROLS:")
-    print("  ✊ CLOSED FIST (0-1 fingers)    → PLAY ▶")
-    print("  👋 OPEN PALM (4-5 fingers)     → PAUSE ⏸")
-    print("  ✌️  PEACE SIGN (2 fingers)      → REWIND 10s ⏪")
-    print("  🤟 THREE FINGERS (3 fingers)   → FORWARD 10s ⏩")
-    print("\n  Press 'Q' to quit")
+    for line in gesture_map.describe():
+        print(f"  {line}")
+    print("\n  Press Ctrl+C to quit" if args.headless else "\n  Press 'Q' to quit")
     print("=" * 70 + "\n")
     
+    scheduler = None
+    if args.adaptive:
+        scheduler = InferenceScheduler(idle_rate=args.idle_rate, active_every=args.active_every,
+                                       wake_threshold=args.wake_threshold)
+        print(f"✅ Adaptive inference: {args.idle_rate:g} Hz when idle, every {args.active_every} frames when stable")
+    
+    cache = None
+    if args.cache_tolerance is not None:
+        cache = ResultCache(tolerance=args.cache_tolerance, max_age=args.cache_max_age, mirror=detector.mirror)
+        print(f"✅ Result cache: near-identical frames reuse results for up to {args.cache_max_age:g} s")
+    
+    governor = None
+    if args.cpu_budget is not None or args.frame_budget is not None:
+        governor = ResourceGovernor(cpu_budget=args.cpu_budget,
+                                    frame_budget=None if args.frame_budget is None else args.frame_budget / 1000.0,
+                                    latency_slo=args.latency_slo / 1000.0)
+        budget = f"{args.cpu_budget:g}% CPU" if args.cpu_budget is not None else f"{args.frame_budget:g} ms per frame"
+        print(f"✅ Resource governor: {budget}, gesture latency within {args.latency_slo:g} ms")
+    
+    swipes = None
+    if args.swipes:
+        swipes = SwipeDetector(min_distance=args.swipe_distance)
+        print("✅ Swipes: swipe right/left to skip forward/backward (faster swipes skip further)")
+    
+    # Frames are captured into reused buffers. Headless units never show the mirror
+    # view, so the detector mirrors the landmarks instead of flipping every frame.
+    pool = FramePool()
+    flip_pixels = not args.headless
+    
+    if args.pipelined:
+        # Capture and inference run in their own threads; this loop is the render/dispatch stage
+        pipeline = GesturePipeline(cap, detector, flip=flip_pixels, scheduler=scheduler,
+                                   draw=not args.headless, pool=pool, cache=cache, governor=governor)
+        pipeline.start()
+        frames = pipeline.results()
+        print("✅ Pipelined mode: capture, inference and render run concurrently")
+    else:
+        pipeline = None
+        frames = serial_frames(cap, detector, scheduler, draw=not args.headless, flip=flip_pixels, pool=pool,
+                               cache=cache, governor=governor)
+    
+    # Headless units skip all drawing and the display window
+    renderer = None if args.headless else OverlayRenderer(guide_text=gesture_map.guide_text(),
+                                                            action_labels=gesture_map.action_labels())
+    recorder = None
+    
+    # Per-stage timing histograms, optionally served to Prometheus and/or dumped as JSON
+    metrics = Metrics()
+    server = None
+    if args.metrics_port is not None:
+        server = MetricsServer(metrics, port=args.metrics_port)
+        print(f"✅ Metrics on http://127.0.0.1:{server.port}/metrics (JSON: /metrics.json)")
+    profiler = ProfileToggle(args.profile) if args.profile else None
+    
     # State tracking
-    last_gesture = None
-    gesture_stable_frames = 0
-    stability_threshold = 12  # Number of consecutive frames needed to confirm gesture (increased for accuracy)
-    command_executed_for_current_gesture = False  # Prevent repeat commands
+    # Time-based voting, confirms in the same time at any frame rate
+    stability = GestureFilter(confirm_times=dict(CONFIRM_TIMES, **gesture_map.confirm_times))
+    last_report_time = time.perf_counter()
+    frames_since_report = 0
+    frame_start = time.perf_counter()
     
-    while True:
-        # Read frame from camera
-        success, img = cap.read()
-        
-        if not success:
-            print("❌ Error: Could not read frame from camera!")
-            break
-        
-        # Flip the image horizontally for a mirror view
-        img = cv2.flip(img, 1)
-        
-        # Detect hand gesture
-        gesture, finger_count, img = detector.detect_gesture(img)
-        
-        # Track gesture stability
-        if gesture == last_gesture:
-            gesture_stable_frames += 1
-        else:
-            gesture_stable_frames = 0
-            last_gesture = gesture
-            command_executed_for_current_gesture = False  # Reset when gesture changes
-        
-        # Debug output - print finger count for troubleshooting
-        if finger_count >= 0:
-            gesture_display = f"{gesture} ({finger_count}F)"
-            confidence = "✓" if gesture_stable_frames >= stability_threshold else "..."
-            print(f"Detection: {gesture_display:25} | Stable: {gesture_stable_frames:2}/{stability_threshold} {confidence} | State: {controller.current_state or 'UNKNOWN':8}", end='\r')
-        
-        # Execute command ONCE when gesture is stable and command not yet executed
-        if gesture_stable_frames >= stability_threshold and not command_executed_for_current_gesture:
-            if gesture == "CLOSED_FIST" and controller.current_state != "PLAYING":
-                # CLOSED FIST = PLAY (if video is NOT already playing)
-                if controller.play():
-                    print("\n✅ PLAY command sent - Closed fist detected")
-                    command_executed_for_current_gesture = True
-            elif gesture == "OPEN_PALM" and controller.current_state != "PAUSED":
-                # OPEN PALM = PAUSE (if video is NOT already paused)
-                if controller.pause():
-                    print("\n✅ PAUSE command sent - Open palm detected")
-                    command_executed_for_current_gesture = True
-            elif gesture == "PEACE_SIGN":
-                # PEACE SIGN (2 fingers) = REWIND 10 seconds
-                if controller.skip_backward():
-                    print("\n⏪ REWIND 10 seconds - Peace sign detected")
-                    command_executed_for_current_gesture = True
-            elif gesture == "THREE_FINGERS":
-                # THREE FINGERS = FORWARD 10 seconds
-                if controller.skip_forward():
-                    print("\n⏩ FORWARD 10 seconds - Three fingers detected")
-                    command_executed_for_current_gesture = True
+    try:
+        for packet in frames:
+            gesture, finger_count, img = packet.gesture, packet.finger_count, packet.img
+            if startup.mark("first_frame", packet.capture_time):
+                startup.report()
+                startup.export(metrics)
+            if finger_count >= 0 and startup.mark("first_detection"):
+                print(f"\n🚀 First hand detected {startup.marks['first_detection']:.2f} s after launch")
+                startup.export(metrics)
+            metrics.observe_all(packet.stage_times)
+            metrics.inc("frames")
+            if packet.inferred:
+                metrics.inc("inferences")
+            if packet.cached:
+                metrics.inc("cache_hits")
         
-        # Display information on screen
-        h, w, c = img.shape
+            # Record detections (not frames reused by the scheduler) to a landmark log
+            if args.record and packet.inferred:
+                if recorder is None:
+                    h, w = img.shape[:2]
+                    recorder = LandmarkRecorder(args.record, w, h)
+                    print(f"⏺ Recording landmarks to {args.record}")
+                recorder.write(packet.capture_time, packet.landmarks, packet.handedness)
         
-        # Background for text (increased height for finger indicator)
-        cv2.rectangle(img, (10, 10), (w - 10, 200), (0, 0, 0), -1)
-        cv2.rectangle(img, (10, 10), (w - 10, 200), (255, 255, 255), 2)
+            # Pick up play/pause changes made on the player itself
+            controller.reconcile()
         
-        # Display gesture and finger count
-        if gesture == "NO_HAND":
-            text = "NO HAND DETECTED"
-            color = (0, 165, 255)  # Orange
-        elif gesture == "OPEN_PALM":
-            text = f"OPEN PALM ({finger_count} fingers) - PAUSE"
-            color = (0, 255, 0)  # Green
-        elif gesture == "CLOSED_FIST":
-            text = f"CLOSED FIST ({finger_count} fingers) - PLAY"
-            color = (0, 0, 255)  # Red
-        elif gesture == "PEACE_SIGN":
-            text = f"PEACE SIGN ({finger_count} fingers) - REWIND 10s"
-            color = (255, 0, 255)  # Magenta
-        elif gesture == "THREE_FINGERS":
-            text = f"THREE FINGERS ({finger_count} fingers) - FORWARD 10s"
-            color = (255, 255, 0)  # Yellow
-        else:
-            text = f"UNKNOWN GESTURE ({finger_count} fingers)"
-            color = (128, 128, 128)  # Gray
+            # Track gesture stability
+            ready = stability.update(gesture, packet.capture_time)
         
-        cv2.putText(img, text, (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 
-                    0.9, color, 2, cv2.LINE_AA)
+            # Debug output - print finger count for troubleshooting
+            if finger_count >= 0:
+                gesture_display = f"{gesture} ({finger_count}F)"
+                confidence = "✓" if stability.is_stable() else "..."
+                print(f"Detection: {gesture_display:25} | Stable: {stability.progress():>9} {confidence} | State: {controller.current_state or 'UNKNOWN':8}", end='\r')
         
-        # Display finger count with visual indicator
-        if finger_count >= 0:
-            finger_text = f"Fingers Detected: {finger_count}"
-            cv2.putText(img, finger_text, (20, 90),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+            # Swipes are tracked on real detections only; results reused by the scheduler would freeze the hand
+            if swipes is not None and (packet.inferred or packet.cached):
+                swipe = swipes.update(packet.landmarks, packet.capture_time)
+                if swipe is not None:
+                    # Same dispatch path as static gestures, so swipes share their cooldown
+                    with metrics.timed("dispatch"):
+                        sent = gesture_map.dispatch(controller, f"SWIPE_{swipe.direction.upper()}",
+                                                    count=swipes.steps(swipe))
+                    if sent:
+                        # The pose held during the swipe must not fire its own action afterwards
+                        stability.mark_executed()
+                        metrics.inc("commands")
+                        metrics.inc("swipes")
+                        print(f"👋 Swipe {swipe.direction}: {swipe.distance:.1f} hand sizes in {swipe.duration:.2f} s")
             
-            # Visual finger indicator
-            finger_indicator = "O " * finger_count + "X " * (5 - finger_count)
-            cv2.putText(img, finger_indicator, (20, 160),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (100, 200, 255), 1, cv2.LINE_AA)
-        
-        # Display state
-        state_text = f"State: {controller.current_state if controller.current_state else 'UNKNOWN'}"
-        cv2.putText(img, state_text, (20, 125),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
-        
-        # Display stability indicator
-        stability_text = f"Stability: {gesture_stable_frames}/{stability_threshold}"
-        stability_color = (0, 255, 0) if gesture_stable_frames >= stability_threshold else (100, 100, 100)
-        cv2.putText(img, stability_text, (w - 300, 40),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, stability_color, 2, cv2.LINE_AA)
+            # Execute command ONCE when gesture is stable and command not yet executed
+            # (held back while the hand is moving at swipe speed)
+            if ready and not (swipes is not None and swipes.moving):
+                # The confirmed gesture, not this frame's classification: one stray frame
+                # must not send its own command while the confirmed one is still pending
+                with metrics.timed("dispatch"):
+                    sent = gesture_map.dispatch(controller, stability.last_gesture)
+                if sent:
+                    stability.mark_executed()
+                    metrics.inc("commands")
         
-        # Display gesture guide at bottom
-        guide_y = h - 80
-        cv2.rectangle(img, (10, guide_y - 10), (w - 10, h - 10), (0, 0, 0), -1)
-        cv2.rectangle(img, (10, guide_y - 10), (w - 10, h - 10), (255, 255, 255), 1)
-        cv2.putText(img, "Gestures: Fist=Play | Palm=Pause | 2F=Rewind | 3F=Forward | 4F=Shutdown | Q=Quit", 
-                    (20, guide_y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1, cv2.LINE_AA)
+            if renderer is not None:
+                # Display information on screen
+                renderer.draw(img, gesture, finger_count, controller.current_state,
+                              stability.stable_frames, stability.threshold)
+                metrics.observe("overlay", renderer.last_time)
         
-        # Show the frame
-        cv2.imshow("Pause or Play - Hand Gesture Control", img)
-        
-        # Check for quit command
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q') or key == ord('Q'):
-            print("\n👋 Exiting application...")
-            break
-    
-    # Cleanup
-    cap.release()
-    cv2.destroyAllWindows()
-    detector.close()
+                # Show the frame
+                with metrics.timed("imshow"):
+                    cv2.imshow("Pause or Play - Hand Gesture Control", img)
+            
+            if pipeline is not None:
+                # End-to-end latency: camera capture to render/dispatch
+                pipeline.record_dispatch(packet)
+            if governor is not None:
+                governor.observe(packet)
+            
+            frames_since_report += 1
+            elapsed = time.perf_counter() - last_report_time
+            reporting = (args.headless or pipeline is not None or scheduler is not None or cache is not None
+                         or governor is not None or server or args.metrics_json)
+            if reporting and elapsed >= REPORT_INTERVAL:
+                print()
+                print(f"📈 Main loop: {frames_since_report / elapsed:.1f} FPS")
+                metrics.set("fps", frames_since_report / elapsed)
+                if cache is not None:
+                    metrics.set("cache_hit_rate", cache.stats()["hit_rate"])
+                if governor is not None:
+                    governor.export(metrics)
+                metrics.report()
+                if args.metrics_json:
+                    metrics.dump_json(args.metrics_json)
+                if pipeline is not None:
+                    pipeline.report()
+                if scheduler is not None:
+                    scheduler.report()
+                if cache is not None:
+                    cache.report()
+                if governor is not None:
+                    governor.report()
+                if renderer is not None:
+                    renderer.report()
+                last_report_time = time.perf_counter()
+                frames_since_report = 0
+            
+            if renderer is not None:
+                # Check for quit command
+                with metrics.timed("waitkey"):
+                    key = cv2.waitKey(1) & 0xFF
+                if key == ord('q') or key == ord('Q'):
+                    print("\n👋 Exiting application...")
+                    break
+            
+            now = time.perf_counter()
+            metrics.observe("frame", now - frame_start)
+            frame_start = now
+        else:
+            # Running out of frames is only an error for a camera, not at the end of a file
+            if hasattr(cap, "finished") and cap.finished():
+                print(f"\n✅ Reached the end of {args.source}")
+            else:
+                print("❌ Error: Could not read frame from camera!")
+    except KeyboardInterrupt:
+        # Ctrl+C is how headless runs are stopped: shut down as cleanly as with 'Q'
+        print("\n\n⚠ Application interrupted by user (Ctrl+C)")
+    finally:
+        # Cleanup runs on every exit path, including Ctrl+C and errors
+        if profiler is not None:
+            profiler.stop()
+        if pipeline is not None:
+            pipeline.stop()
+            pipeline.report()
+        if scheduler is not None:
+            scheduler.report()
+        if cache is not None:
+            cache.report()
+        if governor is not None:
+            governor.report()
+        if renderer is not None:
+            renderer.report()
+        if recorder is not None:
+            recorder.close()
+            print(f"💾 Recorded {recorder.frames} frames to {args.record}")
+        metrics.report()
+        controller.state.report()
+        if args.metrics_json:
+            metrics.dump_json(args.metrics_json)
+        if server is not None:
+            server.close()
+        controller.close()
+        cap.release()
+        cv2.destroyAllWindows()
+        detector.close()
     print("✅ Application closed successfully!")
 
 
+def positive_float(text):
+    """
+    Parse a command line number that must be greater than zero.
+    
+    Args:
+        text: Option value
+    
+    Returns:
+        The value as a float
+    """
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {text}")
+    return value
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Control media playback with hand gestures.")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, image directory, or a .lmk landmark log to replay (default: 0)")
+    parser.add_argument("--record", default=None, metavar="FILE",
+                        help="record detected landmarks to a binary .lmk log")
+    parser.add_argument("--headless", action="store_true",
+                        help="no display window or drawing; status and statistics go to the terminal only")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run capture, inference and rendering in separate threads")
+    parser.add_argument("--inference-width", type=int, default=None, metavar="PX",
+                        help="downscale frames to this width before hand detection")
+    parser.add_argument("--roi", action="store_true",
+                        help="only search a padded crop around the last detected hand")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="lower the inference rate while idle or while the gesture is stable")
+    parser.add_argument("--idle-rate", type=positive_float, default=4.0, metavar="HZ",
+                        help="inference rate while no hand is present (default: 4)")
+    parser.add_argument("--active-every", type=int, default=2, metavar="N",
+                        help="run inference on every Nth frame while the gesture is stable (default: 2)")
+    parser.add_argument("--wake-threshold", type=float, default=8.0, metavar="LEVEL",
+                        help="mean pixel difference that wakes up idle inference (default: 8)")
+    parser.add_argument("--cache-tolerance", type=float, default=None, metavar="LEVEL",
+                        help="reuse the last result while the hand region differs by less than this "
+                             "mean gray level (e.g. 2; default: off)")
+    parser.add_argument("--cache-max-age", type=float, default=0.5, metavar="SECONDS",
+                        help="never reuse a cached result for longer than this (default: 0.5)")
+    parser.add_argument("--cpu-budget", type=float, default=None, metavar="PCT",
+                        help="keep detection under this CPU use (percent of one core) by lowering resolution, "
+                             "frame rate, model complexity and threads at runtime")
+    parser.add_argument("--frame-budget", type=float, default=None, metavar="MS",
+                        help="keep the p95 detection time per frame (not counting the camera wait) under this many milliseconds")
+    parser.add_argument("--latency-slo", type=float, default=250.0, metavar="MS",
+                        help="gesture latency the governor must not exceed (default: 250)")
+    parser.add_argument("--swipes", action="store_true",
+                        help="swipe right/left to skip forward/backward; faster swipes skip further")
+    parser.add_argument("--swipe-distance", type=float, default=1.5, metavar="HANDS",
+                        help="palm travel needed for a swipe, in hand sizes (default: 1.5)")
+    parser.add_argument("--one-euro", action="store_true",
+                        help="smooth landmark coordinates with a One-Euro filter before classification")
+    parser.add_argument("--metrics-port", type=int, default=None, metavar="PORT",
+                        help="serve per-stage timings on http://127.0.0.1:PORT/metrics (Prometheus format)")
+    parser.add_argument("--metrics-json", default=None, metavar="FILE",
+                        help="write per-stage timings to this JSON file every few seconds")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="run cProfile on the main loop thread and write the stats to FILE on exit (SIGUSR1 toggles it); "
+                             "use py-spy for the capture and inference threads")
+    parser.add_argument("--sources", default=None, metavar="LIST",
+                        help="comma-separated frame sources processed in parallel, one process each "
+                             "(e.g. 0,1,2); implies --headless")
+    parser.add_argument("--max-hands", type=int, default=2, metavar="N",
+                        help="hands tracked per source in --sources mode (default: 2)")
+    parser.add_argument("--output", default="keys", metavar="SPEC",
+                        help="where media commands go: keys, mpris[:NAME], tcp://HOST:PORT, http://URL, "
+                             "memory or fake (default: keys)")
+    parser.add_argument("--gestures", default=None, metavar="FILE",
+                        help="gesture definitions (.json, .toml or .yaml; default: gestures.json)")
+    parser.add_argument("--model", default=None, metavar="FILE",
+                        help="classify gestures with a model trained by gesture_model.py instead of the finger rules")
+    parser.add_argument("--sync-commands", action="store_true",
+                        help="send media keys from the frame loop itself instead of a background thread")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        main()
+        main(args)
     except KeyboardInterrupt:
         print("\n\n⚠ Application interrupted by user (Ctrl+C)")
         cv2.destroyAllWindows()
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Output backends that deliver media commands to a player.
+
+Every backend has send(command, count=1) and close(). Commands are
+"play", "pause", "skip_forward", "skip_backward", "volume_up" and
+"volume_down"; count repeats the command (e.g. a coalesced double skip).
+Backends that can ask the player what it is doing also have
+query_state(), returning "PLAYING", "PAUSED" or None.
+
+Backend specifications (open_backend / main.py --output):
+
+    keys                   key presses to the focused window (pyautogui, default)
+    mpris[:NAME]           Linux MPRIS player over D-Bus (first player, or one whose name contains NAME)
+    tcp://HOST:PORT        one JSON object per line over a TCP connection
+    http://HOST:PORT/PATH  one JSON POST per command
+    memory                 record commands in memory (tests and benchmarks)
+    fake                   simulated player with a queryable state (tests)
+
+Usage (command throughput/latency, no display needed with "memory"):
+    python media_backends.py --output memory --commands 10000 --async-commands
+"""
+
+import argparse
+import json
+import socket
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+
+COMMANDS = ("play", "pause", "skip_forward", "skip_backward", "volume_up", "volume_down")
+
+
+class KeystrokeBackend:
+    """
+    Sends commands as key presses to whichever window has focus.
+    """
+    
+    # Space bar works for: YouTube, Netflix, VLC, Spotify, QuickTime, etc.
+    # Arrow keys skip 10 seconds on YouTube, VLC and most video players.
+    KEYS = {
+        "play": "space",
+        "pause": "space",
+        "skip_forward": "right",
+        "skip_backward": "left",
+        "volume_up": "volumeup",
+        "volume_down": "volumedown",
+    }
+    
+    def __init__(self, pause=0.1):
+        """
+        Initialize pyautogui.
+        
+        Args:
+            pause: Seconds pyautogui sleeps after every call
+        """
+        # Imported here so the other backends work without a display server
+        import pyautogui
+        
+        # Moving the mouse to a screen corner stops the program
+        pyautogui.FAILSAFE = True
+        
+        # Set pause between actions to prevent issues
+        pyautogui.PAUSE = pause
+        self.pyautogui = pyautogui
+    
+    def send(self, command, count=1):
+        """
+        Press the key for a command.
+        
+        Args:
+            command: Command name
+            count: Number of presses
+        """
+        self.pyautogui.press(self.KEYS[command], presses=count)
+    
+    def close(self):
+        """Nothing to release."""
+
+
+class MprisBackend:
+    """
+    Controls a Linux media player directly through MPRIS over D-Bus
+    (no window focus needed). Requires dbus-python.
+    """
+    
+    def __init__(self, player=None, seek_seconds=10, volume_step=0.05):
+        """
+        Connect to a running player.
+        
+        Args:
+            player: Substring of the player's bus name (e.g. "vlc", "spotify"); None for the first one
+            seek_seconds: Seconds skipped by skip_forward/skip_backward
+            volume_step: Volume change per volume_up/volume_down (MPRIS volume is 0.0-1.0)
+        """
+        try:
+            import dbus
+        except ImportError:
+            raise ImportError("The MPRIS backend needs dbus-python (pip install dbus-python)")
+        
+        self.dbus = dbus
+        self.seek_seconds = seek_seconds
+        self.volume_step = volume_step
+        bus = dbus.SessionBus()
+        names = [name for name in bus.list_names() if name.startswith("org.mpris.MediaPlayer2.")]
+        if player:
+            names = [name for name in names if player.lower() in name.lower()]
+        if not names:
+            raise RuntimeError(f"No MPRIS media player found{f' matching {player!r}' if player else ''}")
+        
+        self.bus_name = str(names[0])
+        proxy = bus.get_object(self.bus_name, "/org/mpris/MediaPlayer2")
+        self.player = dbus.Interface(proxy, "org.mpris.MediaPlayer2.Player")
+        self.properties = dbus.Interface(proxy, "org.freedesktop.DBus.Properties")
+    
+    def send(self, command, count=1):
+        """
+        Call the MPRIS method for a command.
+        
+        Args:
+            command: Command name
+            count: Number of repeats (seeks and volume steps add up)
+        """
+        if command == "play":
+            self.player.Play()
+        elif command == "pause":
+            self.player.Pause()
+        elif command in ("skip_forward", "skip_backward"):
+            sign = 1 if command == "skip_forward" else -1
+            self.player.Seek(self.dbus.Int64(sign * count * self.seek_seconds * 1_000_000))
+        elif command in ("volume_up", "volume_down"):
+            sign = 1 if command == "volume_up" else -1
+            volume = float(self.properties.Get("org.mpris.MediaPlayer2.Player", "Volume"))
+            volume = min(1.0, max(0.0, volume + sign * count * self.volume_step))
+            self.properties.Set("org.mpris.MediaPlayer2.Player", "Volume", self.dbus.Double(volume))
+        else:
+            raise ValueError(f"Unknown command: {command}")
+    
+    def query_state(self):
+        """
+        Ask the player whether it is playing.
+        
+        Returns:
+            "PLAYING", "PAUSED" (also for a stopped player) or None if unknown
+        """
+        status = str(self.properties.Get("org.mpris.MediaPlayer2.Player", "PlaybackStatus"))
+        return {"Playing": "PLAYING", "Paused": "PAUSED", "Stopped": "PAUSED"}.get(status)
+    
+    def close(self):
+        """Nothing to release (the session bus connection is shared)."""
+
+
+class SocketBackend:
+    """
+    Writes each command as one line of JSON to a TCP connection, e.g. for a
+    player plugin or a test harness listening locally.
+    """
+    
+    def __init__(self, host="127.0.0.1", port=8765, timeout=1.0):
+        """
+        Initialize the backend (the connection is opened on the first command).
+        
+        Args:
+            host: Host to connect to
+            port: TCP port
+            timeout: Connect/send timeout in seconds
+        """
+        self.address = (host, port)
+        self.timeout = timeout
+        self.sock = None
+    
+    def send(self, command, count=1):
+        """
+        Send a command, reconnecting once if the connection was lost.
+        
+        Args:
+            command: Command name
+            count: Number of repeats
+        """
+        line = (json.dumps({"command": command, "count": count, "time": time.time()}) + "\n").encode()
+        for attempt in range(2):
+            if self.sock is None:
+                self.sock = socket.create_connection(self.address, timeout=self.timeout)
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                self.sock.sendall(line)
+                return
+            except OSError:
+                self.close()
+                if attempt:
+                    raise
+    
+    def close(self):
+        """Close the connection."""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class HttpBackend:
+    """
+    POSTs each command as JSON to an HTTP endpoint.
+    """
+    
+    def __init__(self, url, timeout=1.0):
+        """
+        Initialize the backend.
+        
+        Args:
+            url: Endpoint receiving the commands
+            timeout: Request timeout in seconds
+        """
+        self.url = url
+        self.timeout = timeout
+    
+    def send(self, command, count=1):
+        """
+        POST a command.
+        
+        Args:
+            command: Command name
+            count: Number of repeats
+        """
+        body = json.dumps({"command": command, "count": count, "time": time.time()}).encode()
+        request = urllib.request.Request(self.url, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+    
+    def close(self):
+        """Nothing to release."""
+
+
+class RecordingBackend:
+    """
+    Records commands in memory instead of sending them anywhere.
+    Used by tests and benchmarks; works without a display server.
+    """
+    
+    def __init__(self, delay=0.0):
+        """
+        Initialize an empty recording.
+        
+        Args:
+            delay: Seconds to sleep per command, to simulate a slow backend
+        """
+        self.delay = delay
+        self.commands = []  # (command, count, perf_counter time)
+    
+    def send(self, command, count=1):
+        """
+        Record a command.
+        
+        Args:
+            command: Command name
+            count: Number of repeats
+        """
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown command: {command}")
+        if self.delay:
+            time.sleep(self.delay)
+        self.commands.append((command, count, time.perf_counter()))
+    
+    def names(self):
+        """Return the recorded command names in order."""
+        return [command for command, _, _ in self.commands]
+    
+    def close(self):
+        """Nothing to release."""
+
+
+class FakePlayerBackend:
+    """
+    Simulated media player for tests. Play and pause toggle it like the
+    space bar does, click() changes it behind the controller's back, and
+    query_state() reports changes only after a delay, like a real player.
+    """
+    
+    def __init__(self, state="PAUSED", latency=0.0, toggle=True, drop_every=0):
+        """
+        Initialize the player.
+        
+        Args:
+            state: Initial state, "PLAYING" or "PAUSED"
+            latency: Seconds before a state change shows up in query_state()
+            toggle: Play and pause both toggle (space bar); False makes them absolute (MPRIS)
+            drop_every: Lose every Nth command, like key presses sent to an unfocused window (0 = never)
+        """
+        self.state = state
+        self.latency = latency
+        self.toggle = toggle
+        self.drop_every = drop_every
+        self.previous = state  # Reported until the latency has passed
+        self.changed_at = float("-inf")
+        self.commands = []  # (command, count, perf_counter time)
+        self.dropped = 0
+        self.queries = 0
+    
+    def _set(self, state):
+        """Change the state, keeping the old one visible for latency seconds."""
+        if state != self.state:
+            self.previous = self.query_state(count=False)
+            self.state = state
+            self.changed_at = time.monotonic()
+    
+    def send(self, command, count=1):
+        """
+        Apply a command to the simulated player.
+        
+        Args:
+            command: Command name
+            count: Number of repeats
+        """
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown command: {command}")
+        self.commands.append((command, count, time.perf_counter()))
+        if self.drop_every and len(self.commands) % self.drop_every == 0:
+            self.dropped += 1
+            return
+        if command in ("play", "pause"):
+            if self.toggle:
+                for _ in range(count):
+                    self._set("PAUSED" if self.state == "PLAYING" else "PLAYING")
+            else:
+                self._set("PLAYING" if command == "play" else "PAUSED")
+    
+    def click(self):
+        """Toggle the player directly, as a user clicking its play button would."""
+        self._set("PAUSED" if self.state == "PLAYING" else "PLAYING")
+    
+    def query_state(self, count=True):
+        """
+        Report the player's state as seen latency seconds ago.
+        
+        Args:
+            count: Count the call in self.queries
+        
+        Returns:
+            "PLAYING" or "PAUSED"
+        """
+        if count:
+            self.queries += 1
+        if time.monotonic() - self.changed_at < self.latency:
+            return self.previous
+        return self.state
+    
+    def names(self):
+        """Return the received command names in order."""
+        return [command for command, _, _ in self.commands]
+    
+    def close(self):
+        """Nothing to release."""
+
+
+def open_backend(spec="keys"):
+    """
+    Create an output backend from a command line style specification.
+    
+    Args:
+        spec: "keys", "mpris[:NAME]", "tcp://HOST:PORT", "http://...", "memory" or "fake"
+    
+    Returns:
+        A backend object with send()/close()
+    """
+    if spec == "keys":
+        return KeystrokeBackend()
+    if spec == "memory":
+        return RecordingBackend()
+    if spec == "fake":
+        return FakePlayerBackend()
+    if spec == "mpris" or spec.startswith("mpris:"):
+        return MprisBackend(spec.partition(":")[2] or None)
+    if spec.startswith("tcp://"):
+        host, _, port = spec[len("tcp://"):].rpartition(":")
+        return SocketBackend(host or "127.0.0.1", int(port))
+    if spec.startswith(("http://", "https://")):
+        return HttpBackend(spec)
+    raise ValueError(f"Unsupported output backend: {spec}")
+
+
+def measure_commands(backend, commands=1000, async_dispatch=False):
+    """
+    Drive a MediaController with alternating commands and time them.
+    
+    In async mode the dispatcher runs without a coalescing window, and the
+    loop waits for queued commands whenever the dispatcher is full, so no
+    command is merged, cancelled or rejected and the rate counts commands
+    that were really sent.
+    
+    Args:
+        backend: Output backend
+        commands: Number of commands to issue
+        async_dispatch: Send through the background command dispatcher
+    
+    Returns:
+        Dictionary with throughput (sent commands per second) and per-call latency statistics
+    """
+    from media_controller import MediaController
+    
+    controller = MediaController(cooldown=0.0, async_dispatch=async_dispatch, backend=backend, verbose=False,
+                                 coalesce_window=0.0)
+    dispatcher = controller.dispatcher
+    # Interleaved so consecutive calls are never direct opposites
+    actions = [controller.play, controller.skip_forward, controller.pause, controller.skip_backward]
+    calls = []
+    start = time.perf_counter()
+    for i in range(commands):
+        call_start = time.perf_counter()
+        actions[i % len(actions)]()
+        calls.append(time.perf_counter() - call_start)
+        if dispatcher is not None and dispatcher.pending_count() >= dispatcher.max_pending:
+            # Back-pressure instead of rejected submissions
+            controller.last_future.result()
+    controller.close()
+    elapsed = time.perf_counter() - start
+    sent = dispatcher.sent if dispatcher is not None else commands
+    
+    ms = np.asarray(calls) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    stats = {
+        "commands": commands,
+        "per_second": sent / elapsed if elapsed > 0 else 0.0,
+        "call_p50_ms": float(p50),
+        "call_p95_ms": float(p95),
+        "call_p99_ms": float(p99),
+    }
+    if controller.dispatcher is not None:
+        stats.update(controller.dispatcher.stats())
+    return stats
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Measure media command throughput and latency.")
+    parser.add_argument("--output", default="memory", metavar="SPEC",
+                        help="output backend (default: memory)")
+    parser.add_argument("--commands", type=int, default=1000, help="number of commands to issue")
+    parser.add_argument("--async-commands", action="store_true",
+                        help="send through the background command dispatcher")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the command benchmark from the command line."""
+    args = parse_args(argv)
+    backend = open_backend(args.output)
+    stats = measure_commands(backend, args.commands, args.async_commands)
+    backend.close()
+    print(f"{stats['commands']} commands to {args.output}: {stats['per_second']:.0f}/s, "
+          f"call p50 {stats['call_p50_ms']:.3f} ms, p95 {stats['call_p95_ms']:.3f} ms, "
+          f"p99 {stats['call_p99_ms']:.3f} ms")
+    if "sent" in stats:
+        print(f"  dispatcher: sent {stats['sent']}, coalesced {stats['coalesced']}, "
+              f"cancelled {stats['cancelled']}, rejected {stats['rejected']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,49 @@
-import pyautogui
 import time
 import platform
+from command_dispatcher import CommandDispatcher
+from media_backends import KeystrokeBackend
+from playback_state import PlaybackState
 
 
 class MediaController:
     """
     Controls media playback across different applications (browser, VLC, Spotify, etc.)
-    using keyboard shortcuts.
+    using keyboard shortcuts, or any other backend from media_backends.
     """
     
-    def __init__(self, cooldown=1.0):
+    def __init__(self, cooldown=1.0, async_dispatch=False, backend=None, verbose=True, state_ttl=0.5,
+                 coalesce_window=0.15):
         """
         Initialize the media controller.
         
         Args:
             cooldown: Minimum time (seconds) between consecutive commands to prevent spam
+            async_dispatch: Send commands from a background thread instead of blocking the caller
+            backend: Output backend (defaults to keyboard shortcuts via media_backends.KeystrokeBackend)
+            verbose: Print a line for every command sent
+            state_ttl: Seconds the player's reported state is cached, for backends with query_state()
+            coalesce_window: Seconds a queued command waits to be merged with others (async mode)
         """
         self.cooldown = cooldown
-        self.last_command_time = 0
-        self.current_state = None  # "PLAYING" or "PAUSED"
-        
-        # Disable PyAutoGUI's fail-safe (moving mouse to corner stops program)
-        pyautogui.FAILSAFE = True
-        
-        # Set pause between actions to prevent issues
-        pyautogui.PAUSE = 0.1
+        self.last_command_time = float("-inf")
+        self.dispatcher = CommandDispatcher(coalesce_window=coalesce_window) if async_dispatch else None
+        self.last_future = None  # Future of the last command queued in async mode
+        self.backend = backend if backend is not None else KeystrokeBackend()
+        self.verbose = verbose
+        # Backends that can report the player's state keep it honest; others rely on the journal
+        self.state = PlaybackState(query=getattr(self.backend, "query_state", None), ttl=state_ttl)
         
         # Detect OS for platform-specific controls
         self.os_type = platform.system()
+    
+    @property
+    def current_state(self):
+        """"PLAYING", "PAUSED" or None if unknown (see PlaybackState)."""
+        return self.state.get()
+    
+    @current_state.setter
+    def current_state(self, value):
+        self.state.assume(value)
         
     def can_execute_command(self):
         """
@@ -36,29 +52,61 @@ class MediaController:
         Returns:
             True if command can be executed, False otherwise
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         if current_time - self.last_command_time >= self.cooldown:
             self.last_command_time = current_time
             return True
         return False
     
+    def _send(self, name, repair=False, count=1):
+        """
+        Send a command now, or queue it on the dispatcher thread in async mode.
+        
+        Args:
+            name: Command name ("play", "skip_forward", ...)
+            repair: Whether it repeats a command the player did not follow
+            count: Number of repeats (skips and volume steps add up)
+        """
+        if self.dispatcher is None:
+            self.backend.send(name, count)
+            self.state.record(name, repair=repair)
+            return
+        
+        # Journaled only once actually sent: a queued command may still be merged,
+        # cancelled by its opposite or rejected, and then never reaches the player
+        self.state.queue(name)
+        self.last_future = self.dispatcher.submit(
+            name, lambda count: self.backend.send(name, count), count
+        )
+        self.last_future.add_done_callback(lambda future: self._settled(future, name, repair))
+    
+    def _settled(self, future, name, repair):
+        """Journal a dispatched command once its future resolves (runs on the dispatcher thread)."""
+        if not future.cancelled() and future.exception() is None and future.result():
+            self.state.record(name, repair=repair)
+        else:
+            self.state.drop(name)
+    
+    def _log(self, message):
+        """Print a command message unless running quietly."""
+        if self.verbose:
+            print(message)
+    
     def play(self):
         """
         Send play command to media player.
         Uses space bar which works for most media players and browsers.
         """
-        if not self.can_execute_command():
+        # Only send if not already playing; checked first so a no-op never starts the cooldown
+        if not self.state.needs_send("play"):
             return False
         
-        # Only send if not already playing
-        if self.current_state == "PLAYING":
+        if not self.can_execute_command():
             return False
         
         try:
-            # Space bar works for: YouTube, Netflix, VLC, Spotify, QuickTime, etc.
-            pyautogui.press('space')
-            self.current_state = "PLAYING"
-            print("▶ PLAY command sent")
+            self._send("play")
+            self._log("▶ PLAY command sent")
             return True
         except Exception as e:
             print(f"Error sending play command: {e}")
@@ -69,18 +117,16 @@ class MediaController:
         Send pause command to media player.
         Uses space bar which works for most media players and browsers.
         """
-        if not self.can_execute_command():
+        # Only send if not already paused; checked first so a no-op never starts the cooldown
+        if not self.state.needs_send("pause"):
             return False
         
-        # Only send if not already paused
-        if self.current_state == "PAUSED":
+        if not self.can_execute_command():
             return False
         
         try:
-            # Space bar works for: YouTube, Netflix, VLC, Spotify, QuickTime, etc.
-            pyautogui.press('space')
-            self.current_state = "PAUSED"
-            print("⏸ PAUSE command sent")
+            self._send("pause")
+            self._log("⏸ PAUSE command sent")
             return True
         except Exception as e:
             print(f"Error sending pause command: {e}")
@@ -93,14 +139,13 @@ class MediaController:
         """
         if self.can_execute_command():
             try:
-                pyautogui.press('space')
                 # Toggle state
                 if self.current_state == "PLAYING":
-                    self.current_state = "PAUSED"
-                    print("⏸ PAUSE (toggle)")
+                    self._send("pause")
+                    self._log("⏸ PAUSE (toggle)")
                 else:
-                    self.current_state = "PLAYING"
-                    print("▶ PLAY (toggle)")
+                    self._send("play")
+                    self._log("▶ PLAY (toggle)")
                 return True
             except Exception as e:
                 print(f"Error toggling play/pause: {e}")
@@ -110,10 +155,7 @@ class MediaController:
     def volume_up(self):
         """Increase volume (optional feature)."""
         try:
-            if self.os_type == "Darwin":  # macOS
-                pyautogui.press('volumeup')
-            else:
-                pyautogui.press('volumeup')
+            self._send("volume_up")
             return True
         except Exception as e:
             print(f"Error increasing volume: {e}")
@@ -122,46 +164,77 @@ class MediaController:
     def volume_down(self):
         """Decrease volume (optional feature)."""
         try:
-            if self.os_type == "Darwin":  # macOS
-                pyautogui.press('volumedown')
-            else:
-                pyautogui.press('volumedown')
+            self._send("volume_down")
             return True
         except Exception as e:
             print(f"Error decreasing volume: {e}")
             return False
     
-    def skip_forward(self):
-        """Skip forward 10 seconds in media playback."""
+    def skip_forward(self, count=1):
+        """
+        Skip forward 10 seconds in media playback.
+        
+        Args:
+            count: Number of 10 second skips
+        """
         if not self.can_execute_command():
             return False
         
         try:
-            # Right arrow or 'l' key for YouTube (10 seconds forward)
-            # Works for: YouTube, VLC, most video players
-            pyautogui.press('right')
-            print("⏩ SKIP FORWARD 10 seconds")
+            self._send("skip_forward", count=count)
+            self._log(f"⏩ SKIP FORWARD {10 * count} seconds")
             return True
         except Exception as e:
             print(f"Error skipping forward: {e}")
             return False
     
-    def skip_backward(self):
-        """Skip backward 10 seconds in media playback."""
+    def skip_backward(self, count=1):
+        """
+        Skip backward 10 seconds in media playback.
+        
+        Args:
+            count: Number of 10 second skips
+        """
         if not self.can_execute_command():
             return False
         
         try:
-            # Left arrow or 'j' key for YouTube (10 seconds backward)
-            # Works for: YouTube, VLC, most video players
-            pyautogui.press('left')
-            print("⏪ SKIP BACKWARD 10 seconds")
+            self._send("skip_backward", count=count)
+            self._log(f"⏪ SKIP BACKWARD {10 * count} seconds")
             return True
         except Exception as e:
             print(f"Error skipping backward: {e}")
             return False
     
+    def reconcile(self):
+        """
+        Refresh the playback state and resend a play/pause the player did not follow.
+        Cheap enough to call every frame: the player is only asked every state_ttl seconds.
+        
+        Returns:
+            True if a repair command was sent, False otherwise
+        """
+        self.state.get()
+        target = self.state.take_repair()
+        if target is None:
+            return False
+        
+        command = "play" if target == "PLAYING" else "pause"
+        try:
+            self._send(command, repair=True)
+            self._log(f"🔧 Player did not follow {command.upper()}, sent it again")
+            return True
+        except Exception as e:
+            print(f"Error repairing playback state: {e}")
+            return False
+    
     def reset_state(self):
         """Reset the current playback state."""
         self.current_state = None
         print("State reset")
+
+    def close(self):
+        """Send any queued commands, stop the dispatcher thread and release the backend."""
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+        self.backend.close()
@@ -0,0 +1,370 @@
+import bisect
+import cProfile
+import json
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+# Histogram bucket upper bounds in seconds: 50 us to ~3 s, about 12% apart
+BUCKETS = tuple(float(b) for b in np.geomspace(5e-5, 3.0, 96))
+
+# Only every EXPORT_STEP-th bucket is exported to Prometheus
+EXPORT_STEP = 8
+
+# Stages timed per frame, in pipeline order
+STAGES = ["capture", "cache", "convert", "inference", "landmarks", "classify", "overlay", "imshow", "waitkey", "dispatch", "frame"]
+
+
+class Histogram:
+    """
+    Fixed-memory latency histogram.
+    
+    Keeps all-time bucket counts (exported to Prometheus) and a rolling
+    window made of a few time slots that are recycled in turn, so
+    percentiles reflect recent behaviour and memory never grows.
+    """
+    
+    def __init__(self, buckets=BUCKETS, slots=6, slot_seconds=10.0):
+        """
+        Initialize empty counts.
+        
+        Args:
+            buckets: Sorted bucket upper bounds in seconds
+            slots: Number of time slots in the rolling window
+            slot_seconds: Length of one slot (window = slots * slot_seconds)
+        """
+        self.buckets = buckets
+        self.slot_seconds = slot_seconds
+        self.counts = np.zeros(len(buckets) + 1, dtype=np.int64)  # Last bucket is +Inf
+        self.rolling = np.zeros((slots, len(buckets) + 1), dtype=np.int64)
+        self.slot_ids = np.full(slots, -1, dtype=np.int64)
+        self.total = 0.0
+        self.count = 0
+        self.last = 0.0
+    
+    def observe(self, seconds, now=None):
+        """
+        Add one sample.
+        
+        Args:
+            seconds: Sample value
+            now: Current time for the rolling window (defaults to time.monotonic())
+        """
+        index = bisect.bisect_left(self.buckets, seconds)
+        slot_id = int((time.monotonic() if now is None else now) // self.slot_seconds)
+        slot = slot_id % len(self.slot_ids)
+        if self.slot_ids[slot] != slot_id:
+            self.rolling[slot] = 0
+            self.slot_ids[slot] = slot_id
+        self.rolling[slot, index] += 1
+        self.counts[index] += 1
+        self.total += seconds
+        self.count += 1
+        self.last = seconds
+    
+    def window_counts(self, now=None):
+        """Return the bucket counts of the rolling window."""
+        current = int((time.monotonic() if now is None else now) // self.slot_seconds)
+        fresh = self.slot_ids > current - len(self.slot_ids)
+        return self.rolling[fresh].sum(axis=0)
+    
+    def percentile(self, pct, now=None):
+        """
+        Estimate a percentile of the rolling window.
+        
+        Args:
+            pct: Percentile between 0 and 100
+        
+        Returns:
+            Upper bound (seconds) of the bucket holding the percentile, 0 if empty
+        """
+        counts = self.window_counts(now)
+        n = counts.sum()
+        if n == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(counts), pct / 100.0 * n))
+        return self.buckets[min(index, len(self.buckets) - 1)]
+    
+    def mean(self):
+        """Return the all-time mean (seconds), 0 if empty."""
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics:
+    """
+    Registry of per-stage timing histograms and counters.
+    Safe to update from several threads.
+    """
+    
+    def __init__(self, prefix="pause_or_play"):
+        """
+        Initialize an empty registry.
+        
+        Args:
+            prefix: Prefix of the exported metric names
+        """
+        self.prefix = prefix
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.counters = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+    
+    def observe(self, stage, seconds):
+        """
+        Record the time spent in a stage.
+        
+        Args:
+            stage: Stage name
+            seconds: Time spent
+        """
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+    
+    def observe_all(self, stage_times):
+        """
+        Record several stages at once.
+        
+        Args:
+            stage_times: Dictionary of stage -> seconds (e.g. HandDetector.stage_times)
+        """
+        for stage, seconds in stage_times.items():
+            self.observe(stage, seconds)
+    
+    @contextmanager
+    def timed(self, stage):
+        """Context manager recording the time spent in its block as a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+    
+    def inc(self, name, value=1):
+        """Increase a counter."""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def set(self, name, value):
+        """Set a gauge."""
+        with self.lock:
+            self.gauges[name] = value
+    
+    def snapshot(self):
+        """
+        Return the current metrics.
+        
+        Returns:
+            JSON-serializable dictionary with per-stage count/mean/p50/p95/p99 (ms), counters and gauges
+        """
+        with self.lock:
+            stages = {
+                stage: {
+                    "count": h.count,
+                    "mean_ms": h.mean() * 1000.0,
+                    "p50_ms": h.percentile(50) * 1000.0,
+                    "p95_ms": h.percentile(95) * 1000.0,
+                    "p99_ms": h.percentile(99) * 1000.0,
+                }
+                for stage, h in self.stages.items() if h.count
+            }
+            return {
+                "time": time.time(),
+                "uptime": time.time() - self.start_time,
+                "stages": stages,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+    
+    def render_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent per processing stage.", f"# TYPE {name} histogram"]
+        with self.lock:
+            for stage, h in self.stages.items():
+                if not h.count:
+                    continue
+                cumulative = np.cumsum(h.counts)
+                # Every 8th bound (about 2.5x apart) keeps the exported series small and fixed
+                for index in range(0, len(h.buckets), EXPORT_STEP):
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{h.buckets[index]:.6g}"}} {cumulative[index]}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.total:.9g}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+            for counter, value in self.counters.items():
+                lines += [f"# TYPE {self.prefix}_{counter}_total counter", f"{self.prefix}_{counter}_total {value}"]
+            for gauge, value in self.gauges.items():
+                lines += [f"# TYPE {self.prefix}_{gauge} gauge", f"{self.prefix}_{gauge} {value:.6g}"]
+        return "\n".join(lines) + "\n"
+    
+    def dump_json(self, path):
+        """
+        Write a snapshot to a JSON file atomically.
+        
+        Args:
+            path: Output file path
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+    
+    def report(self):
+        """Print p50/p95 per stage for the rolling window."""
+        s = self.snapshot()["stages"]
+        parts = [f"{stage} {v['p50_ms']:.1f}/{v['p95_ms']:.1f}" for stage, v in s.items()]
+        print("⏱ Stages p50/p95 ms: " + " | ".join(parts))
+
+
+class StartupTimer:
+    """
+    Records when each startup milestone was reached, relative to a start time.
+    """
+    
+    def __init__(self, start=None):
+        """
+        Initialize the timer.
+        
+        Args:
+            start: time.perf_counter() value startup is measured from (defaults to now)
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}  # Milestone -> seconds since start, in the order reached
+        self.lock = threading.Lock()
+    
+    def mark(self, name, when=None):
+        """
+        Record a milestone the first time it is reached.
+        
+        Args:
+            name: Milestone name
+            when: time.perf_counter() value it was reached (defaults to now)
+        
+        Returns:
+            True if this was the first time
+        """
+        with self.lock:
+            if name in self.marks:
+                return False
+            self.marks[name] = (time.perf_counter() if when is None else when) - self.start
+            return True
+    
+    def export(self, metrics):
+        """Copy every milestone into a Metrics registry as a startup_<name>_seconds gauge."""
+        with self.lock:
+            marks = dict(self.marks)
+        for name, seconds in marks.items():
+            metrics.set(f"startup_{name}_seconds", seconds)
+    
+    def report(self):
+        """Print the milestones reached so far."""
+        with self.lock:
+            parts = [f"{name.replace('_', ' ')} {seconds:.2f} s" for name, seconds in self.marks.items()]
+        print("🚀 Startup: " + " | ".join(parts))
+
+
+class MetricsServer:
+    """
+    Serves a Metrics registry over HTTP from a background thread:
+    /metrics in Prometheus text format and /metrics.json as JSON.
+    """
+    
+    def __init__(self, metrics, port=9100, host="127.0.0.1"):
+        """
+        Start the server.
+        
+        Args:
+            metrics: Metrics instance
+            port: TCP port (0 picks a free one)
+            host: Interface to listen on (localhost only by default)
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.render_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(metrics.snapshot()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, *args):
+                pass  # Keep the terminal status line clean
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+    
+    def close(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ProfileToggle:
+    """
+    cProfile that can be switched on and off while the application runs.
+    
+    Profiling starts immediately if enabled; on POSIX systems SIGUSR1 toggles
+    it, so a deployed unit can be profiled for a while without a restart.
+    Stats are written to the output file every time profiling stops.
+    
+    cProfile only sees the thread that started it (the main loop). With
+    the threaded pipeline, capture and inference run in worker threads
+    and do not show up in the stats; profile those with a sampler such as
+    `py-spy dump --pid <pid>` or `py-spy record --threads`. The worker
+    threads have stable names, so its output is easy to read.
+    """
+    
+    def __init__(self, path, enabled=True):
+        """
+        Initialize the profiler.
+        
+        Args:
+            path: Output file for the stats (open with pstats or snakeviz)
+            enabled: Start profiling right away
+        """
+        self.path = path
+        self.profiler = None
+        if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.toggle())
+        if enabled:
+            self.start()
+    
+    def start(self):
+        """Start profiling the calling thread (only that thread, see the class docstring)."""
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            print(f"\n🔬 Profiling started (stats go to {self.path})")
+    
+    def stop(self):
+        """Stop profiling and write the stats."""
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.path)
+            self.profiler = None
+            print(f"\n🔬 Profile written to {self.path}")
+    
+    def toggle(self):
+        """Start profiling if stopped, otherwise stop and write the stats."""
+        if self.profiler is None:
+            self.start()
+        else:
+            self.stop()
@@ -0,0 +1,386 @@
+import multiprocessing
+import queue
+import time
+
+import numpy as np
+
+from frame_sources import open_source
+from hand_detector import HandDetector, classify_fingers, gesture_from_count
+from pipeline import FramePool, LatencyTracker, read_frame
+
+
+class HandResult:
+    """
+    Gesture result of one detected hand.
+    """
+    
+    def __init__(self, handedness, gesture, finger_count, size):
+        """
+        Initialize the result.
+        
+        Args:
+            handedness: "Left", "Right" or None
+            gesture: Gesture name
+            finger_count: Number of extended fingers
+            size: Bounding box diagonal relative to the frame diagonal (bigger = closer)
+        """
+        self.handedness = handedness
+        self.gesture = gesture
+        self.finger_count = finger_count
+        self.size = size
+
+
+class SourceResult:
+    """
+    All hands detected in one frame of one source, sent from a worker
+    process to the arbitration stage. Frames stay in the worker process;
+    only these small results cross the process boundary.
+    """
+    
+    def __init__(self, source, frame_id, capture_time, hands, inference_time=0.0):
+        """
+        Initialize the result.
+        
+        Args:
+            source: Index of the source in the --sources list
+            frame_id: Sequential frame number within the source
+            capture_time: time.perf_counter() timestamp taken right after capture
+            hands: List of HandResult objects
+            inference_time: Seconds spent detecting and classifying
+        """
+        self.source = source
+        self.frame_id = frame_id
+        self.capture_time = capture_time
+        self.hands = hands
+        self.inference_time = inference_time
+        self.finished = False  # Set on the last message of a source
+        self.error = None  # Set if the source failed
+
+
+def detect_hands(detector, img):
+    """
+    Detect every hand in a frame and classify each one.
+    
+    Args:
+        detector: HandDetector instance
+        img: BGR frame
+    
+    Returns:
+        List of HandResult objects
+    """
+    detector.find_hands(img, draw=False)
+    landmarks = detector.get_all_landmarks(img)
+    if len(landmarks) == 0:
+        return []
+    
+    fingers = classify_fingers(landmarks)
+    counts = fingers.sum(axis=-1)
+    if detector.classifier is not None:
+        gestures = detector.classifier.predict_batch(landmarks)
+    elif detector.gesture_map is not None:
+        gestures = [detector.gesture_map.names[i] for i in detector.gesture_map.gestures_for(fingers)]
+    else:
+        gestures = [gesture_from_count(int(count)) for count in counts]
+    handedness = detector.get_all_handedness()
+    h, w = img.shape[:2]
+    extent = landmarks[:, :, :2].max(axis=1) - landmarks[:, :, :2].min(axis=1)
+    sizes = np.hypot(extent[:, 0], extent[:, 1]) / np.hypot(w, h)
+    return [
+        HandResult(handedness[i] if i < len(handedness) else None,
+                   gestures[i], int(counts[i]), float(sizes[i]))
+        for i in range(len(landmarks))
+    ]
+
+
+def source_worker(index, spec, detector_options, result_queue, stop_event, flip=True):
+    """
+    Worker process: read one source and run its own MediaPipe Hands instance.
+    
+    Args:
+        index: Index of the source
+        spec: Frame source specification (see frame_sources.open_source)
+        detector_options: Keyword arguments for HandDetector
+        result_queue: multiprocessing.Queue receiving SourceResult objects
+        stop_event: multiprocessing.Event set when the worker should stop
+        flip: Whether to mirror frames horizontally
+    """
+    final = SourceResult(index, 0, time.perf_counter(), [])
+    final.finished = True
+    cap = open_source(spec, width=1280, height=720)
+    if not cap.isOpened() or not hasattr(cap, "read"):
+        final.error = f"could not open frame source {spec}"
+        result_queue.put(final)
+        return
+    
+    detector = None
+    pool = FramePool(size=2)
+    frame_id = 0
+    try:
+        detector = HandDetector(**detector_options)
+        detector.warm_up(1280, 720)
+        while not stop_event.is_set():
+            success, img = read_frame(cap, pool, flip)
+            if not success:
+                break
+            capture_time = time.perf_counter()
+            frame_id += 1
+            hands = detect_hands(detector, img)
+            pool.release(img)
+            result = SourceResult(index, frame_id, capture_time, hands, time.perf_counter() - capture_time)
+            put_latest(result_queue, result)
+    except Exception as e:
+        final.error = str(e)
+    finally:
+        cap.release()
+        if detector is not None:
+            detector.close()
+    final.frame_id = frame_id
+    result_queue.put(final)
+
+
+def put_latest(result_queue, result):
+    """
+    Queue a result without blocking on a slow arbiter: when the queue is
+    full, the oldest waiting result is thrown away to make room, so the
+    arbiter always gets the newest results (latest wins).
+    
+    Args:
+        result_queue: multiprocessing.Queue shared by all workers
+        result: SourceResult to queue
+    """
+    while True:
+        try:
+            result_queue.put_nowait(result)
+            return
+        except queue.Full:
+            pass
+        try:
+            stale = result_queue.get_nowait()
+        except queue.Empty:
+            continue
+        if stale.finished:
+            # The end of another source must not be lost with the stale frames
+            result_queue.put(stale)
+
+
+class SourceStats:
+    """
+    Frame rate, latency and drop counters of one source.
+    """
+    
+    def __init__(self, spec):
+        """
+        Initialize the counters.
+        
+        Args:
+            spec: Frame source specification (for reports)
+        """
+        self.spec = spec
+        self.frames = 0
+        self.dropped = 0
+        self.inference = LatencyTracker()
+        self.latency = LatencyTracker()
+        self.finished = False
+        self.error = None
+
+
+class MultiSourcePipeline:
+    """
+    Runs one worker process per frame source, each with its own MediaPipe
+    Hands instance, so detection scales with CPU cores instead of sharing
+    one interpreter lock. Per-hand results from all workers are merged
+    into one stream for the arbitration stage in the calling process.
+    """
+    
+    def __init__(self, specs, detector_options=None, flip=True, queue_size=None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            specs: List of frame source specifications, one worker process each
+            detector_options: Keyword arguments for every worker's HandDetector
+            flip: Whether to mirror frames horizontally
+            queue_size: Maximum number of results waiting for the arbiter
+                        (default: 4 per source)
+        """
+        self.specs = list(specs)
+        self.detector_options = detector_options or {}
+        self.flip = flip
+        # "spawn" gives every worker a fresh interpreter; MediaPipe is not fork-safe
+        self.context = multiprocessing.get_context("spawn")
+        self.result_queue = self.context.Queue(maxsize=queue_size or 4 * len(self.specs))
+        self.stop_event = self.context.Event()
+        self.processes = []
+        self.sources = [SourceStats(spec) for spec in self.specs]
+        self.start_time = None
+    
+    def start(self):
+        """Start one worker process per source."""
+        self.start_time = time.perf_counter()
+        for index, spec in enumerate(self.specs):
+            process = self.context.Process(
+                target=source_worker, name=f"source-{index}",
+                args=(index, spec, self.detector_options, self.result_queue, self.stop_event, self.flip),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+    
+    def results(self, timeout=1.0):
+        """
+        Yield results from all sources as they arrive.
+        
+        Args:
+            timeout: Maximum time (seconds) to wait for each result
+        
+        Yields:
+            SourceResult objects; stops once every source has finished
+        """
+        while not all(source.finished for source in self.sources):
+            try:
+                result = self.result_queue.get(timeout=timeout)
+            except queue.Empty:
+                if not any(process.is_alive() for process in self.processes):
+                    return
+                continue
+            
+            source = self.sources[result.source]
+            # Frames of the source that never reached the arbiter
+            source.dropped = result.frame_id - source.frames - (0 if result.finished else 1)
+            if result.finished:
+                source.finished = True
+                source.error = result.error
+                if result.error:
+                    print(f"\n❌ Source {source.spec}: {result.error}")
+                continue
+            source.frames += 1
+            source.inference.add(result.inference_time)
+            yield result
+    
+    def record_dispatch(self, result):
+        """
+        Record end-to-end latency once a result has been arbitrated and dispatched.
+        
+        Args:
+            result: The SourceResult that was just handled
+        """
+        self.sources[result.source].latency.add(time.perf_counter() - result.capture_time)
+    
+    def stats(self):
+        """
+        Return a snapshot of per-source statistics.
+        
+        Returns:
+            List of dictionaries with FPS, dropped results, inference time and latency per source
+        """
+        elapsed = max(time.perf_counter() - (self.start_time or time.perf_counter()), 1e-6)
+        return [
+            {
+                "source": source.spec,
+                "fps": source.frames / elapsed,
+                "dropped": source.dropped,
+                "inference_mean_ms": source.inference.mean_ms(),
+                "latency_mean_ms": source.latency.mean_ms(),
+                "latency_p95_ms": source.latency.percentile_ms(95),
+            }
+            for source in self.sources
+        ]
+    
+    def report(self):
+        """Print a summary of the per-source statistics."""
+        for s in self.stats():
+            print(f"📊 Source {s['source']}: {s['fps']:.1f} FPS | dropped {s['dropped']} | "
+                  f"inference {s['inference_mean_ms']:.1f} ms | "
+                  f"latency mean {s['latency_mean_ms']:.1f} ms, p95 {s['latency_p95_ms']:.1f} ms")
+    
+    def stop(self):
+        """Stop the worker processes and wait for them to finish."""
+        self.stop_event.set()
+        deadline = time.perf_counter() + 2.0
+        for process in self.processes:
+            # Drain the queue so workers blocked on their final put() can exit
+            while process.is_alive() and time.perf_counter() < deadline:
+                try:
+                    self.result_queue.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+            if process.is_alive():
+                process.terminate()
+            process.join(timeout=1.0)
+
+
+class GestureArbiter:
+    """
+    Decides which hand on which camera controls playback.
+    
+    The hand that currently has control keeps it for as long as it is
+    seen; a frame that misses it does not count, only when it has not
+    been seen for longer than max_age does control pass to the largest
+    (closest) visible hand, preferring earlier sources on ties.
+    """
+    
+    def __init__(self, max_age=0.5, min_size=0.05):
+        """
+        Initialize the arbiter.
+        
+        Args:
+            max_age: Seconds after which a hand that was not seen again is forgotten
+            min_size: Smallest hand size (see HandResult.size) allowed to take control
+        """
+        self.max_age = max_age
+        self.min_size = min_size
+        self.hands = {}  # (source, handedness, slot) -> (HandResult, capture_time)
+        self.owner = None  # Key of the hand in control
+        self.switches = 0
+    
+    def update(self, result):
+        """
+        Feed the hands seen in one frame of one source.
+        
+        Args:
+            result: SourceResult
+        
+        Returns:
+            Tuple of (gesture, finger_count, owner) for the controlling hand;
+            ("NO_HAND", -1, None) when no hand is in control
+        """
+        # Replace everything previously seen by this source with this frame's hands, except
+        # the controlling hand when this frame missed it: its last entry is kept until max_age
+        kept = self.owner
+        if (kept is None or kept[0] != result.source
+                or any(hand.handedness == kept[1] for hand in result.hands)):
+            kept = None
+        self.hands = {key: value for key, value in self.hands.items()
+                      if key[0] != result.source or key == kept}
+        for slot, hand in enumerate(result.hands):
+            self.hands[(result.source, hand.handedness, slot)] = (hand, result.capture_time)
+        
+        now = time.perf_counter()
+        self.hands = {key: value for key, value in self.hands.items() if now - value[1] <= self.max_age}
+        
+        owner = self._find_owner()
+        if owner is None:
+            candidates = [key for key, (hand, _) in self.hands.items() if hand.size >= self.min_size]
+            if candidates:
+                owner = max(candidates, key=lambda key: (self.hands[key][0].size, -key[0]))
+        if owner is not None and (self.owner is None or owner[:2] != self.owner[:2]):
+            self.switches += 1
+        self.owner = owner
+        
+        if owner is None:
+            return "NO_HAND", -1, None
+        hand = self.hands[owner][0]
+        return hand.gesture, hand.finger_count, owner
+    
+    def _find_owner(self):
+        """Return the key under which the controlling hand is currently seen, or None."""
+        if self.owner is None:
+            return None
+        if self.owner in self.hands:
+            return self.owner
+        # The same hand may have moved to another slot in the source's hand list
+        source, handedness, _ = self.owner
+        for key in self.hands:
+            if key[0] == source and key[1] == handedness:
+                return key
+        return None
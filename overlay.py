@@ -0,0 +1,195 @@
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+GUIDE_TEXT = "Gestures: Fist=Play | Palm=Pause | 2F=Rewind | 3F=Forward | Q=Quit"
+
+# Status text colors (BGR) of the bundled gestures
+GESTURE_COLORS = {
+    "OPEN_PALM": (0, 255, 0),  # Green
+    "CLOSED_FIST": (0, 0, 255),  # Red
+    "PEACE_SIGN": (255, 0, 255),  # Magenta
+    "THREE_FINGERS": (255, 255, 0),  # Yellow
+}
+
+
+class OverlayRenderer:
+    """
+    Draws the status panel and gesture guide onto frames.
+    
+    The parts that never change (panel backgrounds, borders and the gesture
+    guide banner) are rasterized once per frame size into a cached layer and
+    composited onto each frame; only the per-frame text is drawn every time.
+    """
+    
+    def __init__(self, alpha=1.0, window=120, guide_text=GUIDE_TEXT, action_labels=None):
+        """
+        Initialize the renderer.
+    
+        Args:
+            alpha: Opacity of the static panels (1.0 = opaque)
+            window: Number of recent draw timings kept for statistics
+            guide_text: One-line gesture guide shown at the bottom
+            action_labels: Gesture name -> action shown next to it (GestureMap.action_labels())
+        """
+        self.alpha = alpha
+        self.guide_text = guide_text
+        self.action_labels = action_labels or {}
+        self.layer = None
+        self.mask = None  # 1 where the static layer covers the frame
+        self.copies = []  # (y0, y1, x0, x1) fully covered boxes, copied as-is
+        self.masked = []  # (y0, y1, x0, x1) boxes copied through the mask
+        self.timings = deque(maxlen=window)
+        self.last_time = 0.0  # Seconds spent drawing the last frame
+    
+    def _draw_static(self, layer):
+        """
+        Draw the static panels onto an image.
+    
+        Args:
+            layer: Image to draw on (modified in place)
+        """
+        h, w = layer.shape[:2]
+        guide_y = h - 80
+        
+        # Background for text (increased height for finger indicator)
+        cv2.rectangle(layer, (10, 10), (w - 10, 200), (0, 0, 0), -1)
+        cv2.rectangle(layer, (10, 10), (w - 10, 200), (255, 255, 255), 2)
+        
+        # Gesture guide at bottom
+        cv2.rectangle(layer, (10, guide_y - 10), (w - 10, h - 10), (0, 0, 0), -1)
+        cv2.rectangle(layer, (10, guide_y - 10), (w - 10, h - 10), (255, 255, 255), 1)
+        cv2.putText(layer, self.guide_text, (20, guide_y + 20), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.5, (200, 200, 200), 1, cv2.LINE_AA)
+    
+    def _build_layer(self, h, w):
+        """
+        Rasterize the static panels for a frame size.
+        
+        Args:
+            h: Frame height
+            w: Frame width
+        """
+        # Drawing on a black and a white canvas tells exactly which pixels the panels cover
+        on_black = np.zeros((h, w, 3), dtype=np.uint8)
+        on_white = np.full((h, w, 3), 255, dtype=np.uint8)
+        self._draw_static(on_black)
+        self._draw_static(on_white)
+        mask = (on_black == on_white).all(axis=2).astype(np.uint8)
+        
+        # Only the bounding boxes of the panels are touched per frame. Fully covered
+        # interiors are plain copies; only the edge strips need the mask.
+        guide_y = h - 80
+        self.copies = []
+        self.masked = []
+        for top, bottom in ((0, 205), (max(0, guide_y - 15), h)):
+            rows = np.nonzero(mask[top:bottom].any(axis=1))[0]
+            cols = np.nonzero(mask[top:bottom].any(axis=0))[0]
+            if not len(rows):
+                continue
+            y0, y1, x0, x1 = top + rows[0], top + rows[-1] + 1, cols[0], cols[-1] + 1
+            e = 3
+            if y1 - y0 > 2 * e and x1 - x0 > 2 * e and mask[y0 + e:y1 - e, x0 + e:x1 - e].all():
+                self.copies.append((y0 + e, y1 - e, x0 + e, x1 - e))
+                self.masked += [(y0, y0 + e, x0, x1), (y1 - e, y1, x0, x1),
+                                (y0 + e, y1 - e, x0, x0 + e), (y0 + e, y1 - e, x1 - e, x1)]
+            else:
+                self.masked.append((y0, y1, x0, x1))
+        self.layer = on_black
+        self.mask = mask
+    
+    def _composite(self, img):
+        """
+        Copy (or blend) the cached static layer onto a frame.
+        
+        Args:
+            img: Frame to draw on (modified in place)
+        """
+        h, w = img.shape[:2]
+        if self.layer is None or self.layer.shape[:2] != (h, w):
+            self._build_layer(h, w)
+        
+        for y0, y1, x0, x1 in self.copies:
+            region = img[y0:y1, x0:x1]
+            if self.alpha < 1.0:
+                cv2.addWeighted(self.layer[y0:y1, x0:x1], self.alpha, region, 1.0 - self.alpha, 0, dst=region)
+            else:
+                region[:] = self.layer[y0:y1, x0:x1]
+        
+        for y0, y1, x0, x1 in self.masked:
+            region = img[y0:y1, x0:x1]
+            layer = self.layer[y0:y1, x0:x1]
+            if self.alpha < 1.0:
+                layer = cv2.addWeighted(layer, self.alpha, region, 1.0 - self.alpha, 0)
+            cv2.copyTo(layer, self.mask[y0:y1, x0:x1], region)
+    
+    def draw(self, img, gesture, finger_count, state, stable_frames, stability_threshold):
+        """
+        Draw the status panel and gesture guide onto the frame.
+        
+        Args:
+            img: Frame to draw on (modified in place)
+            gesture: Current gesture name
+            finger_count: Number of extended fingers (-1 if no hand)
+            state: Current media state ("PLAYING", "PAUSED" or None)
+            stable_frames: Consecutive frames the gesture has been seen
+            stability_threshold: Frames needed to confirm a gesture
+        """
+        start = time.perf_counter()
+        h, w, c = img.shape
+        
+        self._composite(img)
+        
+        # Display gesture and finger count, with the action the gesture config gives it
+        if gesture == "NO_HAND":
+            text = "NO HAND DETECTED"
+            color = (0, 165, 255)  # Orange
+        elif gesture != "UNKNOWN":
+            text = f"{gesture.replace('_', ' ')} ({finger_count} fingers)"
+            if gesture in self.action_labels:
+                text += f" - {self.action_labels[gesture]}"
+            color = GESTURE_COLORS.get(gesture, (255, 255, 255))  # White for gestures added in the config
+        else:
+            text = f"UNKNOWN GESTURE ({finger_count} fingers)"
+            color = (128, 128, 128)  # Gray
+        
+        cv2.putText(img, text, (20, 50), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.9, color, 2, cv2.LINE_AA)
+        
+        # Display finger count with visual indicator
+        if finger_count >= 0:
+            finger_text = f"Fingers Detected: {finger_count}"
+            cv2.putText(img, finger_text, (20, 90),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+            
+            # Visual finger indicator
+            finger_indicator = "O " * finger_count + "X " * (5 - finger_count)
+            cv2.putText(img, finger_indicator, (20, 160),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (100, 200, 255), 1, cv2.LINE_AA)
+        
+        # Display state
+        state_text = f"State: {state if state else 'UNKNOWN'}"
+        cv2.putText(img, state_text, (20, 125),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2, cv2.LINE_AA)
+        
+        # Display stability indicator
+        stability_text = f"Stability: {stable_frames}/{stability_threshold}"
+        stability_color = (0, 255, 0) if stable_frames >= stability_threshold else (100, 100, 100)
+        cv2.putText(img, stability_text, (w - 300, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, stability_color, 2, cv2.LINE_AA)
+    
+        self.last_time = time.perf_counter() - start
+        self.timings.append(self.last_time)
+    
+    def mean_ms(self):
+        """Return the mean overlay drawing time in milliseconds (0 if nothing drawn yet)."""
+        if not self.timings:
+            return 0.0
+        return 1000.0 * sum(self.timings) / len(self.timings)
+    
+    def report(self):
+        """Print the mean overlay drawing time."""
+        print(f"🖌 Overlay: {self.mean_ms():.2f} ms/frame")
@@ -0,0 +1,466 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class FramePool:
+    """
+    Free list of reusable frame buffers.
+    
+    Frames are read and flipped into buffers taken from the pool and
+    handed back once the frame has been displayed or dropped, so in steady
+    state no image memory is allocated per frame.
+    """
+    
+    def __init__(self, size=8):
+        """
+        Initialize an empty pool.
+        
+        Args:
+            size: Maximum number of idle buffers kept for reuse
+        """
+        self.size = size
+        self.shape = None  # Frame shape, learned from the first frame read
+        self.free = []
+        self.lock = threading.Lock()
+        self.allocated = 0  # Buffers allocated by the pool so far
+    
+    def acquire(self):
+        """
+        Take a buffer for the next frame.
+        
+        Returns:
+            A uint8 array of the frame shape, or None while the shape is not known yet
+        """
+        with self.lock:
+            while self.free:
+                buf = self.free.pop()
+                if buf.shape == self.shape:
+                    return buf
+            if self.shape is None:
+                return None
+            self.allocated += 1
+        return np.empty(self.shape, dtype=np.uint8)
+    
+    def release(self, buf):
+        """
+        Hand a buffer back for reuse.
+        
+        Args:
+            buf: Buffer that is no longer used (None is ignored)
+        """
+        if buf is None:
+            return
+        with self.lock:
+            if buf.shape == self.shape and len(self.free) < self.size:
+                self.free.append(buf)
+
+
+def read_frame(cap, pool=None, flip=False):
+    """
+    Read a frame, reusing pooled buffers for the capture and the flip.
+    
+    Args:
+        cap: Opened frame source
+        pool: Optional FramePool
+        flip: Whether to mirror the frame horizontally
+    
+    Returns:
+        Tuple of (success, image); the image belongs to the pool if one is given
+    """
+    if pool is None:
+        success, img = cap.read()
+        if success and flip:
+            img = cv2.flip(img, 1)
+        return success, img
+    
+    buf = pool.acquire()
+    success, img = cap.read(buf) if buf is not None else cap.read()
+    if img is not buf:
+        # The source could not fill the buffer (e.g. decoded image files, or a size change)
+        pool.release(buf)
+    if not success:
+        return False, None
+    if pool.shape is None:
+        pool.shape = img.shape
+    if flip:
+        flipped = pool.acquire()
+        flipped = cv2.flip(img, 1, dst=flipped) if flipped is not None else cv2.flip(img, 1)
+        pool.release(img)
+        img = flipped
+    return True, img
+
+
+class LatestFrameQueue:
+    """
+    Bounded single-slot queue where the latest frame always wins.
+    A put() on a full queue replaces the stale item instead of blocking,
+    so a slow consumer never stalls the producer.
+    """
+    
+    def __init__(self, on_drop=None):
+        """
+        Initialize an empty slot.
+        
+        Args:
+            on_drop: Optional callable receiving each stale item that is overwritten
+        """
+        self._item = None
+        self._has_item = False
+        self.closed = False
+        self._cond = threading.Condition()
+        self.dropped = 0  # Number of stale items overwritten before being read
+        self.on_drop = on_drop
+    
+    def put(self, item):
+        """
+        Store an item, replacing any unread one.
+        
+        Args:
+            item: Item to store
+        """
+        with self._cond:
+            if self._has_item:
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(self._item)
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+    
+    def get(self, timeout=None):
+        """
+        Take the latest item, waiting until one is available.
+        
+        Args:
+            timeout: Maximum time (seconds) to wait, None to wait forever
+        
+        Returns:
+            The latest item, or None on timeout or when the queue is closed
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._has_item or self.closed, timeout):
+                return None
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+    
+    def close(self):
+        """Wake up all waiting consumers; subsequent gets return None once drained."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FramePacket:
+    """
+    A captured frame travelling through the pipeline together with
+    its timestamps and, after inference, its gesture result.
+    """
+    
+    def __init__(self, frame_id, img, capture_time):
+        """
+        Initialize the packet.
+        
+        Args:
+            frame_id: Sequential id assigned by the capture stage
+            img: Captured (mirrored) BGR frame
+            capture_time: time.perf_counter() timestamp taken right after capture
+        """
+        self.frame_id = frame_id
+        self.img = img
+        self.capture_time = capture_time
+        self.gesture = None
+        self.finger_count = -1
+        self.landmarks = None  # (21, 3) landmark array, None if no hand
+        self.handedness = None  # "Left"/"Right" of the detected hand
+        self.inferred = False  # False if the scheduler reused the previous result
+        self.cached = False  # True if the result cache reused the result of a near-identical frame
+        self.inference_time = 0.0  # Seconds spent in detect_gesture
+        self.stage_times = {}  # Seconds spent per stage (capture, convert, inference, ...)
+
+
+def detect_packet(detector, packet, scheduler=None, draw=True, cache=None):
+    """
+    Fill in the gesture result of a packet, running detection only when needed.
+    
+    Args:
+        detector: HandDetector instance
+        packet: FramePacket to process (updated in place)
+        scheduler: Optional InferenceScheduler deciding whether to run detection
+        draw: Whether to draw hand landmarks on the frame
+        cache: Optional frame_cache.ResultCache reusing the result of a near-identical frame
+    """
+    start = time.perf_counter()
+    if scheduler is not None and not scheduler.should_infer(packet.img):
+        packet.gesture, packet.finger_count, packet.landmarks = scheduler.skipped_result()
+        packet.inference_time = time.perf_counter() - start
+        return
+    
+    hit = cache.lookup(packet.img) if cache is not None else None
+    if hit is not None:
+        packet.gesture, packet.finger_count, packet.landmarks, packet.handedness = hit
+        packet.cached = True
+        packet.stage_times["cache"] = time.perf_counter() - start
+    elif cache is not None:
+        # The reference thumbnail must be taken before landmarks are drawn onto the frame
+        packet.gesture, packet.finger_count, packet.img = detector.detect_gesture(packet.img, draw=False)
+        packet.landmarks = detector.landmarks
+        packet.handedness = detector.get_handedness()
+        cache.store(packet.img, packet.gesture, packet.finger_count, packet.landmarks, packet.handedness)
+        packet.inferred = True
+        packet.stage_times.update(detector.stage_times)
+    else:
+        packet.gesture, packet.finger_count, packet.img = detector.detect_gesture(packet.img, draw=draw)
+        packet.landmarks = detector.landmarks
+        packet.handedness = detector.get_handedness()
+        packet.inferred = True
+        packet.stage_times.update(detector.stage_times)
+    
+    if cache is not None and draw:
+        detector.draw_landmarks(packet.img)
+    if scheduler is not None:
+        scheduler.update(packet.gesture, packet.finger_count, packet.landmarks)
+    packet.inference_time = time.perf_counter() - start
+
+
+class LatencyTracker:
+    """
+    Rolling window of end-to-end latencies (capture to render/dispatch).
+    """
+    
+    def __init__(self, window=120):
+        """
+        Initialize the tracker.
+        
+        Args:
+            window: Number of most recent samples to keep
+        """
+        self.samples = deque(maxlen=window)
+    
+    def add(self, latency):
+        """
+        Record a latency sample.
+        
+        Args:
+            latency: Latency in seconds
+        """
+        self.samples.append(latency)
+    
+    def mean_ms(self):
+        """Return the mean latency in milliseconds (0 if no samples)."""
+        if not self.samples:
+            return 0.0
+        return 1000.0 * sum(self.samples) / len(self.samples)
+    
+    def percentile_ms(self, pct):
+        """
+        Return a latency percentile in milliseconds.
+        
+        Args:
+            pct: Percentile between 0 and 100
+        """
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return 1000.0 * ordered[index]
+
+
+class CaptureThread(threading.Thread):
+    """
+    Reads frames from the camera at full camera FPS and publishes them
+    into a LatestFrameQueue. Never waits on inference.
+    """
+    
+    def __init__(self, cap, out_queue, flip=True, pool=None):
+        """
+        Initialize the capture stage.
+        
+        Args:
+            cap: Opened cv2.VideoCapture
+            out_queue: LatestFrameQueue receiving FramePacket objects
+            flip: Whether to mirror frames horizontally
+            pool: Optional FramePool supplying the frame buffers
+        """
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.out_queue = out_queue
+        self.flip = flip
+        self.pool = pool
+        self.running = True
+        self.frames_captured = 0
+        self.failed = False
+    
+    def run(self):
+        while self.running:
+            start = time.perf_counter()
+            success, img = read_frame(self.cap, self.pool, self.flip)
+            if not success:
+                self.failed = True
+                break
+            read_time = time.perf_counter() - start
+            self.frames_captured += 1
+            packet = FramePacket(self.frames_captured, img, time.perf_counter())
+            packet.stage_times["capture"] = read_time
+            self.out_queue.put(packet)
+        self.out_queue.close()
+
+
+class InferenceWorker(threading.Thread):
+    """
+    Runs hand detection on the most recent captured frame and publishes
+    the annotated result. Frames that arrive while inference is running
+    are dropped by the input queue.
+    """
+    
+    def __init__(self, detector, in_queue, out_queue, scheduler=None, draw=True, cache=None, governor=None):
+        """
+        Initialize the inference stage.
+        
+        Args:
+            detector: HandDetector instance (only used from this thread)
+            in_queue: LatestFrameQueue of captured FramePacket objects
+            out_queue: LatestFrameQueue receiving processed FramePacket objects
+            scheduler: Optional InferenceScheduler for adaptive frame skipping
+            draw: Whether to draw hand landmarks on the frames
+            cache: Optional ResultCache for near-identical frames
+            governor: Optional ResourceGovernor pacing this thread and applying its settings
+        """
+        super().__init__(name="inference", daemon=True)
+        self.detector = detector
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.scheduler = scheduler
+        self.draw = draw
+        self.cache = cache
+        self.governor = governor
+        self.running = True
+        self.frames_processed = 0
+    
+    def run(self):
+        while self.running:
+            if self.governor is not None:
+                self.governor.begin_frame(self.detector)
+            packet = self.in_queue.get(timeout=0.5)
+            if packet is None:
+                if self.in_queue.closed:
+                    break
+                continue
+            detect_packet(self.detector, packet, self.scheduler, self.draw, self.cache)
+            self.frames_processed += 1
+            self.out_queue.put(packet)
+        self.out_queue.close()
+
+
+class GesturePipeline:
+    """
+    Threaded capture -> inference -> render/dispatch pipeline.
+    
+    Capture and inference each run in their own thread and are joined by
+    single-slot "latest frame wins" queues, so the camera keeps running at
+    full FPS while MediaPipe works and stale frames are dropped instead of
+    queueing up. The render/dispatch stage is the caller's loop, which
+    pulls results with results().
+    """
+    
+    def __init__(self, cap, detector, flip=True, scheduler=None, draw=True, pool=None, cache=None,
+                 governor=None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            cap: Opened cv2.VideoCapture
+            detector: HandDetector instance
+            flip: Whether to mirror frames horizontally
+            scheduler: Optional InferenceScheduler for adaptive frame skipping
+            draw: Whether to draw hand landmarks on the frames
+            pool: Optional FramePool; buffers of dropped and handled frames go back to it
+            cache: Optional ResultCache reusing results for near-identical frames
+            governor: Optional ResourceGovernor limiting the inference rate and cost
+        """
+        self.pool = pool
+        on_drop = (lambda packet: pool.release(packet.img)) if pool is not None else None
+        self.capture_queue = LatestFrameQueue(on_drop)
+        self.result_queue = LatestFrameQueue(on_drop)
+        self.capture = CaptureThread(cap, self.capture_queue, flip=flip, pool=pool)
+        self.inference = InferenceWorker(detector, self.capture_queue, self.result_queue, scheduler, draw, cache,
+                                         governor)
+        self.latency = LatencyTracker()
+        self.start_time = None
+    
+    def start(self):
+        """Start the capture and inference threads."""
+        self.start_time = time.perf_counter()
+        self.capture.start()
+        self.inference.start()
+    
+    def results(self, timeout=1.0):
+        """
+        Yield processed frames in the render/dispatch thread.
+        
+        Args:
+            timeout: Maximum time (seconds) to wait for each result
+        
+        Yields:
+            Processed FramePacket objects, oldest unread result dropped first
+        """
+        while True:
+            packet = self.result_queue.get(timeout=timeout)
+            if packet is None:
+                if self.result_queue.closed or not self.inference.is_alive():
+                    return
+                continue
+            yield packet
+            if self.pool is not None:
+                # The caller is done with the frame once it asks for the next one
+                self.pool.release(packet.img)
+    
+    def record_dispatch(self, packet):
+        """
+        Record end-to-end latency once a packet has been rendered and dispatched.
+        
+        Args:
+            packet: The FramePacket that was just handled
+        """
+        self.latency.add(time.perf_counter() - packet.capture_time)
+    
+    def stats(self):
+        """
+        Return a snapshot of pipeline statistics.
+        
+        Returns:
+            Dictionary with capture/inference FPS, dropped frames and latency
+        """
+        elapsed = max(time.perf_counter() - (self.start_time or time.perf_counter()), 1e-6)
+        return {
+            "capture_fps": self.capture.frames_captured / elapsed,
+            "inference_fps": self.inference.frames_processed / elapsed,
+            "dropped_before_inference": self.capture_queue.dropped,
+            "dropped_before_render": self.result_queue.dropped,
+            "latency_mean_ms": self.latency.mean_ms(),
+            "latency_p95_ms": self.latency.percentile_ms(95),
+        }
+    
+    def report(self):
+        """Print a summary of the pipeline statistics."""
+        s = self.stats()
+        print(f"📊 Pipeline: capture {s['capture_fps']:.1f} FPS | inference {s['inference_fps']:.1f} FPS | "
+              f"dropped {s['dropped_before_inference']}+{s['dropped_before_render']} | "
+              f"latency mean {s['latency_mean_ms']:.1f} ms, p95 {s['latency_p95_ms']:.1f} ms")
+    
+    def stop(self):
+        """Stop both threads and wait for them to finish."""
+        self.capture.running = False
+        self.inference.running = False
+        self.capture_queue.close()
+        self.result_queue.close()
+        for thread in (self.capture, self.inference):
+            if thread.is_alive():
+                thread.join(timeout=2.0)
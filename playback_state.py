@@ -0,0 +1,216 @@
+import time
+from collections import deque
+
+
+# Commands that put the player into a known state
+STATE_COMMANDS = {"play": "PLAYING", "pause": "PAUSED"}
+
+
+class PlaybackState:
+    """
+    What the player is doing, as far as the controller can tell.
+    
+    The state comes from the backend's status query when it has one
+    (cached for ttl seconds), otherwise from the commands sent. Every
+    command is journaled with the state it was meant to produce, so when
+    the player reports something else the difference can be explained:
+    
+    - the player has not applied the command yet (less than settle seconds ago): wait
+    - the command was lost, or a toggle key was sent from the wrong state
+      (never seen applied, less than repair_window seconds ago): ask the
+      controller to send it again
+    - the user changed the player directly: adopt the reported state
+    
+    A play/pause queued on the command dispatcher is only journaled once it
+    was sent. Until then it is kept as the expected state, so a command that
+    is coalesced away, cancelled or rejected never shows up as a state the
+    player did not reach.
+    """
+    
+    def __init__(self, query=None, ttl=0.5, settle=0.3, repair_window=1.5, journal_size=64):
+        """
+        Initialize the state model.
+        
+        Args:
+            query: Callable returning "PLAYING", "PAUSED" or None (unknown), e.g. a backend's
+                   query_state(); None to rely on the command journal alone
+            ttl: Seconds a queried state is reused before the player is asked again
+            settle: Seconds the player is given to apply a command before its report counts
+            repair_window: Commands older than this are never repeated; a mismatch is
+                           then taken as the user's doing
+            journal_size: Number of recent commands kept
+        """
+        self.query = query
+        self.ttl = ttl
+        self.settle = settle
+        self.repair_window = repair_window
+        self.journal = deque(maxlen=journal_size)  # (time, command, intended state or None, repair)
+        self.state = None  # "PLAYING", "PAUSED" or None (unknown)
+        self.checked_at = float("-inf")
+        self.pending_repair = None  # State a play/pause should be resent for
+        self.expected = None  # State of a queued play/pause that was not sent yet
+        self.verified_at = None  # Time of the last play/pause the player was seen to follow
+        self.queries = 0
+        self.query_errors = 0
+        self.skipped = 0
+        self.desyncs = 0
+        self.repairs = 0
+    
+    def get(self, now=None):
+        """
+        Return the current state, asking the player if the cached value is older than ttl.
+        
+        Args:
+            now: Current time in seconds (defaults to time.monotonic())
+        
+        Returns:
+            "PLAYING", "PAUSED" or None if unknown
+        """
+        now = time.monotonic() if now is None else now
+        if self.query is not None and now - self.checked_at >= self.ttl:
+            self.checked_at = now
+            self._reconcile(now)
+        return self.state
+    
+    def _last_state_command(self):
+        """Return the journal entry of the last play/pause, or None."""
+        for entry in reversed(self.journal):
+            if entry[2] is not None:
+                return entry
+        return None
+    
+    def _reconcile(self, now):
+        """
+        Compare the player's reported state with the believed one.
+        
+        Args:
+            now: Current time in seconds
+        """
+        try:
+            actual = self.query()
+        except Exception:
+            self.query_errors += 1
+            return
+        self.queries += 1
+        if actual is None:
+            return
+        
+        last = self._last_state_command()
+        if last is not None and now - last[0] < self.settle:
+            return  # The player may not have applied the last command yet
+        if actual == self.state:
+            if last is not None and actual == last[2]:
+                self.verified_at = last[0]
+            return
+        
+        if self.state is not None:
+            self.desyncs += 1
+        if (last is not None and not last[3] and last[0] != self.verified_at
+                and now - last[0] <= self.repair_window):
+            # A repair is never repaired again, so a player that ignores us cannot cause a loop
+            self.pending_repair = last[2]
+        self.state = actual
+    
+    def needs_send(self, command, now=None):
+        """
+        Check whether a command would change anything.
+        
+        Args:
+            command: Command name
+            now: Current time in seconds
+        
+        Returns:
+            False for a play while playing or a pause while paused, True otherwise
+        """
+        intended = STATE_COMMANDS.get(command)
+        if intended is None:
+            return True
+        believed = self.get(now) if self.expected is None else self.expected
+        if believed == intended:
+            self.skipped += 1
+            return False
+        return True
+    
+    def queue(self, command):
+        """
+        Note a command that was queued but not sent yet (see record() and drop()).
+        
+        Args:
+            command: Command name
+        """
+        intended = STATE_COMMANDS.get(command)
+        if intended is not None:
+            self.expected = intended
+    
+    def drop(self, command):
+        """
+        Forget a queued command that will never be sent (coalesced, cancelled or rejected).
+        
+        Args:
+            command: Command name
+        """
+        if STATE_COMMANDS.get(command) == self.expected:
+            self.expected = None
+    
+    def record(self, command, now=None, repair=False):
+        """
+        Journal a command that was sent and assume it took effect.
+        
+        Args:
+            command: Command name
+            now: Time it was sent (defaults to time.monotonic())
+            repair: Whether it repeats a command the player did not follow
+        """
+        now = time.monotonic() if now is None else now
+        intended = STATE_COMMANDS.get(command)
+        self.journal.append((now, command, intended, repair))
+        if repair:
+            self.repairs += 1
+        if intended is not None:
+            self.state = intended
+            if intended == self.expected:
+                self.expected = None
+    
+    def take_repair(self):
+        """
+        Return the state a play/pause should be resent for, once.
+        
+        Returns:
+            "PLAYING", "PAUSED" or None if nothing needs repairing
+        """
+        target, self.pending_repair = self.pending_repair, None
+        return target
+    
+    def assume(self, state):
+        """
+        Override the believed state (e.g. reset it to None).
+        
+        Args:
+            state: "PLAYING", "PAUSED" or None
+        """
+        self.state = state
+        self.pending_repair = None
+        self.expected = None
+    
+    def stats(self):
+        """
+        Return the reconciliation counters.
+        
+        Returns:
+            Dictionary with queries, query errors, skipped no-op commands, desyncs and repairs
+        """
+        return {
+            "queries": self.queries,
+            "query_errors": self.query_errors,
+            "skipped": self.skipped,
+            "desyncs": self.desyncs,
+            "repairs": self.repairs,
+        }
+    
+    def report(self):
+        """Print the reconciliation counters."""
+        s = self.stats()
+        source = "player status" if self.query is not None else "command journal"
+        print(f"🎛 Playback state ({source}): {s['skipped']} no-op commands skipped, "
+              f"{s['desyncs']} desyncs, {s['repairs']} repaired, {s['queries']} queries "
+              f"({s['query_errors']} failed)")
@@ -0,0 +1,179 @@
+import time
+
+import numpy as np
+
+
+class InferenceScheduler:
+    """
+    Decides per frame whether hand detection needs to run.
+    
+    Three modes:
+    - ACTIVE: a hand is moving or changing gesture - infer every frame
+    - STABLE: the same gesture has been seen for a while - infer every Nth frame
+    - IDLE: no hand for a while - infer at a low rate, but wake up to ACTIVE
+      as soon as a cheap frame-difference check sees motion
+    
+    Frames that are not inferred reuse the last gesture, with landmarks
+    extrapolated from the last two detections.
+    """
+    
+    ACTIVE = "ACTIVE"
+    STABLE = "STABLE"
+    IDLE = "IDLE"
+    
+    def __init__(self, idle_rate=4.0, active_every=2, idle_after=2.0,
+                 stable_after=5, wake_threshold=8.0, motion_step=16):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            idle_rate: Inference rate (Hz) while no hand is present
+            active_every: Run inference on every Nth frame while the gesture is stable
+            idle_after: Seconds without a hand before switching to IDLE
+            stable_after: Identical consecutive detections before switching to STABLE
+            wake_threshold: Mean absolute pixel difference (0-255) that counts as motion
+            motion_step: Pixel stride used to subsample frames for the motion check
+        """
+        if idle_rate <= 0:
+            raise ValueError(f"idle_rate must be positive, got {idle_rate:g}")
+        self.idle_rate = idle_rate
+        self.active_every = max(1, active_every)
+        self.idle_after = idle_after
+        self.stable_after = stable_after
+        self.wake_threshold = wake_threshold
+        self.motion_step = motion_step
+        
+        self.mode = self.ACTIVE
+        self.frames_seen = 0
+        self.frames_skipped = 0
+        self.frames_since_inference = 0
+        self.last_inference_time = 0.0
+        self.last_hand_time = None  # Set on the first update
+        self.same_gesture_count = 0
+        
+        self.last_result = ("NO_HAND", -1)
+        self.prev_landmarks = None
+        self.last_landmarks = None
+        self.prev_thumbnail = None
+    
+    def _motion(self, img):
+        """
+        Measure motion against the previous frame on a strided subsample.
+        
+        Args:
+            img: Current BGR frame
+        
+        Returns:
+            Mean absolute difference in gray levels (0 for the first frame)
+        """
+        thumbnail = img[::self.motion_step, ::self.motion_step].mean(axis=2, dtype=np.float32)
+        previous = self.prev_thumbnail
+        self.prev_thumbnail = thumbnail
+        if previous is None or previous.shape != thumbnail.shape:
+            return 0.0
+        return float(np.abs(thumbnail - previous).mean())
+    
+    def should_infer(self, img, now=None):
+        """
+        Decide whether to run hand detection on this frame.
+        
+        Args:
+            img: Current BGR frame
+            now: time.monotonic() timestamp (taken if None)
+        
+        Returns:
+            True if detection should run, False to reuse the last result
+        """
+        now = time.monotonic() if now is None else now
+        self.frames_seen += 1
+        
+        if self.mode == self.IDLE:
+            if self._motion(img) > self.wake_threshold:
+                self.mode = self.ACTIVE
+                infer = True
+            else:
+                infer = now - self.last_inference_time >= 1.0 / self.idle_rate
+        elif self.mode == self.STABLE:
+            infer = self.frames_since_inference + 1 >= self.active_every
+        else:
+            infer = True
+        
+        if infer:
+            self.frames_since_inference = 0
+            self.last_inference_time = now
+        else:
+            self.frames_since_inference += 1
+            self.frames_skipped += 1
+        return infer
+    
+    def update(self, gesture, finger_count, landmarks, now=None):
+        """
+        Feed the result of a detection back into the scheduler.
+        
+        Args:
+            gesture: Detected gesture name
+            finger_count: Detected finger count
+            landmarks: (21, 3) landmark array, or None if no hand
+            now: time.monotonic() timestamp (taken if None)
+        """
+        now = time.monotonic() if now is None else now
+        if self.last_hand_time is None:
+            self.last_hand_time = now
+        
+        if gesture == self.last_result[0]:
+            self.same_gesture_count += 1
+        else:
+            self.same_gesture_count = 0
+        self.last_result = (gesture, finger_count)
+        
+        self.prev_landmarks = self.last_landmarks
+        self.last_landmarks = landmarks
+        
+        if landmarks is not None:
+            self.last_hand_time = now
+            if self.same_gesture_count >= self.stable_after:
+                self.mode = self.STABLE
+            else:
+                self.mode = self.ACTIVE
+        elif now - self.last_hand_time >= self.idle_after:
+            if self.mode != self.IDLE:
+                self.prev_thumbnail = None  # Start motion detection from a fresh reference
+            self.mode = self.IDLE
+        else:
+            self.mode = self.ACTIVE
+    
+    def skipped_result(self):
+        """
+        Result to use for a frame where detection was skipped.
+        
+        Returns:
+            Tuple of (gesture_name, finger_count, landmarks) where landmarks are
+            linearly extrapolated from the last two detections (or None)
+        """
+        gesture, finger_count = self.last_result
+        landmarks = self.last_landmarks
+        if landmarks is not None and self.prev_landmarks is not None:
+            # Detections are active_every frames apart; step forward proportionally
+            step = self.frames_since_inference / self.active_every
+            landmarks = landmarks + (landmarks - self.prev_landmarks) * step
+        return gesture, finger_count, landmarks
+    
+    def stats(self):
+        """
+        Return a snapshot of scheduler statistics.
+        
+        Returns:
+            Dictionary with the current mode and frame counters
+        """
+        return {
+            "mode": self.mode,
+            "frames_seen": self.frames_seen,
+            "frames_skipped": self.frames_skipped,
+            "skip_ratio": self.frames_skipped / max(1, self.frames_seen),
+        }
+    
+    def report(self):
+        """Print a summary of the scheduler statistics."""
+        s = self.stats()
+        print(f"⏱ Scheduler: mode {s['mode']} | skipped {s['frames_skipped']}/{s['frames_seen']} frames "
+              f"({100 * s['skip_ratio']:.0f}%)")
@@ -0,0 +1,245 @@
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+
+class StabilityCounter:
+    """
+    Confirms a gesture once it has been seen for a number of consecutive frames,
+    and allows exactly one command per confirmed gesture.
+    """
+    
+    def __init__(self, threshold=12):
+        """
+        Initialize the counter.
+        
+        Args:
+            threshold: Number of consecutive frames needed to confirm a gesture
+        """
+        self.threshold = threshold
+        self.last_gesture = None
+        self.stable_frames = 0
+        self.executed = False  # Prevent repeat commands for the same gesture
+    
+    def update(self, gesture):
+        """
+        Feed the gesture detected in the current frame.
+        
+        Args:
+            gesture: Gesture name for this frame
+        
+        Returns:
+            True if the gesture is confirmed and no command was executed for it yet
+        """
+        if gesture == self.last_gesture:
+            self.stable_frames += 1
+        else:
+            self.stable_frames = 0
+            self.last_gesture = gesture
+            self.executed = False  # Reset when gesture changes
+        return self.is_stable() and not self.executed
+    
+    def is_stable(self):
+        """Return True if the current gesture has been seen long enough."""
+        return self.stable_frames >= self.threshold
+    
+    def mark_executed(self):
+        """Record that the command for the current gesture has been sent."""
+        self.executed = True
+    
+    def progress(self):
+        """Return a short "seen/needed" progress string for display."""
+        return f"{self.stable_frames}/{self.threshold}"
+
+
+# Seconds a gesture must stay active before it triggers its command. Two and
+# three fingers are easy to confuse, so they need a little longer.
+CONFIRM_TIMES = {
+    "CLOSED_FIST": 0.1,
+    "OPEN_PALM": 0.1,
+    "PEACE_SIGN": 0.15,
+    "THREE_FINGERS": 0.15,
+}
+
+
+class GestureFilter:
+    """
+    Time-based gesture confirmation, a drop-in replacement for StabilityCounter.
+    
+    Recent classifications are kept for a fixed time window and vote for
+    the active gesture, each weighted by how long it was on screen, so the
+    result does not depend on the camera frame rate. A gesture becomes
+    active when its share of the votes reaches enter_ratio and stays active
+    until it drops below exit_ratio (hysteresis), so a single misclassified
+    frame no longer restarts confirmation. The command fires once the
+    active gesture has been held for its confirm time.
+    """
+    
+    def __init__(self, window=0.3, enter_ratio=0.7, exit_ratio=0.5, confirm_times=None,
+                 default_confirm=0.1, weighting="majority", max_gap=0.1):
+        """
+        Initialize the filter.
+        
+        Args:
+            window: Seconds of history that vote
+            enter_ratio: Vote share needed for a gesture to become active
+            exit_ratio: Vote share below which the active gesture is dropped
+            confirm_times: Dictionary of gesture -> seconds to hold before confirming
+                           (defaults to CONFIRM_TIMES)
+            default_confirm: Confirm time of gestures missing from confirm_times
+            weighting: "majority" (equal weight per second) or "ewma" (recent frames count more)
+            max_gap: Longest time (seconds) one frame may stand for, so a stall does not dominate the vote
+        """
+        self.window = window
+        self.enter_ratio = enter_ratio
+        self.exit_ratio = exit_ratio
+        self.confirm_times = dict(CONFIRM_TIMES if confirm_times is None else confirm_times)
+        self.default_confirm = default_confirm
+        self.weighting = weighting
+        self.max_gap = max_gap
+        self.history = deque()  # (timestamp, gesture, seconds the frame stands for)
+        self.last_time = None
+        self.last_gesture = None  # Active gesture
+        self.active_since = None
+        self.now = None
+        self.executed = False  # Prevent repeat commands for the same gesture
+    
+    def _votes(self, now):
+        """Return the vote share of every gesture in the window."""
+        votes = {}
+        for timestamp, gesture, weight in self.history:
+            if self.weighting == "ewma":
+                weight *= math.exp(-(now - timestamp) * 3.0 / self.window)
+            votes[gesture] = votes.get(gesture, 0.0) + weight
+        total = sum(votes.values())
+        return {gesture: weight / total for gesture, weight in votes.items()} if total > 0 else {}
+    
+    def update(self, gesture, now=None):
+        """
+        Feed the gesture detected in the current frame.
+        
+        Args:
+            gesture: Gesture name for this frame
+            now: Frame timestamp in seconds (defaults to time.perf_counter())
+        
+        Returns:
+            True if the active gesture is confirmed and no command was executed for it yet
+        """
+        now = time.perf_counter() if now is None else now
+        weight = self.max_gap if self.last_time is None else min(max(now - self.last_time, 0.0), self.max_gap)
+        self.last_time = now
+        self.now = now
+        self.history.append((now, gesture, weight))
+        while self.history and self.history[0][0] <= now - self.window:
+            self.history.popleft()
+        
+        shares = self._votes(now)
+        leader = max(shares, key=shares.get)
+        if self.last_gesture is not None and shares.get(self.last_gesture, 0.0) >= self.exit_ratio:
+            pass  # Active gesture holds on (hysteresis)
+        elif shares[leader] >= self.enter_ratio:
+            self.last_gesture = leader
+            self.active_since = now
+            self.executed = False  # Reset when gesture changes
+        else:
+            # No clear winner: nothing is active until one gesture dominates again
+            self.last_gesture = None
+            self.active_since = None
+        return self.is_stable() and not self.executed
+    
+    def confirm_time(self, gesture=None):
+        """Return the confirm time (seconds) of a gesture, by default the active one."""
+        return self.confirm_times.get(self.last_gesture if gesture is None else gesture, self.default_confirm)
+    
+    def held_time(self):
+        """Return how long (seconds) the active gesture has been active."""
+        if self.active_since is None:
+            return 0.0
+        return self.now - self.active_since
+    
+    def is_stable(self):
+        """Return True if the active gesture has been held long enough."""
+        return self.active_since is not None and self.held_time() >= self.confirm_time()
+    
+    def mark_executed(self):
+        """Record that the command for the active gesture has been sent."""
+        self.executed = True
+    
+    @property
+    def stable_frames(self):
+        """Held time in milliseconds (StabilityCounter compatible, for display)."""
+        return int(round(self.held_time() * 1000))
+    
+    @property
+    def threshold(self):
+        """Confirm time in milliseconds (StabilityCounter compatible, for display)."""
+        return int(round(self.confirm_time() * 1000))
+    
+    def progress(self):
+        """Return a short "held/needed" progress string for display."""
+        return f"{min(self.stable_frames, 9999)}/{self.threshold}ms"
+
+
+class OneEuroFilter:
+    """
+    One-Euro low-pass filter for landmark coordinates: strong smoothing
+    while the hand is still, little lag while it moves fast.
+    Works on NumPy arrays of any shape, element-wise.
+    """
+    
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        """
+        Initialize the filter.
+        
+        Args:
+            min_cutoff: Cutoff frequency (Hz) at rest; lower = smoother
+            beta: How quickly the cutoff rises with speed; higher = less lag
+            d_cutoff: Cutoff frequency (Hz) of the speed estimate
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+    
+    def reset(self):
+        """Forget the previous samples (e.g. when the hand is lost)."""
+        self.x = None
+        self.dx = None
+        self.last_time = None
+    
+    @staticmethod
+    def _alpha(cutoff, dt):
+        """Smoothing factor of a first-order low-pass filter."""
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+    
+    def __call__(self, x, now):
+        """
+        Filter one sample.
+        
+        Args:
+            x: Array of coordinates, or None to reset
+            now: Sample timestamp in seconds
+        
+        Returns:
+            Filtered array (None if x is None)
+        """
+        if x is None:
+            self.reset()
+            return None
+        x = np.asarray(x, dtype=np.float32)
+        if self.x is None or self.x.shape != x.shape or now <= self.last_time:
+            self.x = x.copy()
+            self.dx = np.zeros_like(x)
+            self.last_time = now
+            return x
+        
+        dt = now - self.last_time
+        self.last_time = now
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.dx += a_d * ((x - self.x) / dt - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        self.x += self._alpha(cutoff, dt) * (x - self.x)
+        return self.x.copy()
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_cache import ResultCache
+from pipeline import FramePacket, detect_packet
+
+
+class MirroredDetector:
+    """
+    Stands in for HandDetector(mirror=True) in --headless mode: the frame is
+    not flipped, the reported landmarks are. The hand is the white patch.
+    """
+    
+    mirror = True
+    
+    def __init__(self):
+        self.landmarks = None
+        self.stage_times = {}
+        self.calls = 0
+    
+    def detect_gesture(self, img, draw=True):
+        self.calls += 1
+        ys, xs = np.nonzero(img[:, :, 0] == 255)
+        if len(xs) == 0:
+            self.landmarks = None
+            return "NONE", -1, img
+        w = img.shape[1]
+        t = np.linspace(0.0, 1.0, 21)
+        x = xs.min() + t * (xs.max() - xs.min())
+        y = ys.min() + t * (ys.max() - ys.min())
+        self.landmarks = np.stack([w - x, y, np.zeros(21)], axis=1).astype(np.float32)
+        return "OPEN_PALM", 5, img
+    
+    def get_handedness(self):
+        return "Right" if self.landmarks is not None else None
+    
+    def draw_landmarks(self, img):
+        pass
+
+
+def frame_with_hand(x, y=100, size=100):
+    img = np.zeros((360, 640, 3), dtype=np.uint8)
+    img[y:y + size, x:x + size] = 255
+    return img
+
+
+def run(detector, cache, img):
+    packet = FramePacket(0, img, 0.0)
+    detect_packet(detector, packet, draw=False, cache=cache)
+    return packet
+
+
+def test_headless_cache_watches_the_hand_not_its_mirror_image():
+    detector = MirroredDetector()
+    cache = ResultCache(mirror=detector.mirror)
+    run(detector, cache, frame_with_hand(60))
+    
+    # Same hand, something changes on the opposite side of the frame: still a hit
+    img = frame_with_hand(60)
+    img[100:200, 480:580] = 128
+    assert run(detector, cache, img).cached
+    assert detector.calls == 1
+    
+    # The hand itself moves: the cache must miss and detection must run again
+    packet = run(detector, cache, frame_with_hand(60, y=200))
+    assert not packet.cached
+    assert detector.calls == 2
+
+
+def test_mirrored_region_matches_the_unmirrored_one():
+    cache = ResultCache()
+    img = frame_with_hand(60)
+    landmarks = np.array([[60, 100, 0], [159, 199, 0]], dtype=np.float32)
+    x0, y0, x1, y1, _ = cache._region(img, landmarks)
+    assert x0 < 60 and x1 > 159
+    
+    mirrored = ResultCache(mirror=True)
+    flipped = landmarks.copy()
+    flipped[:, 0] = img.shape[1] - flipped[:, 0]
+    assert mirrored._region(img, flipped)[:4] == (x0, y0, x1, y1)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_sources import open_source
+
+
+def read_all(source):
+    frames = 0
+    while source.read()[0]:
+        frames += 1
+    return frames
+
+
+def test_image_directory_reports_its_end(tmp_path):
+    for i in range(3):
+        cv2.imwrite(str(tmp_path / f"{i:03}.png"), np.zeros((48, 64, 3), dtype=np.uint8))
+    source = open_source(str(tmp_path))
+    
+    source.read()
+    assert not source.finished()
+    assert read_all(source) == 2
+    assert source.finished()
+
+
+def test_video_file_reports_its_end(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 48))
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), 40 * i, dtype=np.uint8))
+    writer.release()
+    source = open_source(path)
+    
+    source.read()
+    assert not source.finished()
+    assert read_all(source) == 4
+    assert source.finished()
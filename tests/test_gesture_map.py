@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gesture_map import GestureMap
+
+
+class RecordingController:
+    current_state = None
+    
+    def __init__(self):
+        self.sent = []
+    
+    def play(self):
+        self.sent.append(("play", 1))
+        return True
+    
+    def skip_forward(self, count=1):
+        self.sent.append(("skip_forward", count))
+        return True
+    
+    def skip_backward(self, count=1):
+        self.sent.append(("skip_backward", count))
+        return True
+
+
+CONFIG = {"cooldown": 2.0, "gestures": {"CLOSED_FIST": {"fingers": [0], "action": "play"}}}
+
+
+def test_swipes_share_the_gesture_cooldown():
+    gesture_map = GestureMap(CONFIG)
+    controller = RecordingController()
+    
+    assert gesture_map.dispatch(controller, "CLOSED_FIST", now=10.0)
+    assert not gesture_map.dispatch(controller, "SWIPE_RIGHT", now=11.0, count=2)
+    assert gesture_map.dispatch(controller, "SWIPE_LEFT", now=12.5, count=3)
+    assert gesture_map.last_time == 12.5
+    assert not gesture_map.dispatch(controller, "CLOSED_FIST", now=13.0)
+    assert controller.sent == [("play", 1), ("skip_backward", 3)]
+
+
+def test_swipe_actions_can_be_configured():
+    config = {"cooldown": 2.0, "gestures": {"SWIPE_RIGHT": {"action": "skip_backward", "cooldown": 0.0}}}
+    gesture_map = GestureMap(config)
+    controller = RecordingController()
+    
+    assert gesture_map.dispatch(controller, "SWIPE_RIGHT", now=1.0)
+    assert gesture_map.dispatch(controller, "SWIPE_RIGHT", now=1.0)
+    assert controller.sent == [("skip_backward", 1), ("skip_backward", 1)]
+
+
+def test_fast_swipe_remapped_to_an_action_without_count_runs_once():
+    config = {"cooldown": 0.0, "gestures": {"SWIPE_RIGHT": {"action": "play"}}}
+    gesture_map = GestureMap(config)
+    controller = RecordingController()
+    
+    assert gesture_map.dispatch(controller, "SWIPE_RIGHT", now=1.0, count=3)
+    assert controller.sent == [("play", 1)]
+
+
+def test_overlay_shows_the_configured_action(monkeypatch):
+    import numpy as np
+    import overlay
+    
+    config = {"gestures": {"OPEN_PALM": {"fingers": [5], "action": "skip_forward"}}}
+    renderer = overlay.OverlayRenderer(action_labels=GestureMap(config).action_labels())
+    texts = []
+    monkeypatch.setattr(overlay.cv2, "putText", lambda img, text, *args: texts.append(text))
+    renderer.draw(np.zeros((480, 640, 3), dtype=np.uint8), "OPEN_PALM", 5, None, 0, 100)
+    
+    assert "OPEN PALM (5 fingers) - FORWARD" in texts
@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from governor import ResourceGovernor
+from pipeline import FramePacket
+
+
+def test_camera_wait_does_not_count_as_frame_cost():
+    governor = ResourceGovernor(frame_budget=0.010, interval=1.0, dwell=0.0)
+    governor.applied = governor.level
+    governor.window_start = 0.0
+    for i in range(30):
+        packet = FramePacket(i, None, i / 30)
+        packet.stage_times["capture"] = 0.030  # Blocked on a 30 FPS camera
+        packet.inference_time = 0.004
+        governor.observe(packet, now=i / 30 + 0.005)
+    governor.observe(packet, now=2.0)
+    
+    # 4 ms of processing is well within 10 ms: no reason to step down
+    assert governor.level == 0
+    assert governor.changes == 0
+
+
+def test_camera_frames_are_thinned_to_the_frame_rate_limit():
+    governor = ResourceGovernor(levels=[(None, 10, 1, 0)])
+    governor.applied = 0
+    
+    # A 30 FPS camera read for one second: every third frame is processed
+    taken = [i for i in range(30) if governor.take_slot(now=1.0 + i / 30)]
+    assert taken == list(range(0, 30, 3))
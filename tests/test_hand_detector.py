@@ -0,0 +1,88 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_detector import (FINGER_MCPS, FINGER_PIPS, FINGER_TIPS, TIP_ABOVE_PIP,
+                           classify_fingers, gesture_from_count)
+
+
+# Knuckles of an upright right hand, in units of hand scale (wrist to middle MCP)
+MCPS = np.array([[-0.25, -0.95], [0.0, -1.0], [0.2, -0.95], [0.38, -0.85]])
+
+GESTURES = {
+    "CLOSED_FIST": [False, False, False, False, False],
+    "OPEN_PALM": [True, True, True, True, True],
+    "PEACE_SIGN": [False, True, True, False, False],
+    "THREE_FINGERS": [False, True, True, True, False],
+}
+
+
+def synthetic_hand(fingers, scale=150.0, origin=(640.0, 500.0)):
+    """
+    Build a (21, 3) landmark array for an upright hand.
+    
+    Args:
+        fingers: Five booleans, thumb to pinky, True for an extended finger
+        scale: Wrist to middle MCP distance in output units
+        origin: Wrist position in output units
+    
+    Returns:
+        Landmark array in image coordinates (y grows downwards)
+    """
+    pts = np.zeros((21, 3))
+    if fingers[0]:
+        pts[1:5, :2] = [[-0.3, -0.25], [-0.5, -0.45], [-0.7, -0.6], [-0.9, -0.7]]
+    else:
+        # Folded across the palm, next to the index knuckle
+        pts[1:5, :2] = [[-0.3, -0.25], [-0.4, -0.4], [-0.3, -0.55], [-0.15, -0.55]]
+    for finger, up in enumerate(fingers[1:]):
+        mcp = MCPS[finger]
+        if up:
+            chain = [(0, -0.4), (0, -0.65), (0, -0.85)]
+        else:
+            chain = [(0, -0.25), (0.05, -0.15), (0.05, -0.05)]
+        pts[FINGER_MCPS[finger], :2] = mcp
+        for joint, offset in zip(range(FINGER_PIPS[finger], FINGER_TIPS[finger] + 1), chain):
+            pts[joint, :2] = mcp + offset
+    pts *= scale
+    pts[:, :2] += origin
+    return pts
+
+
+@pytest.mark.parametrize("scale", [0.2, 40.0, 150.0, 400.0])
+@pytest.mark.parametrize("gesture", sorted(GESTURES))
+def test_gestures_are_recognized_at_any_hand_scale(gesture, scale):
+    origin = (0.5, 0.8) if scale < 1 else (640.0, 500.0)
+    fingers = classify_fingers(synthetic_hand(GESTURES[gesture], scale, origin))
+    assert fingers.tolist() == GESTURES[gesture]
+    assert gesture_from_count(int(fingers.sum())) == gesture
+
+
+def test_batch_matches_single_hands():
+    rng = np.random.default_rng(0)
+    hands = []
+    for mask in range(32):
+        fingers = [bool((mask >> f) & 1) for f in range(5)]
+        hand = synthetic_hand(fingers, scale=rng.uniform(30, 300), origin=rng.uniform(100, 600, 2))
+        hands.append(hand + rng.normal(0, 2.0, hand.shape))
+    batch = np.stack(hands)
+    
+    result = classify_fingers(batch)
+    assert result.shape == (32, 5)
+    for hand, fingers in zip(hands, result):
+        assert classify_fingers(hand).tolist() == fingers.tolist()
+
+
+@pytest.mark.parametrize("scale", [40.0, 400.0])
+def test_tip_threshold_scales_with_the_hand(scale):
+    hand = synthetic_hand(GESTURES["OPEN_PALM"], scale)
+    pip_y = hand[FINGER_PIPS[0], 1]
+    
+    hand[FINGER_TIPS[0], 1] = pip_y - (TIP_ABOVE_PIP + 0.02) * scale
+    assert classify_fingers(hand)[1]
+    hand[FINGER_TIPS[0], 1] = pip_y - (TIP_ABOVE_PIP - 0.02) * scale
+    assert not classify_fingers(hand)[1]
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from landmark_log import LandmarkLog, LandmarkRecorder, replay
+
+
+def record_without_hand(path, frames=60, fps=30.0):
+    recorder = LandmarkRecorder(str(path), 640, 480)
+    for i in range(frames):
+        recorder.write(i / fps, None)
+    recorder.close()
+    return LandmarkLog(str(path))
+
+
+def test_stability_zero_uses_the_gesture_filter(tmp_path):
+    log = record_without_hand(tmp_path / "empty.lmk")
+    
+    assert replay(log, stability_threshold=0) == replay(log)
+    gestures, confirmed = replay(log, stability_threshold=0)
+    assert set(gestures) == {"NO_HAND"}
+    assert [gesture for _, gesture in confirmed] == ["NO_HAND"]
+
+
+def test_frame_threshold_uses_the_stability_counter(tmp_path):
+    log = record_without_hand(tmp_path / "empty.lmk")
+    
+    _, confirmed = replay(log, stability_threshold=12)
+    assert confirmed == [(12, "NO_HAND")]
@@ -0,0 +1,61 @@
+import json
+import os
+import pstats
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+class InterruptingDetector:
+    """
+    Stands in for HandDetector: reports no hand, and raises KeyboardInterrupt
+    on a given frame the way Ctrl+C does in the middle of the frame loop.
+    """
+    
+    mirror = True
+    
+    def __init__(self, interrupt_at):
+        self.interrupt_at = interrupt_at
+        self.frames = 0
+        self.landmarks = None
+        self.stage_times = {}
+        self.closed = False
+    
+    def detect_gesture(self, img, draw=True):
+        self.frames += 1
+        if self.frames == self.interrupt_at:
+            raise KeyboardInterrupt
+        return "NO_HAND", -1, img
+    
+    def get_handedness(self):
+        return None
+    
+    def draw_landmarks(self, img):
+        pass
+    
+    def close(self):
+        self.closed = True
+
+
+def test_ctrl_c_in_headless_mode_shuts_down_cleanly(tmp_path, monkeypatch):
+    frames = tmp_path / "frames"
+    frames.mkdir()
+    for i in range(20):
+        cv2.imwrite(str(frames / f"{i:03}.png"), np.zeros((48, 64, 3), dtype=np.uint8))
+    detector = InterruptingDetector(interrupt_at=5)
+    monkeypatch.setattr(main, "load_detector", lambda args, gesture_map, startup: detector)
+    
+    profile = tmp_path / "run.prof"
+    metrics = tmp_path / "metrics.json"
+    args = main.parse_args(["--source", str(frames), "--headless", "--output", "memory",
+                            "--profile", str(profile), "--metrics-json", str(metrics)])
+    main.main(args)  # Must not raise
+    
+    assert detector.closed
+    assert json.loads(metrics.read_text())
+    pstats.Stats(str(profile))
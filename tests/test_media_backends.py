@@ -0,0 +1,15 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from media_backends import measure_commands, open_backend
+
+
+def test_async_throughput_counts_sent_commands():
+    backend = open_backend("memory")
+    stats = measure_commands(backend, commands=400, async_dispatch=True)
+    
+    assert stats["sent"] == 400
+    assert stats["coalesced"] == stats["cancelled"] == stats["rejected"] == 0
+    assert stats["per_second"] > 0
@@ -0,0 +1,53 @@
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multi_source import GestureArbiter, HandResult, SourceResult, put_latest
+
+
+def drain(result_queue, count):
+    return [result_queue.get(timeout=1.0) for _ in range(count)]
+
+
+def test_full_queue_keeps_the_newest_results():
+    result_queue = multiprocessing.get_context("spawn").Queue(maxsize=2)
+    for frame_id in range(1, 6):
+        put_latest(result_queue, SourceResult(0, frame_id, time.perf_counter(), []))
+    
+    assert [result.frame_id for result in drain(result_queue, 2)] == [4, 5]
+
+
+def test_end_of_another_source_is_not_dropped():
+    result_queue = multiprocessing.get_context("spawn").Queue(maxsize=2)
+    final = SourceResult(1, 7, time.perf_counter(), [])
+    final.finished = True
+    put_latest(result_queue, final)
+    for frame_id in range(1, 4):
+        put_latest(result_queue, SourceResult(0, frame_id, time.perf_counter(), []))
+    
+    results = drain(result_queue, 2)
+    assert any(result.finished and result.source == 1 for result in results)
+    assert results[-1].frame_id == 3
+
+
+def frame(source, *hands, age=0.0):
+    return SourceResult(source, 0, time.perf_counter() - age, list(hands))
+
+
+def test_one_missed_frame_does_not_switch_control():
+    arbiter = GestureArbiter(max_age=0.5)
+    owner = HandResult("Right", "OPEN_PALM", 5, 0.3)
+    other = HandResult("Left", "CLOSED_FIST", 0, 0.2)
+    
+    assert arbiter.update(frame(0, owner, other))[0] == "OPEN_PALM"
+    assert arbiter.update(frame(0, other))[0] == "OPEN_PALM"  # Owner missed for one frame
+    assert arbiter.update(frame(0, owner, other))[0] == "OPEN_PALM"
+    assert arbiter.switches == 1
+    
+    # Gone for longer than max_age: control passes on
+    arbiter.hands = {key: (hand, seen - 1.0) for key, (hand, seen) in arbiter.hands.items()}
+    assert arbiter.update(frame(0, other))[0] == "CLOSED_FIST"
+    assert arbiter.switches == 2
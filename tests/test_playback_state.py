@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_dispatcher import CommandDispatcher
+from media_backends import FakePlayerBackend
+from media_controller import MediaController
+
+
+def test_redundant_play_is_skipped_without_starting_the_cooldown():
+    player = FakePlayerBackend(state="PAUSED")
+    controller = MediaController(cooldown=2.5, backend=player, verbose=False, state_ttl=0.0)
+    
+    assert controller.play()
+    assert player.state == "PLAYING"
+    controller.last_command_time = float("-inf")
+    assert not controller.play()  # Already playing
+    assert player.names() == ["play"]
+    assert controller.state.stats()["skipped"] == 1
+
+
+def test_click_on_the_player_is_adopted():
+    player = FakePlayerBackend(state="PAUSED")
+    controller = MediaController(cooldown=0.0, backend=player, verbose=False, state_ttl=0.0)
+    controller.play()
+    
+    player.click()  # The user pauses on the player itself
+    time.sleep(0.35)
+    assert controller.current_state == "PAUSED"
+    assert controller.play()
+    assert player.state == "PLAYING"
+
+
+def test_command_applied_to_the_wrong_state_is_repaired():
+    player = FakePlayerBackend(state="PLAYING", latency=0.05)
+    controller = MediaController(cooldown=0.0, backend=player, verbose=False, state_ttl=0.1)
+    
+    # The controller wrongly believes the player is paused, so its play key toggles it to paused
+    controller.state.query = None
+    controller.current_state = "PAUSED"
+    controller.play()
+    controller.state.query = player.query_state
+    assert player.state == "PAUSED"
+    
+    time.sleep(0.4)
+    assert controller.reconcile()
+    assert player.state == "PLAYING"
+    time.sleep(0.4)
+    assert not controller.reconcile()
+    assert controller.state.stats()["repairs"] == 1
+
+
+def test_lost_command_is_resent_once():
+    player = FakePlayerBackend(state="PAUSED", drop_every=1, toggle=False)
+    controller = MediaController(cooldown=0.0, backend=player, verbose=False, state_ttl=0.1)
+    
+    controller.play()
+    time.sleep(0.4)
+    assert controller.reconcile()
+    assert len(player.commands) == 2
+    
+    # Still not applied: taken as the player's real state instead of resending forever
+    time.sleep(0.4)
+    assert not controller.reconcile()
+    assert controller.current_state == "PAUSED"
+    assert len(player.commands) == 2
+
+
+def async_controller(max_pending=8):
+    player = FakePlayerBackend(state="PAUSED", toggle=False)
+    controller = MediaController(cooldown=0.0, async_dispatch=True, backend=player, verbose=False)
+    controller.dispatcher.close()
+    controller.dispatcher = CommandDispatcher(max_pending=max_pending)
+    controller.state.query = None  # Journal only: the state must come from what was really sent
+    controller.current_state = "PAUSED"
+    return controller, player
+
+
+def test_queued_play_cancelled_by_pause_is_not_journaled():
+    controller, player = async_controller()
+    
+    assert controller.play()
+    assert controller.pause()  # Still queued play: the pause is not a no-op
+    controller.close()
+    
+    assert player.names() == []
+    assert controller.current_state == "PAUSED"
+    assert not controller.state.journal
+
+
+def test_coalesced_play_is_journaled_once_sent():
+    controller, player = async_controller()
+    
+    assert controller.play()
+    assert controller.current_state == "PAUSED"  # Not sent yet
+    assert not controller.play()  # Already on its way
+    controller._send("play")  # Merged into the queued one
+    controller.close()
+    
+    assert player.names() == ["play"]
+    assert controller.current_state == "PLAYING"
+    assert controller.state.expected is None
+
+
+def test_rejected_play_is_not_journaled():
+    controller, player = async_controller(max_pending=1)
+    
+    assert controller.skip_forward()
+    assert controller.play()  # Queue full: rejected
+    assert controller.dispatcher.stats()["rejected"] == 1
+    assert controller.state.expected is None
+    controller.close()
+    
+    assert player.names() == ["skip_forward"]
+    assert controller.current_state == "PAUSED"
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import InferenceScheduler
+
+
+@pytest.mark.parametrize("idle_rate", [0, -2.0])
+def test_idle_rate_must_be_positive(idle_rate):
+    with pytest.raises(ValueError):
+        InferenceScheduler(idle_rate=idle_rate)
+
+
+def idle_scheduler(idle_rate):
+    scheduler = InferenceScheduler(idle_rate=idle_rate, idle_after=1.0)
+    scheduler.update("NO_HAND", -1, None, now=0.0)
+    scheduler.update("NO_HAND", -1, None, now=1.0)
+    assert scheduler.mode == InferenceScheduler.IDLE
+    return scheduler
+
+
+def test_idle_rate_throttles_inference_on_a_still_scene():
+    scheduler = idle_scheduler(idle_rate=4.0)
+    still = np.zeros((120, 160, 3), dtype=np.uint8)
+    
+    # 30 FPS for two seconds: one inference every 0.25 s
+    inferred = [i for i in range(60) if scheduler.should_infer(still, now=1.0 + i / 30)]
+    assert len(inferred) == 8
+    assert all(np.diff(inferred) >= 7)
+
+
+def test_motion_wakes_the_scheduler_up():
+    scheduler = idle_scheduler(idle_rate=1.0)
+    still = np.zeros((120, 160, 3), dtype=np.uint8)
+    assert scheduler.should_infer(still, now=1.0)
+    assert not scheduler.should_infer(still, now=1.1)
+    
+    assert scheduler.should_infer(np.full_like(still, 200), now=1.2)
+    assert scheduler.mode == InferenceScheduler.ACTIVE
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stability import GestureFilter
+
+
+def timeline(t):
+    """No hand for half a second, then an open palm."""
+    return "NO_HAND" if t < 0.5 else "OPEN_PALM"
+
+
+def first_confirmation(fps, duration=1.5):
+    gesture_filter = GestureFilter()
+    for i in range(int(duration * fps)):
+        now = i / fps
+        if gesture_filter.update(timeline(now), now=now):
+            if gesture_filter.last_gesture == "OPEN_PALM":
+                return now
+            gesture_filter.mark_executed()
+    return None
+
+
+@pytest.mark.parametrize("fps", [15, 60])
+def test_confirmation_time_does_not_depend_on_frame_rate(fps):
+    reference = first_confirmation(60)
+    assert reference is not None and 0.5 < reference < 1.0
+    # Within one frame of the slower camera
+    assert first_confirmation(fps) == pytest.approx(reference, abs=1 / 15)
+
+
+def hold(gesture_filter, gesture, start, end, fps=30):
+    fired = []
+    for i in range(int(round((end - start) * fps))):
+        now = start + i / fps
+        if gesture_filter.update(gesture, now=now):
+            fired.append(now)
+            gesture_filter.mark_executed()
+    return fired
+
+
+def test_single_misclassified_frame_does_not_restart_confirmation():
+    gesture_filter = GestureFilter()
+    hold(gesture_filter, "OPEN_PALM", 0.0, 0.3)
+    assert gesture_filter.last_gesture == "OPEN_PALM"
+    active_since = gesture_filter.active_since
+    
+    gesture_filter.update("CLOSED_FIST", now=0.3)
+    assert gesture_filter.last_gesture == "OPEN_PALM"
+    assert gesture_filter.active_since == active_since
+
+
+def test_confirmed_gesture_fires_once_through_a_glitch():
+    gesture_filter = GestureFilter()
+    fired = hold(gesture_filter, "OPEN_PALM", 0.0, 0.5)
+    gesture_filter.update("CLOSED_FIST", now=0.5)
+    fired += hold(gesture_filter, "OPEN_PALM", 0.5 + 1 / 30, 1.0)
+    assert len(fired) == 1
+
+
+def test_new_gesture_needs_the_enter_ratio_to_take_over():
+    gesture_filter = GestureFilter()
+    hold(gesture_filter, "OPEN_PALM", 0.0, 0.5)
+    
+    # The old gesture holds on while its share stays above exit_ratio
+    gesture_filter.update("CLOSED_FIST", now=0.5)
+    gesture_filter.update("CLOSED_FIST", now=0.5 + 1 / 30)
+    assert gesture_filter.last_gesture == "OPEN_PALM"
+    
+    # Between exit_ratio and enter_ratio nothing is active, then the fist takes over
+    states = []
+    for i in range(2, 12):
+        now = 0.5 + i / 30
+        gesture_filter.update("CLOSED_FIST", now=now)
+        states.append(gesture_filter.last_gesture)
+    assert "OPEN_PALM" not in states[states.index(None):]
+    assert None in states
+    assert states[-1] == "CLOSED_FIST"
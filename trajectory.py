@@ -0,0 +1,189 @@
+import numpy as np
+
+from hand_detector import FINGER_MCPS, MIDDLE_MCP, WRIST
+
+
+PALM_POINTS = [WRIST] + FINGER_MCPS.tolist()  # Wrist and the four knuckles
+
+
+class Swipe:
+    """
+    A detected horizontal swipe.
+    """
+    
+    def __init__(self, direction, distance, duration, speed, timestamp):
+        """
+        Initialize the swipe.
+        
+        Args:
+            direction: "right" or "left", as seen in the mirrored view
+            distance: Horizontal palm travel in hand scales (wrist to middle knuckle)
+            duration: Seconds the travel took
+            speed: Palm speed over the last few frames, in hand scales per second
+            timestamp: Time of the frame that completed the swipe
+        """
+        self.direction = direction
+        self.distance = distance
+        self.duration = duration
+        self.speed = speed
+        self.timestamp = timestamp
+
+
+class SwipeDetector:
+    """
+    Detects horizontal swipes from the trajectory of the hand.
+    
+    Wrist and palm-center positions are kept with their timestamps in a
+    fixed-size ring buffer. The samples of the last `window` seconds form a
+    sliding window whose travel and path length are updated as samples
+    enter and leave it, so each frame costs O(1) (amortized) no matter how
+    much history is kept, and the buffer is never re-scanned.
+    
+    Distances are measured in hand scales (wrist to middle knuckle), so the
+    thresholds work at any distance from the camera. A swipe needs the palm
+    to travel far and fast enough, in a mostly straight and horizontal
+    line, with the wrist moving along (a wave of the fingers is not a
+    swipe). After a swipe, motion is ignored for `rearm` seconds, so the
+    end of the stroke or bringing the hand back does not swipe again.
+    """
+    
+    def __init__(self, window=0.4, min_distance=1.5, min_speed=4.0, straightness=0.8,
+                 max_vertical=0.6, rearm=0.6, capacity=64, speed_per_step=4.0, max_steps=3):
+        """
+        Initialize the detector.
+        
+        Args:
+            window: Seconds of trajectory considered for a swipe
+            min_distance: Smallest horizontal palm travel (hand scales)
+            min_speed: Smallest average speed over the travel (hand scales per second)
+            straightness: Smallest ratio of net to total horizontal travel (1 = no back and forth)
+            max_vertical: Largest vertical travel as a fraction of the horizontal travel
+            rearm: Seconds after a swipe during which no new swipe is detected
+            capacity: Ring buffer size; the oldest samples are dropped when it is full
+            speed_per_step: Extra speed (hand scales per second) that adds one skip step
+            max_steps: Largest number of skip steps for one swipe
+        """
+        self.window = window
+        self.min_distance = min_distance
+        self.min_speed = min_speed
+        self.straightness = straightness
+        self.max_vertical = max_vertical
+        self.rearm = rearm
+        self.speed_per_step = speed_per_step
+        self.max_steps = max_steps
+        
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.wrist = np.zeros((capacity, 2), dtype=np.float32)
+        self.palm = np.zeros((capacity, 2), dtype=np.float32)
+        self.scale = np.zeros(capacity, dtype=np.float32)
+        self.step = np.zeros(capacity, dtype=np.float32)  # |palm dx| from the previous sample
+        self.head = -1  # Index of the newest sample
+        self.count = 0  # Samples in the window
+        self.path = 0.0  # Sum of |palm dx| inside the window
+        self.scale_sum = 0.0  # Sum of hand scales inside the window
+        self.rearm_until = float("-inf")
+        self.moving = False  # True while the palm is travelling at swipe speed
+        self.swipes = 0
+    
+    def reset(self):
+        """Forget the trajectory (e.g. when the hand is lost)."""
+        self.count = 0
+        self.path = 0.0
+        self.scale_sum = 0.0
+        self.moving = False
+    
+    def _drop_oldest(self):
+        """Remove the oldest sample from the window."""
+        tail = (self.head - self.count + 1) % self.capacity
+        self.scale_sum -= self.scale[tail]
+        self.count -= 1
+        if self.count > 0:
+            # The next sample's step now starts outside the window
+            self.path -= self.step[(tail + 1) % self.capacity]
+    
+    def update(self, landmarks, timestamp):
+        """
+        Add the hand position of one frame and check for a swipe.
+        
+        Args:
+            landmarks: (21, 3) landmark array in pixels, or None if no hand
+            timestamp: Frame time in seconds
+        
+        Returns:
+            Swipe if this frame completed one, None otherwise
+        """
+        if landmarks is None:
+            self.reset()
+            return None
+        
+        wrist = landmarks[WRIST, :2]
+        palm = landmarks[PALM_POINTS, :2].mean(axis=0)
+        scale = max(float(np.hypot(*(landmarks[MIDDLE_MCP, :2] - wrist))), 1e-6)
+        
+        if self.count == self.capacity:
+            self._drop_oldest()
+        previous = self.head
+        self.head = (self.head + 1) % self.capacity
+        i = self.head
+        self.times[i] = timestamp
+        self.wrist[i] = wrist
+        self.palm[i] = palm
+        self.scale[i] = scale
+        self.step[i] = abs(palm[0] - self.palm[previous, 0]) if self.count > 0 else 0.0
+        self.path += self.step[i]
+        self.scale_sum += scale
+        self.count += 1
+        
+        while self.count > 1 and timestamp - self.times[(i - self.count + 1) % self.capacity] > self.window:
+            self._drop_oldest()
+        
+        # Current palm speed, from the last few samples
+        j = (i - min(self.count - 1, 2)) % self.capacity
+        elapsed = timestamp - self.times[j]
+        speed = abs(self.palm[i, 0] - self.palm[j, 0]) / scale / elapsed if elapsed > 0 else 0.0
+        self.moving = speed >= self.min_speed
+        
+        if timestamp < self.rearm_until:
+            # Still finishing the last swipe: keep only the newest sample
+            self.count = 1
+            self.path = 0.0
+            self.scale_sum = scale
+            return None
+        
+        tail = (i - self.count + 1) % self.capacity
+        duration = timestamp - self.times[tail]
+        if self.count < 3 or duration <= 0:
+            return None
+        
+        unit = self.scale_sum / self.count
+        dx, dy = (self.palm[i] - self.palm[tail]) / unit
+        wrist_dx = (self.wrist[i, 0] - self.wrist[tail, 0]) / unit
+        distance = abs(dx)
+        
+        if (distance < self.min_distance
+                or distance / duration < self.min_speed
+                or abs(dx) * unit < self.straightness * self.path
+                or abs(dy) > self.max_vertical * distance
+                or wrist_dx * dx < 0.5 * dx * dx):
+            return None
+        
+        self.swipes += 1
+        self.rearm_until = timestamp + self.rearm
+        moving = self.moving
+        self.reset()
+        self.moving = moving
+        return Swipe("right" if dx > 0 else "left", float(distance), float(duration), float(speed), timestamp)
+    
+    def steps(self, swipe):
+        """
+        Number of skip steps for a swipe: faster swipes skip further.
+        
+        Args:
+            swipe: Swipe returned by update()
+        
+        Returns:
+            Integer between 1 and max_steps
+        """
+        extra = int((swipe.speed - self.min_speed) / self.speed_per_step)
+        return max(1, min(self.max_steps, 1 + extra))
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Offline gesture analysis of recorded session videos.
+
+Frames are decoded in a background thread and run through the hand
+detector without drawing; fingers and gestures are then classified in
+vectorized batches. Long video files are split into time ranges that
+are analyzed in parallel worker processes, each with its own MediaPipe
+instance, and the results are merged back in frame order.
+
+Every frame gives one record (timestamp, gesture, finger_count, landmarks),
+streamed to a CSV, NPZ or Parquet file. NPZ output uses the landmark
+stream format of frame_sources.LandmarkStreamSource, so benchmark.py
+can replay it without running MediaPipe (main.py needs a camera or video).
+
+Usage:
+    python video_analysis.py session.mp4 --output session.parquet --workers 8
+    python video_analysis.py session.mp4 --output session.csv --shard-seconds 120
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from frame_sources import VIDEO_EXTENSIONS, VideoFileSource, open_source
+from gesture_map import load_gesture_map
+from gesture_model import load_classifier
+from hand_detector import HandDetector, classify_fingers, gesture_from_count
+from pipeline import FramePool, read_frame
+
+
+BATCH_SIZE = 256  # Frames classified per vectorized batch
+REPORT_INTERVAL = 5.0  # Seconds between progress reports
+
+
+class DecodeThread(threading.Thread):
+    """
+    Decodes frames of a source into a bounded queue, so decoding overlaps
+    with detection. Unlike the live capture thread, no frame is ever
+    dropped: the thread waits while the queue is full.
+    """
+    
+    def __init__(self, source, start=0, stop=None, queue_size=32, pool=None):
+        """
+        Initialize the decode stage.
+        
+        Args:
+            source: Video file path, image directory or any opened frame source with read()
+            start: Index of the first frame to decode (video files are seeked to it)
+            stop: Index after the last frame to decode, None for the end of the source
+            queue_size: Maximum number of decoded frames waiting for detection
+            pool: Optional FramePool supplying the frame buffers
+        """
+        super().__init__(name="decode", daemon=True)
+        self.source = source
+        self.start_index = start
+        self.stop_index = stop
+        self.pool = pool
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.running = True
+        self.frames_decoded = 0
+        self.error = None
+    
+    def run(self):
+        cap = open_source(self.source) if isinstance(self.source, str) else self.source
+        try:
+            if not cap.isOpened() or not hasattr(cap, "read"):
+                raise ValueError(f"could not open frame source {self.source}")
+            index = self.start_index
+            if index > 0:
+                if isinstance(cap, VideoFileSource):
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                else:
+                    for _ in range(index):
+                        cap.read()
+            while self.running and (self.stop_index is None or index < self.stop_index):
+                success, img = read_frame(cap, self.pool)
+                if not success:
+                    break
+                self._put((index, img))
+                index += 1
+                self.frames_decoded += 1
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if isinstance(self.source, str):
+                cap.release()
+            self._put(None)
+    
+    def _put(self, item):
+        """Queue an item, giving up once the thread has been stopped."""
+        while self.running:
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+    
+    def frames(self):
+        """
+        Yield decoded frames in order.
+        
+        Yields:
+            Tuples of (frame_index, image); raises RuntimeError if decoding failed
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            yield item
+        if self.error:
+            raise RuntimeError(self.error)
+    
+    def stop(self):
+        """Stop decoding and wait for the thread to finish."""
+        self.running = False
+        self.join(timeout=1.0)
+
+
+def video_info(path):
+    """
+    Read the frame count and frame rate of a video file.
+    
+    Args:
+        path: Video file path
+    
+    Returns:
+        Tuple of (frame_count, fps); frame_count is 0 when the container does not say
+    """
+    cap = cv2.VideoCapture(path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+    return max(0, frame_count), (fps if fps and fps > 0 else 30.0)
+
+
+def shard_ranges(frame_count, fps, shard_seconds):
+    """
+    Split a video into consecutive time ranges.
+    
+    Args:
+        frame_count: Number of frames, 0 if unknown
+        fps: Frame rate
+        shard_seconds: Length of each range in seconds of video
+    
+    Returns:
+        List of (start, stop) frame index ranges; one open-ended range when the length is unknown
+    """
+    if frame_count <= 0:
+        return [(0, None)]
+    size = max(1, int(round(shard_seconds * fps)))
+    return [(start, min(start + size, frame_count)) for start in range(0, frame_count, size)]
+
+
+def classify_batch(landmarks, valid, gesture_map=None, classifier=None):
+    """
+    Classify a batch of frames at once.
+    
+    Args:
+        landmarks: float32 array (N, 21, 3) in pixels; rows without a hand are ignored
+        valid: Boolean array (N,), False for frames without a hand
+        gesture_map: Optional GestureMap deciding the gesture from which fingers are up
+        classifier: Optional GestureClassifier naming the gesture from the landmarks
+    
+    Returns:
+        Tuple of (gestures, finger_counts): a list of N gesture names ("NO_HAND" without
+        a hand) and an int array (N,) of extended-finger counts (-1 without a hand)
+    """
+    gestures = ["NO_HAND"] * len(valid)
+    counts = np.full(len(valid), -1, dtype=np.int64)
+    rows = np.flatnonzero(valid)
+    if len(rows) == 0:
+        return gestures, counts
+    
+    hands = landmarks[rows]
+    fingers = classify_fingers(hands)
+    counts[rows] = fingers.sum(axis=-1)
+    if classifier is not None:
+        names = classifier.predict_batch(hands)
+    elif gesture_map is not None:
+        names = [gesture_map.names[i] for i in gesture_map.gestures_for(fingers)]
+    else:
+        names = [gesture_from_count(int(count)) for count in counts[rows]]
+    for row, name in zip(rows, names):
+        gestures[row] = name
+    return gestures, counts
+
+
+def analyze_batches(frames, detector, fps=30.0, batch_size=BATCH_SIZE, pool=None):
+    """
+    Detect hands frame by frame and classify them in batches.
+    
+    Args:
+        frames: Iterable of BGR images, or of (frame_index, image) pairs
+        detector: HandDetector instance; its gesture_map and classifier are used
+        fps: Frame rate used to turn frame indices into timestamps
+        batch_size: Frames per classification batch
+        pool: Optional FramePool the frames are handed back to once detected
+    
+    Yields:
+        Batches as dictionaries of equal-length columns: timestamp (float64),
+        gesture (list of str), finger_count (int), landmarks (float32, N x 21 x 3,
+        zeros without a hand) and valid (bool)
+    """
+    timestamps = np.zeros(batch_size, dtype=np.float64)
+    landmarks = np.zeros((batch_size, 21, 3), dtype=np.float32)
+    valid = np.zeros(batch_size, dtype=bool)
+    n = 0
+    for position, frame in enumerate(frames):
+        index, img = frame if isinstance(frame, tuple) else (position, frame)
+        detector.find_hands(img, draw=False)
+        hand = detector.get_landmark_array(img)
+        if pool is not None:
+            pool.release(img)
+        
+        timestamps[n] = index / fps
+        valid[n] = hand is not None
+        landmarks[n] = hand if hand is not None else 0.0
+        n += 1
+        if n == batch_size:
+            yield _finish_batch(detector, timestamps, landmarks, valid, n)
+            n = 0
+    if n:
+        yield _finish_batch(detector, timestamps, landmarks, valid, n)
+
+
+def _finish_batch(detector, timestamps, landmarks, valid, n):
+    """Classify the first n buffered frames and return them as a column batch."""
+    gestures, counts = classify_batch(landmarks[:n], valid[:n], detector.gesture_map, detector.classifier)
+    return {
+        "timestamp": timestamps[:n].copy(),
+        "gesture": gestures,
+        "finger_count": counts,
+        "landmarks": landmarks[:n].copy(),
+        "valid": valid[:n].copy(),
+    }
+
+
+def batch_records(batch):
+    """
+    Split a column batch into per-frame records.
+    
+    Args:
+        batch: Dictionary of columns as produced by analyze_batches
+    
+    Yields:
+        Tuples of (timestamp, gesture, finger_count, landmarks) with landmarks None without a hand
+    """
+    for i in range(len(batch["timestamp"])):
+        yield (float(batch["timestamp"][i]), batch["gesture"][i], int(batch["finger_count"][i]),
+               batch["landmarks"][i] if batch["valid"][i] else None)
+
+
+def analyze_shard(path, start, stop, fps, detector_options, batch_size=BATCH_SIZE):
+    """
+    Worker process: analyze one time range of a video file.
+    
+    Args:
+        path: Video file path
+        start: Index of the first frame
+        stop: Index after the last frame, None for the end of the file
+        fps: Frame rate of the video
+        detector_options: Keyword arguments for HandDetector
+        batch_size: Frames per classification batch
+    
+    Returns:
+        List of column batches (see analyze_batches)
+    """
+    # A fresh detector per range, so hand tracking never carries over from an unrelated time
+    detector = HandDetector(**detector_options)
+    pool = FramePool(size=4)
+    decoder = DecodeThread(path, start, stop, pool=pool)
+    decoder.start()
+    try:
+        return list(analyze_batches(decoder.frames(), detector, fps, batch_size, pool))
+    finally:
+        decoder.stop()
+        detector.close()
+
+
+def video_batches(source, detector_options=None, workers=1, shard_seconds=60.0, fps=None,
+                  batch_size=BATCH_SIZE):
+    """
+    Analyze a source in column batches.
+    
+    Video files longer than one shard are split into shard_seconds ranges
+    and analyzed by a pool of worker processes; results come back in frame
+    order. Other sources are analyzed in the calling process, with frames
+    decoded in a background thread when a path is given.
+    
+    Args:
+        source: Video file path, image directory, or iterable of BGR images
+        detector_options: Keyword arguments for HandDetector (gesture_map and classifier included)
+        workers: Number of worker processes for video files
+        shard_seconds: Length of the time range handed to each worker task
+        fps: Frame rate for the timestamps (default: the video's own, else 30)
+        batch_size: Frames per classification batch
+    
+    Yields:
+        Column batches (see analyze_batches), in frame order
+    """
+    detector_options = detector_options or {}
+    is_video = isinstance(source, str) and source.lower().endswith(VIDEO_EXTENSIONS)
+    if is_video:
+        frame_count, video_fps = video_info(source)
+        fps = fps or video_fps
+        ranges = shard_ranges(frame_count, fps, shard_seconds)
+    else:
+        fps = fps or 30.0
+        ranges = [(0, None)]
+    
+    if not is_video or workers <= 1 or len(ranges) == 1:
+        detector = HandDetector(**detector_options)
+        pool = FramePool(size=4)
+        decoder = None
+        frames = source
+        if isinstance(source, str):
+            decoder = DecodeThread(source, pool=pool)
+            decoder.start()
+            frames = decoder.frames()
+        try:
+            yield from analyze_batches(frames, detector, fps, batch_size, pool if decoder else None)
+        finally:
+            if decoder is not None:
+                decoder.stop()
+            detector.close()
+        return
+    
+    # "spawn" gives every worker a fresh interpreter; MediaPipe is not fork-safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = deque()
+        ranges = deque(ranges)
+        try:
+            # Keep a couple of ranges queued per worker; finished ones wait until they are next in order
+            while ranges or pending:
+                while ranges and len(pending) < 2 * workers:
+                    start, stop = ranges.popleft()
+                    pending.append(executor.submit(analyze_shard, source, start, stop, fps,
+                                                   detector_options, batch_size))
+                yield from pending.popleft().result()
+        finally:
+            # Stopped early: do not wait for ranges nobody will read
+            for future in pending:
+                future.cancel()
+
+
+def analyze_video(source, detector_options=None, workers=1, shard_seconds=60.0, fps=None):
+    """
+    Analyze every frame of a video, image directory or iterable of frames, without drawing.
+    
+    Args:
+        source: Video file path, image directory, or iterable of BGR images
+        detector_options: Keyword arguments for HandDetector
+        workers: Number of worker processes for video files
+        shard_seconds: Length of the time range handed to each worker task
+        fps: Frame rate for the timestamps (default: the video's own, else 30)
+    
+    Yields:
+        Tuples of (timestamp, gesture, finger_count, landmarks) in frame order, with
+        landmarks a (21, 3) pixel array or None without a hand
+    """
+    for batch in video_batches(source, detector_options, workers, shard_seconds, fps):
+        yield from batch_records(batch)
+
+
+class CsvWriter:
+    """
+    Writes records as CSV rows: timestamp, gesture, finger_count and
+    x/y/z of the 21 landmarks (empty without a hand).
+    """
+    
+    def __init__(self, path):
+        """
+        Create the output file.
+        
+        Args:
+            path: Output file path
+        """
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["timestamp", "gesture", "finger_count"]
+                             + [f"{axis}{i}" for i in range(21) for axis in "xyz"])
+        self.frames = 0
+    
+    def write_batch(self, batch):
+        """Append a column batch (see analyze_batches)."""
+        empty = [""] * 63
+        for timestamp, gesture, finger_count, landmarks in batch_records(batch):
+            coords = [f"{v:.2f}" for v in landmarks.ravel()] if landmarks is not None else empty
+            self.writer.writerow([f"{timestamp:.3f}", gesture, finger_count] + coords)
+        self.frames += len(batch["timestamp"])
+    
+    def close(self):
+        """Close the file."""
+        self.file.close()
+
+
+class NpzWriter:
+    """
+    Collects batches and saves them as a landmark stream (.npz) with the
+    arrays landmarks, valid and timestamps read by LandmarkStreamSource,
+    plus gestures and finger_counts. The zip format needs every array up
+    front, so the compact columns are kept in memory until close().
+    """
+    
+    def __init__(self, path):
+        """
+        Prepare the output.
+        
+        Args:
+            path: Output file path
+        """
+        self.path = path
+        self.batches = []
+        self.frames = 0
+    
+    def write_batch(self, batch):
+        """Append a column batch (see analyze_batches)."""
+        self.batches.append(batch)
+        self.frames += len(batch["timestamp"])
+    
+    def close(self):
+        """Write the file."""
+        def column(name, dtype):
+            return np.concatenate([np.asarray(b[name], dtype=dtype) for b in self.batches]) \
+                if self.batches else np.zeros(0, dtype=dtype)
+        
+        landmarks = (np.concatenate([b["landmarks"] for b in self.batches]) if self.batches
+                     else np.zeros((0, 21, 3), dtype=np.float32))
+        np.savez_compressed(self.path, landmarks=landmarks, valid=column("valid", bool),
+                            timestamps=column("timestamp", np.float64),
+                            gestures=column("gesture", str), finger_counts=column("finger_count", np.int8))
+
+
+class ParquetWriter:
+    """
+    Streams batches to a Parquet file, one row group per batch, with a
+    63-float landmarks list that is null without a hand.
+    """
+    
+    def __init__(self, path):
+        """
+        Create the output file.
+        
+        Args:
+            path: Output file path
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.pc = pc
+        self.schema = pa.schema([
+            ("timestamp", pa.float64()),
+            ("gesture", pa.string()),
+            ("finger_count", pa.int8()),
+            ("landmarks", pa.list_(pa.float32(), 63)),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.frames = 0
+    
+    def write_batch(self, batch):
+        """Append a column batch (see analyze_batches)."""
+        pa = self.pa
+        n = len(batch["timestamp"])
+        coords = pa.array(batch["landmarks"].reshape(-1), type=pa.float32())
+        landmarks = pa.FixedSizeListArray.from_arrays(coords, 63)
+        # Frames without a hand get a null list instead of zeros
+        landmarks = self.pc.if_else(pa.array(batch["valid"]), landmarks,
+                                       pa.nulls(n, type=landmarks.type))
+        table = pa.Table.from_arrays(
+            [pa.array(batch["timestamp"]), pa.array(batch["gesture"], type=pa.string()),
+             pa.array(batch["finger_count"].astype(np.int8)), landmarks],
+            schema=self.schema)
+        self.writer.write_table(table)
+        self.frames += n
+    
+    def close(self):
+        """Finish the file."""
+        self.writer.close()
+
+
+WRITERS = {".csv": CsvWriter, ".npz": NpzWriter, ".parquet": ParquetWriter}
+
+
+def open_writer(path):
+    """
+    Open an output writer chosen by file extension.
+    
+    Args:
+        path: Output file path ending in .csv, .npz or .parquet
+    
+    Returns:
+        Writer with write_batch() and close()
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported output format {ext!r} (use {', '.join(WRITERS)})")
+    return WRITERS[ext](path)
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Offline gesture analysis of recorded videos.")
+    parser.add_argument("source", help="video file or image directory")
+    parser.add_argument("--output", "-o", required=True, metavar="FILE",
+                        help="output file (.csv, .npz or .parquet)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="worker processes for video files (default: one per CPU core)")
+    parser.add_argument("--shard-seconds", type=float, default=60.0, metavar="SECONDS",
+                        help="length of video handed to a worker at a time (default: 60)")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="frame rate for the timestamps (default: the video's own, else 30)")
+    parser.add_argument("--inference-width", type=int, default=None, metavar="PX",
+                        help="downscale frames to this width before hand detection")
+    parser.add_argument("--gestures", default=None, metavar="FILE",
+                        help="gesture definitions (default: gestures.json)")
+    parser.add_argument("--model", default=None, metavar="FILE",
+                        help="classify with a model trained by gesture_model.py instead of the finger rules")
+    parser.add_argument("--no-mirror", action="store_true",
+                        help="the video is already mirrored (do not mirror the landmarks like the live view)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Analyze a video from the command line."""
+    args = parse_args(argv)
+    detector_options = {"inference_width": args.inference_width, "mirror": not args.no_mirror,
+                        "gesture_map": load_gesture_map(args.gestures),
+                        "classifier": load_classifier(args.model) if args.model else None}
+    writer = open_writer(args.output)
+    gestures = Counter()
+    video_seconds = 0.0
+    start = last_report = time.perf_counter()
+    try:
+        for batch in video_batches(args.source, detector_options, workers=args.workers,
+                                   shard_seconds=args.shard_seconds, fps=args.fps):
+            writer.write_batch(batch)
+            gestures.update(batch["gesture"])
+            video_seconds = float(batch["timestamp"][-1])
+            now = time.perf_counter()
+            if now - last_report >= REPORT_INTERVAL:
+                print(f"⏩ {writer.frames} frames | {video_seconds:.0f} s of video | "
+                      f"{video_seconds / (now - start):.1f}x real time", end="\r")
+                last_report = now
+    except KeyboardInterrupt:
+        print("\n⚠ Interrupted, keeping the frames analyzed so far")
+    finally:
+        writer.close()
+    
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    print(f"\n✅ {writer.frames} frames analyzed in {elapsed:.1f} s "
+          f"({writer.frames / elapsed:.1f} FPS, {video_seconds / elapsed:.1f}x real time) -> {args.output}")
+    for name, count in gestures.most_common():
+        print(f"   {name:14} {count:8} frames")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())